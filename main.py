@@ -1,9 +1,9 @@
 # main.py
 import time
-from contextlib import contextmanager
 
 import utils_wca as uw
 from modules import (
+    validation,
     competitions,
     events,
     regions,
@@ -12,20 +12,12 @@ from modules import (
     records,
     sor_kinch,
     results,
+    averages,
+    consistency,
+    rankings,
 )
 
 
-@contextmanager
-def timed(logger, label: str):
-    """Context manager that logs how long the wrapped block took."""
-    start = time.perf_counter()
-    try:
-        yield
-    finally:
-        elapsed = time.perf_counter() - start
-        logger.info(f"[timing] {label} completed in {elapsed:.1f}s")
-
-
 def main():
 
     logger = uw.setup_logger(__name__)
@@ -34,32 +26,35 @@ def main():
     pipeline_start = time.perf_counter()
 
     # --- Setup ---
-    with timed(logger, "setup"):
+    with uw.timed(logger, "setup"):
         config = uw.load_config(logger=logger, config_path="config.ini")
         uw.set_plot_style(config=config, logger=logger)
         uw.update_data(config=config, logger=logger)
 
+    # --- Modules to run ---
+    # Comment/uncomment to choose which modules to run. Only the export tables and
+    # columns these modules declare (REQUIRED_COLUMNS) are loaded.
+    modules_to_run = [
+        validation,
+        competitions,
+        events,
+        regions,
+        championships,
+        relays,
+        records,
+        sor_kinch,
+        results,
+        averages,
+        consistency,
+        rankings,
+    ]
+
     # --- Load and preprocess tables ---
-    with timed(logger, "load + preprocess tables"):
-        tables_to_load = [
-            "results",
-            "attempts",
-            "persons",
-            "competitions",
-            "events",
-            "formats",
-            "ranks_single",
-            "ranks_average",
-            "countries",
-            "continents",
-            "championships",
-            "rounds",
-            "scrambles",
-        ]
-
-        db_tables = {name: uw.read_table(name, config, logger) for name in tables_to_load}
-        db_tables = uw.process_tables(db_tables, config, logger)
-        uw.export_db_schema(db_tables, config, logger)
+    with uw.timed(logger, "load + preprocess tables"):
+        table_columns = uw.resolve_table_columns(modules_to_run, logger)
+
+        # Tables are parsed in parallel; process_tables steps start as soon as their inputs are in
+        db_tables = uw.load_tables(table_columns, config, logger)
 
         # --- check if mappers must be updated ---
         uw.read_aux_file("regions", db_tables, config, logger)
@@ -72,23 +67,13 @@ def main():
             )
 
     # --- Run modules, passing the preloaded tables ---
-    # Comment/uncomment to choose which modules to run.
-    with timed(logger, "competitions"):
-        competitions.run(db_tables, config)
-    with timed(logger, "events"):
-        events.run(db_tables, config)
-    with timed(logger, "regions"):
-        regions.run(db_tables, config)
-    with timed(logger, "championships"):
-        championships.run(db_tables, config)
-    with timed(logger, "relays"):
-        relays.run(db_tables, config)
-    with timed(logger, "records"):
-        records.run(db_tables, config)
-    with timed(logger, "sor_kinch"):
-        sor_kinch.run(db_tables, config)
-    with timed(logger, "results"):
-        results.run(db_tables, config)
+    for module in modules_to_run:
+        with uw.timed(logger, module.__name__.split(".")[-1]):
+            module.run(db_tables, config)
+
+    # --- After the modules, so derived tables they built are described/saved ---
+    uw.export_db_schema(db_tables, config, logger)
+    uw.save_snapshot(db_tables, config, logger)
 
     total_elapsed = time.perf_counter() - pipeline_start
     logger.info(f"Pipeline finished successfully in {total_elapsed:.1f}s total")
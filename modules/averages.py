@@ -0,0 +1,284 @@
+import pandas as pd
+import numpy as np
+import logging
+import configparser
+import utils_wca as uw
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+# Only Ao5 results have a BPA/WPA: in a Mo3 the third attempt is unbounded
+# on both sides, so two attempts bound neither the best nor the worst mean
+_AO5_FORMAT = "a"
+_TOP_N = 100
+
+# Sorts after every real attempt, so DNF/DNS end up at the slow end of a row
+_DNF_SENTINEL = np.iinfo(np.int32).max
+
+# Raw export columns this module reads, directly or through the pre-filtered
+# tables built by process_tables (see uw.resolve_table_columns).
+REQUIRED_COLUMNS = {
+    "results": [
+        "id", "average", "competition_id", "round_type_id", "event_id", "format_id",
+        "person_name", "person_id", "person_country_id",
+    ],
+    "attempts": ["value", "attempt_number", "result_id"],
+    "countries": ["id", "name"],
+}
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _get_event_list(config: configparser.ConfigParser, logger: logging.Logger) -> list[str]:
+    """
+    Read the per-event list for the BPA/WPA leaderboards from [averages] -> event_list.
+    Falls back to ['333'] with a warning if the section is missing. Only Ao5
+    events get rows (see possible_averages).
+    """
+    try:
+        raw = config["averages"]["event_list"]
+    except KeyError:
+        logger.warning("Missing [averages]->event_list in config.ini; defaulting to ['333'].")
+        return ["333"]
+    return [e.strip() for e in raw.split(",") if e.strip()]
+
+
+def possible_averages(values: np.ndarray, filled: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Best and worst possible average of every row of an Ao5 attempt matrix,
+    in WCA units (centiseconds, -1 = DNF, 0 = not defined: fewer than four
+    attempts).
+
+    The first four attempts are sorted along the attempt axis with DNF/DNS
+    as +inf. BPA is the mean of the three fastest (the fifth attempt beats
+    the slowest of the four and is itself trimmed), WPA the mean of the
+    three slowest (the fifth is trimmed as the fastest). Either is a DNF as
+    soon as a DNF counts.
+    """
+    n = len(values)
+    bpa = np.zeros(n, dtype=np.int32)
+    wpa = np.zeros(n, dtype=np.int32)
+
+    ao5 = filled[:, :4].all(axis=1)
+    first4 = values[ao5, :4]
+    first4 = np.where(first4 > 0, first4, _DNF_SENTINEL).astype(np.int64)
+    first4.sort(axis=1)
+
+    dnf = first4 == _DNF_SENTINEL
+    best3 = uw.round_average(first4[:, :3].sum(axis=1), 3)
+    worst3 = uw.round_average(first4[:, 1:].sum(axis=1), 3)
+    bpa[ao5] = np.where(dnf[:, 2], -1, best3)
+    wpa[ao5] = np.where(dnf[:, 3], -1, worst3)
+
+    return bpa, wpa
+
+
+###################################################################
+######################### COMPUTATIONS ############################
+###################################################################
+
+
+@uw.product("possible_averages", deps=("results", "attempt_matrix"), persist=True)
+def _build_possible_averages(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger
+) -> pd.DataFrame:
+    """
+    Product 'possible_averages': BPA and WPA of every Ao5 result in the
+    export, from one pass over the attempt matrix. One row per result that
+    has enough attempts, with the results columns the leaderboards need.
+    """
+    results = db_tables["results"]
+    selected = results["format_id"] == _AO5_FORMAT
+
+    matrix = db_tables["attempt_matrix"].rows(selected)
+    bpa, wpa = possible_averages(matrix.values, matrix.filled)
+
+    df = results.loc[selected, [
+        "id", "event_id", "format_id", "person_id", "person_name", "person_country_id",
+        "competition_id", "round_type_id", "average",
+    ]].assign(bpa=bpa, wpa=wpa)
+    df = df[df["bpa"] != 0].reset_index(drop=True)
+
+    logger.info(f"Computed BPA/WPA for {len(df):,} Ao5 results.")
+    return df
+
+
+def _format_leaderboard(df: pd.DataFrame, event: str, logger: logging.Logger) -> pd.DataFrame:
+    """Format the BPA/WPA/Average columns of a leaderboard and number its rows from 1."""
+    for col in ("BPA", "WPA", "Average"):
+        if col in df.columns:
+            df[col] = uw.format_results(df[col].where(df[col] > 0), event, logger)
+    df = df.reset_index(drop=True)
+    df.index += 1
+    return df
+
+
+def compute_nationality_bpa(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger,
+    event: str
+) -> pd.DataFrame:
+    """
+    Top-N completed averages of the nationality's competitors in `event`,
+    ranked by BPA (ties broken by the actual average), with WPA alongside.
+    """
+    try:
+        nationality = config.nationality
+        logger.info(f"Computing best BPAs in {event} for {nationality}...")
+
+        df = uw.get_product("possible_averages", db_tables, config, logger)
+        df = df[
+            (df["event_id"] == event)
+            & (df["person_country_id"] == nationality)
+            & (df["average"] > 0)
+            & (df["bpa"] > 0)
+        ]
+        if df.empty:
+            logger.warning(f"No {event} averages found for {nationality}.")
+            return pd.DataFrame()
+
+        df = (
+            df.sort_values(["bpa", "average"])
+            .head(_TOP_N)
+            [["person_name", "person_id", "competition_id", "round_type_id", "bpa", "wpa", "average"]]
+            .rename(columns={
+                "person_name": "Name", "person_id": "WCAID", "competition_id": "Competition",
+                "round_type_id": "Round", "bpa": "BPA", "wpa": "WPA", "average": "Average",
+            })
+        )
+        return _format_leaderboard(df, event, logger)
+
+    except Exception as e:
+        logger.error(f"Error computing BPA leaderboard for {event}: {e}", exc_info=True)
+        return pd.DataFrame()
+
+
+def compute_personal_bpa(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger,
+    event: str
+) -> pd.DataFrame:
+    """
+    Per-person leaderboard for `event`: each competitor of the nationality
+    with their best BPA, best WPA and number of averages counted, ranked by
+    best BPA.
+    """
+    try:
+        nationality = config.nationality
+        logger.info(f"Computing personal best BPA/WPA in {event} for {nationality}...")
+
+        df = uw.get_product("possible_averages", db_tables, config, logger)
+        df = df[
+            (df["event_id"] == event)
+            & (df["person_country_id"] == nationality)
+            & (df["average"] > 0)
+        ]
+        if df.empty:
+            logger.warning(f"No {event} averages found for {nationality}.")
+            return pd.DataFrame()
+
+        # DNF BPA/WPA count as missing, so min() picks the best valid one
+        per_person = (
+            df.assign(bpa=df["bpa"].where(df["bpa"] > 0), wpa=df["wpa"].where(df["wpa"] > 0))
+            .groupby("person_id", observed=True)
+            .agg(Name=("person_name", "last"), BPA=("bpa", "min"), WPA=("wpa", "min"), Averages=("bpa", "size"))
+            .dropna(subset=["BPA"])
+            .sort_values(["BPA", "WPA"])
+            .head(_TOP_N)
+            .reset_index()
+            .rename(columns={"person_id": "WCAID"})
+            [["Name", "WCAID", "BPA", "WPA", "Averages"]]
+        )
+        return _format_leaderboard(per_person, event, logger)
+
+    except Exception as e:
+        logger.error(f"Error computing personal BPA leaderboard for {event}: {e}", exc_info=True)
+        return pd.DataFrame()
+
+
+def compute_country_bpa(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger,
+    event_list: list[str]
+) -> pd.DataFrame:
+    """
+    Per-country leaderboard: for each event in `event_list`, every country's
+    best BPA over its competitors' completed averages, ranked within the event.
+    """
+    try:
+        logger.info(f"Computing best BPA per country for {event_list}...")
+
+        df = uw.get_product("possible_averages", db_tables, config, logger)
+        df = df[df["event_id"].isin(event_list) & (df["average"] > 0) & (df["bpa"] > 0)]
+        if df.empty:
+            logger.warning(f"No averages found for {event_list}.")
+            return pd.DataFrame()
+
+        # Fastest BPA per (event, country), keeping who set it
+        best = (
+            df.sort_values(["bpa", "average"])
+            .drop_duplicates(["event_id", "person_country_id"])
+            .merge(
+                db_tables["countries"][["id", "name"]],
+                left_on="person_country_id", right_on="id", how="left",
+            )
+        )
+        best["Rank"] = best.groupby("event_id", observed=True)["bpa"].rank(method="min").astype(int)
+
+        # Events in the configured order, countries by rank
+        best["event_id"] = pd.Categorical(best["event_id"].astype(str), categories=event_list, ordered=True)
+        best = best.sort_values(["event_id", "Rank", "name"])
+
+        out = pd.DataFrame({
+            "Event": best["event_id"].astype(str).to_numpy(),
+            "Rank": best["Rank"].to_numpy(),
+            "Country": best["name"].to_numpy(),
+            "BPA": uw.format_results(best["bpa"], best["event_id"].astype(str), logger).to_numpy(),
+            "Name": best["person_name"].to_numpy(),
+            "WCAID": best["person_id"].astype(str).to_numpy(),
+            "Competition": best["competition_id"].astype(str).to_numpy(),
+        })
+        out.index += 1
+        return out
+
+    except Exception as e:
+        logger.error(f"Error computing BPA per country: {e}", exc_info=True)
+        return pd.DataFrame()
+
+
+###################################################################
+############################### RUN ###############################
+###################################################################
+
+
+def run(db_tables, config):
+
+    logger = logging.getLogger(__name__)
+    logger.info("Producing stats for Averages module")
+
+    event_list = _get_event_list(config, logger)
+    logger.info(f"BPA/WPA leaderboards will be computed for: {event_list}")
+
+    # --- Tables ---
+    results = {
+        "Best BPA per Country": compute_country_bpa(db_tables, config, logger, event_list),
+    }
+
+    for event in event_list:
+        results[f"Best BPA {event}"] = compute_nationality_bpa(db_tables, config, logger, event)
+        results[f"Personal BPA {event}"] = compute_personal_bpa(db_tables, config, logger, event)
+
+    figures = {}
+
+    section_name = __name__.split(".")[-1]
+    uw.export_data(results, figures=figures, section_name=section_name, config=config, logger=logger)
@@ -19,12 +19,75 @@ _FINAL_ROUND_TYPES = ("c", "f")
 # Major international championship types in the WCA championships table.
 _WORLD_CHAMPIONSHIP_TYPE = "world"
 
+# Raw export columns this module reads, directly or through the pre-filtered
+# tables built by process_tables (see uw.resolve_table_columns).
+REQUIRED_COLUMNS = {
+    "results": [
+        "pos", "best", "competition_id", "round_type_id", "event_id",
+        "person_name", "person_id", "person_country_id",
+    ],
+    "persons": ["wca_id", "name"],
+    "competitions": ["id", "city_name", "country_id", "year", "latitude_microdegrees", "longitude_microdegrees"],
+    "championships": ["competition_id", "championship_type"],
+    "countries": ["id", "continent_id"],
+}
+
 
 ###################################################################
 ##################### NATIONAL CHAMPIONSHIPS ######################
 ###################################################################
 
 
+@uw.product("nats_champions", deps=("results_country",), persist=True)
+def _build_national_championship_winners(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger
+) -> pd.DataFrame:
+    """Product 'nats_champions': winners at national championships, all events, ordered by year."""
+    nationality = config.nationality
+    results_country = db_tables["results_country"].copy()
+
+    # --- Filter for national finals/combined rounds ---
+    champs = results_country.query(
+        "competition_id in @config.nats and round_type_id in @_FINAL_ROUND_TYPES "
+        "and best > 0 and person_country_id == @nationality"
+    )
+
+    if champs.empty:
+        logger.warning(f"No national championship results found for {config.country}.")
+        return pd.DataFrame(columns=["Year", "Competition ID", "Event", "WCAID", "Winner"])
+
+    # --- Find the minimum (best) position for each competition + event ---
+    min_pos_per_comp = (
+        champs.groupby(["competition_id", "event_id"], observed=True)["pos"]
+        .min()
+        .reset_index()
+    )
+
+    # --- Keep all competitors who share that best position (handles ties) ---
+    champs = champs.merge(
+        min_pos_per_comp,
+        on=["competition_id", "event_id", "pos"],
+        how="inner"
+    )
+
+    champs = (
+        champs[["year", "competition_id", "event_id", "person_id", "person_name"]]
+        .rename(columns={
+            "year": "Year",
+            "competition_id": "Competition ID",
+            "person_id": "WCAID",
+            "person_name": "Winner",
+            "event_id": "Event",
+        })
+        .sort_values(by=["Year", "Event"])
+        .reset_index(drop=True)
+    )
+    champs.index += 1
+    return champs
+
+
 def compute_national_championship_winners(
     db_tables: dict,
     config: configparser.ConfigParser,
@@ -34,53 +97,14 @@ def compute_national_championship_winners(
     """
     Compute the list of winners at national championships, ordered by year.
     If `event` is provided, restrict the result to that event id.
-    Stores the full (unfiltered) winners table in db_tables["nats_champions"].
+    The full (unfiltered) winners table is the product 'nats_champions'.
     """
     try:
-        nationality = config.nationality
         logger.info(f"Computing {event or 'all-event'} winners at {config.country} championships...")
 
-        results_country = db_tables["results_country"].copy()
-
-        # --- Filter for national finals/combined rounds ---
-        champs = results_country.query(
-            "competition_id in @config.nats and round_type_id in @_FINAL_ROUND_TYPES "
-            "and best > 0 and person_country_id == @nationality"
-        )
-
+        champs = uw.get_product("nats_champions", db_tables, config, logger)
         if champs.empty:
-            logger.warning(f"No national championship results found for {config.country}.")
-            return pd.DataFrame(columns=["Year", "Competition ID", "Event", "WCAID", "Winner"])
-
-        # --- Find the minimum (best) position for each competition + event ---
-        min_pos_per_comp = (
-            champs.groupby(["competition_id", "event_id"], observed=True)["pos"]
-            .min()
-            .reset_index()
-        )
-
-        # --- Keep all competitors who share that best position (handles ties) ---
-        champs = champs.merge(
-            min_pos_per_comp,
-            on=["competition_id", "event_id", "pos"],
-            how="inner"
-        )
-
-        champs = (
-            champs[["year", "competition_id", "event_id", "person_id", "person_name"]]
-            .rename(columns={
-                "year": "Year",
-                "competition_id": "Competition ID",
-                "person_id": "WCAID",
-                "person_name": "Winner",
-                "event_id": "Event",
-            })
-            .sort_values(by=["Year", "Event"])
-            .reset_index(drop=True)
-        )
-        champs.index += 1
-
-        db_tables["nats_champions"] = champs
+            return champs
 
         if event:
             champs = champs[champs["Event"] == event].copy()
@@ -123,17 +147,17 @@ def compute_national_championship_medal_table(
             return pd.DataFrame(columns=["WCAID", "Name", "gold", "silver", "bronze", "podiums"])
 
         # --- Compute ranking positions per competition/event ---
-        solve["nr_rank"] = solve.groupby(["competition_id", "event_id"])["pos"].rank(method="min")
+        solve["nr_rank"] = solve.groupby(["competition_id", "event_id"], observed=True)["pos"].rank(method="min")
 
         # --- Count medals and podiums ---
-        solve["gold"] = solve["nr_rank"].eq(1).groupby(solve["person_id"]).transform("sum")
-        solve["silver"] = solve["nr_rank"].eq(2).groupby(solve["person_id"]).transform("sum")
-        solve["bronze"] = solve["nr_rank"].eq(3).groupby(solve["person_id"]).transform("sum")
-        solve["podiums"] = solve["nr_rank"].le(3).groupby(solve["person_id"]).transform("sum")
+        solve["gold"] = solve["nr_rank"].eq(1).groupby(solve["person_id"], observed=True).transform("sum")
+        solve["silver"] = solve["nr_rank"].eq(2).groupby(solve["person_id"], observed=True).transform("sum")
+        solve["bronze"] = solve["nr_rank"].eq(3).groupby(solve["person_id"], observed=True).transform("sum")
+        solve["podiums"] = solve["nr_rank"].le(3).groupby(solve["person_id"], observed=True).transform("sum")
 
         # --- Aggregate medal counts ---
         medal_table = (
-            solve.groupby("person_id")[["gold", "silver", "bronze", "podiums"]]
+            solve.groupby("person_id", observed=True)[["gold", "silver", "bronze", "podiums"]]
             .max()
             .reset_index()
             .merge(persons, left_on="person_id", right_on="wca_id", how="left")
@@ -186,7 +210,7 @@ def compute_championship_streaks(
         # --- Keep only winners (position 1) per competition+event ---
         champs = (
             champs.sort_values(by="pos")
-            .groupby(["competition_id", "event_id"])
+            .groupby(["competition_id", "event_id"], observed=True)
             .nth(0)
             .reset_index(drop=False)[["event_id", "person_id", "person_name", "year"]]
             .sort_values(by=["event_id", "year"])
@@ -197,10 +221,10 @@ def compute_championship_streaks(
         champs["streak_id"] = (champs["person_id"] != champs["person_id"].shift(1)).cumsum()
 
         max_streaks = (
-            champs.groupby(["event_id", "person_id", "person_name", "streak_id"])
+            champs.groupby(["event_id", "person_id", "person_name", "streak_id"], observed=True)
             .size()
             .reset_index(name="count")
-            .groupby(["event_id", "person_id", "person_name"])["count"]
+            .groupby(["event_id", "person_id", "person_name"], observed=True)["count"]
             .max()
             .reset_index()
             .rename(columns={"count": "Consecutive Wins"})
@@ -250,7 +274,7 @@ def compute_hall_of_fame(
         # --- Keep only winners (position 1) ---
         champs = (
             champs.sort_values(by="pos")
-            .groupby(["competition_id", "event_id"])
+            .groupby(["competition_id", "event_id"], observed=True)
             .nth(0)
             .reset_index(drop=False)[["event_id", "person_id", "person_name", "year"]]
             .sort_values(by=["event_id", "year"])
@@ -259,7 +283,7 @@ def compute_hall_of_fame(
 
         # --- Count wins per competitor ---
         w = (
-            champs.groupby("person_id")["person_name"]
+            champs.groupby("person_id", observed=True)["person_name"]
             .count()
             .reset_index(name="wins")
             .merge(persons, left_on="person_id", right_on="wca_id", how="left")
@@ -349,7 +373,7 @@ def compute_international_podiums(
             else:
                 # Continental podium: rank within the continent, then keep our nationality
                 subset = subset.query("person_country_id in @continent_country_ids").copy()
-                subset["cont_rank"] = subset.groupby(["competition_id", "event_id"])["pos"].rank(method="min")
+                subset["cont_rank"] = subset.groupby(["competition_id", "event_id"], observed=True)["pos"].rank(method="min")
                 subset = subset.query("cont_rank <= 3 and person_country_id == @target_country").copy()
                 subset["pos"] = subset["cont_rank"]
 
@@ -426,7 +450,7 @@ def compute_major_final_appearances(
             return pd.DataFrame(columns=["WCAID", "Name", "final_appearances"])
 
         counts = (
-            subset.groupby("person_id")["event_id"]
+            subset.groupby("person_id", observed=True)["event_id"]
             .count()
             .reset_index(name="final_appearances")
         )
@@ -480,7 +504,7 @@ def compute_national_final_appearances(
             return pd.DataFrame(columns=["WCAID", "Name", "final_appearances"])
 
         counts = (
-            subset.groupby("person_id")["event_id"]
+            subset.groupby("person_id", observed=True)["event_id"]
             .count()
             .reset_index(name="final_appearances")
         )
@@ -526,7 +550,7 @@ def compute_national_championships_competed(
             return pd.DataFrame(columns=["WCAID", "Name", "championships_competed"])
 
         counts = (
-            subset.groupby("person_id")["competition_id"]
+            subset.groupby("person_id", observed=True)["competition_id"]
             .nunique()
             .reset_index(name="championships_competed")
         )
@@ -588,14 +612,14 @@ def compute_title_retention_rate(
         )
 
         # Vectorized consecutive-year comparison per event
-        winners["prev_person"] = winners.groupby("event_id")["person_id"].shift(1)
-        winners["prev_year"]   = winners.groupby("event_id")["year"].shift(1)
+        winners["prev_person"] = winners.groupby("event_id", observed=True)["person_id"].shift(1)
+        winners["prev_year"]   = winners.groupby("event_id", observed=True)["year"].shift(1)
 
         transitions = winners[winners["prev_person"].notna()].copy()
         transitions["retained"] = (transitions["person_id"] == transitions["prev_person"])
 
         summary = (
-            transitions.groupby("event_id", as_index=False)
+            transitions.groupby("event_id", observed=True, as_index=False)
             .agg(
                 retained=("retained", "sum"),
                 total_transitions=("retained", "count"),
@@ -653,7 +677,7 @@ def compute_sweeps(
 
         # Count how many required events each person owns per competition
         agg = (
-            best_nat.groupby(["competition_id", "year", "person_id", "person_name"])["event_id"]
+            best_nat.groupby(["competition_id", "year", "person_id", "person_name"], observed=True)["event_id"]
             .nunique()
             .reset_index(name="events_won")
         )
@@ -5,6 +5,19 @@ import utils_wca as uw
 import matplotlib.pyplot as plt
 
 
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+# Raw export columns this module reads, directly or through the pre-filtered
+# tables built by process_tables (see uw.resolve_table_columns).
+REQUIRED_COLUMNS = {
+    "results": ["competition_id", "person_id", "person_country_id"],
+    "persons": ["wca_id", "sub_id", "name", "gender"],
+    "competitions": ["id", "country_id", "year"],
+}
+
+
 ###################################################################
 ######################### COMPUTATIONS ############################
 ###################################################################
@@ -23,7 +36,7 @@ def compute_most_competitions(
         persons = db_tables["persons"].query("sub_id == 1").copy()
 
         df_counts = (
-            results.groupby("person_id")["competition_id"]
+            results.groupby("person_id", observed=True)["competition_id"]
             .nunique()
             .reset_index()
             .rename(columns={"person_id": "WCAID", "competition_id": "Number of Competitions"})
@@ -60,7 +73,7 @@ def compute_most_countries(
 
         df_counts = (
             results.query("country_id not in @config.multivenue")
-            .groupby("person_id")["country_id"]
+            .groupby("person_id", observed=True)["country_id"]
             .nunique()
             .reset_index()
             .rename(columns={"person_id": "WCAID", "country_id": "Number of Countries"})
@@ -95,7 +108,7 @@ def compute_most_competitors(
         results = db_tables["results_country"]
 
         df = (
-            results.groupby("competition_id")["person_id"]
+            results.groupby("competition_id", observed=True)["person_id"]
             .nunique()
             .reset_index()
             .rename(columns={"competition_id": "Competition ID", "person_id": "Number of Competitors"})
@@ -128,10 +141,10 @@ def compute_return_rate(
         df = db_tables["results"]
 
         retrate = (
-            df.groupby(["person_country_id", "person_id"])["competition_id"]
+            df.groupby(["person_country_id", "person_id"], observed=True)["competition_id"]
             .nunique()
             .reset_index(name="num_comps")
-            .groupby("person_country_id")
+            .groupby("person_country_id", observed=True)
             .agg(
                 Competitors=("num_comps", "size"),
                 Returners=("num_comps", lambda x: (x >= 2).sum()),
@@ -183,10 +196,10 @@ def compute_community_recency(
         df["post_covid"] = df["year"] >= threshold_year
 
         post_covid = (
-            df.groupby(["person_country_id", "person_id"])["post_covid"]
+            df.groupby(["person_country_id", "person_id"], observed=True)["post_covid"]
             .any()
             .reset_index()
-            .groupby("person_country_id")
+            .groupby("person_country_id", observed=True)
             .agg(
                 Competitors=("post_covid", "size"),
                 post_covid_competitors=("post_covid", "sum"),
@@ -217,6 +230,88 @@ def compute_community_recency(
         return pd.DataFrame()
 
 
+@uw.product("newcomers", deps=("results_nationality", "results_country", "persons"), persist=True)
+def _build_newcomer_statistics(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger
+) -> pd.DataFrame:
+    """Product 'newcomers': newcomers, competitors and competitions per year, by gender."""
+    nationality = config.nationality
+    logger.info(
+        f"Computing yearly newcomer statistics for nationality={nationality} (with gender breakdown)"
+    )
+
+    df_n = db_tables["results_nationality"].copy()
+    df_c = db_tables["results_country"].copy()
+    persons = db_tables["persons"][["wca_id", "gender"]]
+
+    # --- Merge gender onto results ---
+    df_n = (
+        df_n.merge(persons, how="left", left_on="person_id", right_on="wca_id")
+        .drop(columns="wca_id")
+    )
+    df_c = (
+        df_c.merge(persons, how="left", left_on="person_id", right_on="wca_id")
+        .drop(columns="wca_id")
+    )
+
+    # --- Extract newcomer's registration year (first 4 chars of person_id) ---
+    df_n["newcomer_year"] = df_n["person_id"].str[:4].astype(int)
+
+    # --- Newcomers per year ---
+    newcomers_by_gender = (
+        df_n.loc[df_n["newcomer_year"] == df_n["year"]]
+        .groupby(["year", "gender"], observed=True)["person_id"]
+        .nunique()
+        .unstack(fill_value=0)
+        .rename_axis(None, axis=1)
+        .reset_index()
+        .rename(columns={"f": "Newcomer F", "m": "Newcomer M", "o": "Newcomer O"})
+    )
+
+    # --- Competitors per year ---
+    competitors_by_gender = (
+        df_n.groupby(["year", "gender"], observed=True)["person_id"]
+        .nunique()
+        .unstack(fill_value=0)
+        .rename_axis(None, axis=1)
+        .reset_index()
+        .rename(columns={"f": "Competitors F", "m": "Competitors M", "o": "Competitors O"})
+    )
+
+    # --- Competitions hosted in the configured country, per year ---
+    country_competitions = (
+        df_c.groupby("year", observed=True)["competition_id"]
+        .nunique()
+        .reset_index()
+        .rename(columns={"competition_id": "Number of Competitions"})
+    )
+
+    # --- Merge all ---
+    summary = (
+        country_competitions
+        .merge(competitors_by_gender, on="year", how="outer")
+        .merge(newcomers_by_gender, on="year", how="outer")
+        .fillna(0)
+        .astype(int)
+    )
+
+    # --- Totals and ratios ---
+    summary["Competitors"] = summary["Competitors F"] + summary["Competitors M"] + summary["Competitors O"]
+    summary["Newcomer"] = summary["Newcomer F"] + summary["Newcomer M"] + summary["Newcomer O"]
+    summary["Newcomer Ratio"] = summary["Newcomer"] / summary["Competitors"]
+    summary["Newcomer Ratio M"] = summary["Newcomer M"] / summary["Competitors M"]
+    summary["Newcomer Ratio F"] = summary["Newcomer F"] / summary["Competitors F"]
+    summary["Newcomer Ratio O"] = summary["Newcomer O"] / summary["Competitors O"]
+
+    summary = summary.sort_values("year").reset_index(drop=True)
+    summary.index += 1
+
+    logger.info("Computed Newcomer counts.")
+    return summary
+
+
 def compute_newcomer_statistics(
     db_tables: dict,
     config: configparser.ConfigParser,
@@ -224,79 +319,7 @@ def compute_newcomer_statistics(
 ) -> pd.DataFrame:
     """Newcomers and competitors per year, broken down by gender."""
     try:
-        nationality = config.nationality
-        logger.info(
-            f"Computing yearly newcomer statistics for nationality={nationality} (with gender breakdown)"
-        )
-
-        df_n = db_tables["results_nationality"].copy()
-        df_c = db_tables["results_country"].copy()
-        persons = db_tables["persons"][["wca_id", "gender"]]
-
-        # --- Merge gender onto results ---
-        df_n = (
-            df_n.merge(persons, how="left", left_on="person_id", right_on="wca_id")
-            .drop(columns="wca_id")
-        )
-        df_c = (
-            df_c.merge(persons, how="left", left_on="person_id", right_on="wca_id")
-            .drop(columns="wca_id")
-        )
-
-        # --- Extract newcomer's registration year (first 4 chars of person_id) ---
-        df_n["newcomer_year"] = df_n["person_id"].str[:4].astype(int)
-
-        # --- Newcomers per year ---
-        newcomers_by_gender = (
-            df_n.loc[df_n["newcomer_year"] == df_n["year"]]
-            .groupby(["year", "gender"], observed=True)["person_id"]
-            .nunique()
-            .unstack(fill_value=0)
-            .rename_axis(None, axis=1)
-            .reset_index()
-            .rename(columns={"f": "Newcomer F", "m": "Newcomer M", "o": "Newcomer O"})
-        )
-
-        # --- Competitors per year ---
-        competitors_by_gender = (
-            df_n.groupby(["year", "gender"], observed=True)["person_id"]
-            .nunique()
-            .unstack(fill_value=0)
-            .rename_axis(None, axis=1)
-            .reset_index()
-            .rename(columns={"f": "Competitors F", "m": "Competitors M", "o": "Competitors O"})
-        )
-
-        # --- Competitions hosted in the configured country, per year ---
-        country_competitions = (
-            df_c.groupby("year", observed=True)["competition_id"]
-            .nunique()
-            .reset_index()
-            .rename(columns={"competition_id": "Number of Competitions"})
-        )
-
-        # --- Merge all ---
-        summary = (
-            country_competitions
-            .merge(competitors_by_gender, on="year", how="outer")
-            .merge(newcomers_by_gender, on="year", how="outer")
-            .fillna(0)
-            .astype(int)
-        )
-
-        # --- Totals and ratios ---
-        summary["Competitors"] = summary["Competitors F"] + summary["Competitors M"] + summary["Competitors O"]
-        summary["Newcomer"] = summary["Newcomer F"] + summary["Newcomer M"] + summary["Newcomer O"]
-        summary["Newcomer Ratio"] = summary["Newcomer"] / summary["Competitors"]
-        summary["Newcomer Ratio M"] = summary["Newcomer M"] / summary["Competitors M"]
-        summary["Newcomer Ratio F"] = summary["Newcomer F"] / summary["Competitors F"]
-        summary["Newcomer Ratio O"] = summary["Newcomer O"] / summary["Competitors O"]
-
-        summary = summary.sort_values("year").reset_index(drop=True)
-        summary.index += 1
-
-        db_tables["newcomers"] = summary
-        logger.info("Computed Newcomer counts; cached 'newcomers' DataFrame in db_tables.")
+        summary = uw.get_product("newcomers", db_tables, config, logger)
 
         # --- Reorder columns for the exported view ---
         summary = summary[[
@@ -328,11 +351,8 @@ def plot_competition_distribution(
     try:
         logger.info(f"Creating figure: Competition Distribution for country {config.country}")
 
-        if "newcomers" not in db_tables:
-            logger.warning("'newcomers' table not found in db_tables; skipping plot.")
-            return None
-
-        df = db_tables["newcomers"].query("year > 2000")
+        newcomers = uw.get_product("newcomers", db_tables, config, logger)
+        df = newcomers.query("year > 2000")
 
         fig, ax = plt.subplots()
         ax.plot(df["year"], df["Number of Competitions"], color="tab:blue", marker="o", linewidth=2, zorder=2)
@@ -372,11 +392,8 @@ def plot_unique_competitor_distribution(
     try:
         logger.info(f"Creating figure: Competitor Distribution for nationality {config.nationality}")
 
-        if "newcomers" not in db_tables:
-            logger.warning("'newcomers' table not found in db_tables; skipping plot.")
-            return None
-
-        df = db_tables["newcomers"].query("year > 2000")
+        newcomers = uw.get_product("newcomers", db_tables, config, logger)
+        df = newcomers.query("year > 2000")
 
         fig, ax = plt.subplots()
         ax.bar(df["year"], df["Competitors"], color="#eee600", zorder=2, label="Competitors")
@@ -393,7 +410,7 @@ def plot_unique_competitor_distribution(
         plt.setp(ax.get_xticklabels(), rotation=45, ha="center")
 
         # --- Footnote for total competitors ---
-        tot = db_tables["newcomers"]["Newcomer"].sum().astype(int)
+        tot = newcomers["Newcomer"].sum().astype(int)
         if tot:
             note = f"The WCA has registered {tot} competitors from {config.country}."
             fig.text(0.5, 0.005, note, ha="center", fontsize=9, color="dimgray", style="italic")
@@ -418,11 +435,8 @@ def plot_newcomers_ratio(
     try:
         logger.info(f"Creating figure: Newcomer Ratios for {config.nationality}")
 
-        if "newcomers" not in db_tables:
-            logger.warning("'newcomers' table not found in db_tables; skipping plot.")
-            return None
-
-        df = db_tables["newcomers"].query("year > 2000")
+        newcomers = uw.get_product("newcomers", db_tables, config, logger)
+        df = newcomers.query("year > 2000")
 
         fig, ax = plt.subplots()
         ax.grid(which="major", axis="y", zorder=1)
@@ -466,11 +480,8 @@ def plot_gender_distribution_vert(
     try:
         logger.info("Creating gender-based competitor distribution plot...")
 
-        if "newcomers" not in db_tables:
-            logger.warning("'newcomers' table not found in db_tables; skipping plot.")
-            return None
-
-        df = db_tables["newcomers"].query("year > 2000")
+        newcomers = uw.get_product("newcomers", db_tables, config, logger)
+        df = newcomers.query("year > 2000")
 
         fig, (ax_m, ax_f) = plt.subplots(2, sharex=True, figsize=(10, 12))
         fig.suptitle(f"Number of Unique Competitors by Gender - {config.nationality}", fontweight="bold")
@@ -532,11 +543,8 @@ def plot_gender_distribution_area(
     try:
         logger.info("Creating stacked area chart for gender share over time...")
 
-        if "newcomers" not in db_tables:
-            logger.warning("'newcomers' table not found in db_tables; skipping plot.")
-            return None
-
-        df = db_tables["newcomers"].query("year > 2000").copy()
+        newcomers = uw.get_product("newcomers", db_tables, config, logger)
+        df = newcomers.query("year > 2000").copy()
 
         # --- Compute percentage per gender ---
         df["Male %"] = df["Competitors M"] / df["Competitors"] * 100
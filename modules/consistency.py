@@ -0,0 +1,421 @@
+import pandas as pd
+import numpy as np
+import logging
+import configparser
+from dataclasses import dataclass
+import utils_wca as uw
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+_AO5_FORMAT = "a"
+_MEAN_FORMATS = ("m", "3")      # Mo3, and Bo3 results that carry a mean
+_MBLD_EVENT = "333mbf"
+_FMC_EVENT = "333fm"
+_TOP_N = 100
+
+# Results per block when streaming the attempt matrix; bounds the temporaries
+# at a few tens of MB whatever the size of the export.
+_CHUNK_ROWS = 500_000
+
+# Raw export columns this module reads, directly or through the pre-filtered
+# tables built by process_tables (see uw.resolve_table_columns).
+REQUIRED_COLUMNS = {
+    "results": [
+        "id", "average", "competition_id", "event_id", "format_id",
+        "person_name", "person_id", "person_country_id",
+    ],
+    "attempts": ["value", "attempt_number", "result_id"],
+    "persons": ["wca_id", "name", "sub_id", "country_id"],
+    "countries": ["id", "name"],
+}
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _get_settings(config: configparser.ConfigParser, logger: logging.Logger) -> tuple[list[str], int, int]:
+    """
+    Read [consistency] -> event_list / min_solves / min_competitors.
+    Falls back to ['333'], 25 and 10 with a warning if the section is missing.
+    """
+    if not config.has_section("consistency"):
+        logger.warning("Missing [consistency] section in config.ini; defaulting to ['333'].")
+        return ["333"], 25, 10
+
+    cfg = config["consistency"]
+    events = [e.strip() for e in cfg.get("event_list", "333").split(",") if e.strip()]
+    return events, int(cfg.get("min_solves", 25)), int(cfg.get("min_competitors", 10))
+
+
+def _chunks(n: int):
+    """Consecutive slices of at most _CHUNK_ROWS rows covering range(n)."""
+    for start in range(0, n, _CHUNK_ROWS):
+        yield slice(start, min(start + _CHUNK_ROWS, n))
+
+
+def _to_display_units(values: pd.Series, event: str) -> pd.Series:
+    """Centiseconds to seconds (FMC stays in moves), rounded for the CSVs."""
+    return (values if event == _FMC_EVENT else values / 100).round(2)
+
+
+def dispersion(values: np.ndarray, filled: np.ndarray, trim: int) -> dict[str, np.ndarray]:
+    """
+    Per-row dispersion of fixed-width attempt rows (every row has all its
+    attempts), in the units of `values`.
+
+    The attempts are sorted along the attempt axis with DNF/DNS as +inf and
+    the `trim` fastest and slowest dropped, leaving the counting solves
+    (trim=1 for Ao5, 0 for means of 3).
+
+    Returns
+    -------
+    dict of (N,) arrays
+        std    : population std of the counting solves (as sql/Results/std_*.sql)
+        spread : slowest - fastest counting solve
+        range  : slowest - fastest attempt
+        dnfs   : DNF/DNS attempts
+    Measures involving a DNF are NaN.
+    """
+    solved = filled & (values > 0)
+    ordered = np.sort(np.where(solved, values, np.inf), axis=1)
+    k = ordered.shape[1]
+    counting = ordered[:, trim:k - trim]
+
+    with np.errstate(invalid="ignore"):
+        ok = np.isfinite(counting[:, -1])
+        std = np.where(ok, counting.std(axis=1), np.nan)
+        spread = np.where(ok, counting[:, -1] - counting[:, 0], np.nan)
+        rng = np.where(np.isfinite(ordered[:, -1]), ordered[:, -1] - ordered[:, 0], np.nan)
+
+    return {"std": std, "spread": spread, "range": rng, "dnfs": (filled & ~solved).sum(axis=1)}
+
+
+@dataclass
+class RunningStats:
+    """
+    Streaming mean/variance for many groups at once (Welford, with Chan's
+    formula to merge one block of observations at a time). Memory is three
+    arrays of n_groups floats, however many observations are fed in.
+    """
+    count: np.ndarray
+    mean: np.ndarray
+    m2: np.ndarray
+
+    @classmethod
+    def empty(cls, n_groups: int) -> "RunningStats":
+        return cls(np.zeros(n_groups), np.zeros(n_groups), np.zeros(n_groups))
+
+    def update(self, groups: np.ndarray, x: np.ndarray):
+        """Add observations `x`, one per entry of the group codes `groups`."""
+        n = len(self.count)
+        count_b = np.bincount(groups, minlength=n).astype(np.float64)
+        seen = count_b > 0
+        mean_b = np.zeros(n)
+        mean_b[seen] = np.bincount(groups, weights=x, minlength=n)[seen] / count_b[seen]
+        m2_b = np.bincount(groups, weights=(x - mean_b[groups]) ** 2, minlength=n)
+
+        total = self.count + count_b
+        delta = mean_b - self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = np.where(seen, count_b / total, 0.0)
+        self.mean += delta * ratio
+        self.m2 += m2_b + delta ** 2 * self.count * ratio
+        self.count = total
+
+    @property
+    def std(self) -> np.ndarray:
+        """Population standard deviation per group (NaN for empty groups)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(np.where(self.count > 0, self.m2 / self.count, np.nan))
+
+
+###################################################################
+######################### COMPUTATIONS ############################
+###################################################################
+
+
+@uw.product("result_dispersion", deps=("results", "attempt_matrix"), persist=True)
+def _build_result_dispersion(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger
+) -> pd.DataFrame:
+    """
+    Product 'result_dispersion': trimmed std, counting-solve spread, range
+    and DNF count of every Ao5/Mo3/Bo3 result with all its attempts, from
+    block-wise passes over the attempt matrix.
+    """
+    results = db_tables["results"]
+    matrix = db_tables["attempt_matrix"]
+    fmt = results["format_id"]
+    not_mbld = (results["event_id"] != _MBLD_EVENT).to_numpy()
+
+    parts = []
+    for formats, width, trim in (((_AO5_FORMAT,), 5, 1), (_MEAN_FORMATS, 3, 0)):
+        rows = np.flatnonzero(fmt.isin(formats).to_numpy() & not_mbld & matrix.filled[:, :width].all(axis=1))
+        if not len(rows):
+            continue
+
+        metrics = {"std": [], "spread": [], "range": [], "dnfs": []}
+        for block in _chunks(len(rows)):
+            sub = matrix.rows(rows[block])
+            for name, arr in dispersion(sub.values[:, :width], sub.filled[:, :width], trim).items():
+                metrics[name].append(arr)
+
+        parts.append(
+            results.iloc[rows][[
+                "id", "event_id", "person_id", "person_name", "person_country_id", "competition_id", "average",
+            ]].assign(
+                std=np.concatenate(metrics["std"]).astype(np.float32),
+                spread=np.concatenate(metrics["spread"]).astype(np.float32),
+                range=np.concatenate(metrics["range"]).astype(np.float32),
+                dnfs=np.concatenate(metrics["dnfs"]).astype(np.int8),
+            )
+        )
+
+    df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+    logger.info(f"Computed dispersion metrics for {len(df):,} results.")
+    return df
+
+
+@uw.product("solve_summary", deps=("results", "attempt_matrix"), persist=True)
+def _build_solve_summary(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger
+) -> pd.DataFrame:
+    """
+    Product 'solve_summary': per (person, event), the number of attempts and
+    DNFs and the running mean/std of all successful solves, streamed through
+    RunningStats one block of the attempt matrix at a time. MBLD is skipped
+    (its values are not times).
+    """
+    results = db_tables["results"]
+    matrix = db_tables["attempt_matrix"]
+
+    person = results["person_id"].cat.codes.to_numpy().astype(np.int64)
+    event = results["event_id"].cat.codes.to_numpy().astype(np.int64)
+    n_events = len(results["event_id"].cat.categories)
+    group = person * n_events + event
+    n_groups = len(results["person_id"].cat.categories) * n_events
+
+    keep = (results["event_id"] != _MBLD_EVENT).to_numpy() & (person >= 0) & (event >= 0)
+
+    stats = RunningStats.empty(n_groups)
+    attempts = np.zeros(n_groups)
+    dnfs = np.zeros(n_groups)
+
+    for block in _chunks(len(results)):
+        sub = matrix.rows(block)
+        filled = sub.filled & keep[block, None]
+        solved = filled & (sub.values > 0)
+        g = np.broadcast_to(group[block, None], filled.shape)
+
+        attempts += np.bincount(g[filled], minlength=n_groups)
+        dnfs += np.bincount(g[filled & ~solved], minlength=n_groups)
+        stats.update(g[solved], sub.values[solved].astype(np.float64))
+
+    seen = np.flatnonzero(attempts > 0)
+    df = pd.DataFrame({
+        "person_id": pd.Categorical.from_codes(seen // n_events, dtype=results["person_id"].dtype),
+        "event_id": pd.Categorical.from_codes(seen % n_events, dtype=results["event_id"].dtype),
+        "attempts": attempts[seen].astype(np.int32),
+        "dnfs": dnfs[seen].astype(np.int32),
+        "solves": stats.count[seen].astype(np.int32),
+        "mean": stats.mean[seen],
+        "std": stats.std[seen],
+    })
+    df.loc[df["solves"] == 0, "mean"] = np.nan
+
+    logger.info(f"Computed solve summaries for {len(df):,} person/event pairs.")
+    return df
+
+
+def compute_most_consistent_averages(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger,
+    event: str
+) -> pd.DataFrame:
+    """
+    Top-N completed averages of the nationality's competitors in `event`,
+    ranked by the standard deviation of the counting solves.
+    """
+    try:
+        nationality = config.nationality
+        logger.info(f"Computing most consistent {event} averages for {nationality}...")
+
+        df = uw.get_product("result_dispersion", db_tables, config, logger)
+        df = df[(df["event_id"] == event) & (df["person_country_id"] == nationality) & df["std"].notna()]
+        if df.empty:
+            logger.warning(f"No complete {event} averages found for {nationality}.")
+            return pd.DataFrame()
+
+        df = df.sort_values(["std", "average"]).head(_TOP_N)
+        out = pd.DataFrame({
+            "Name": df["person_name"].to_numpy(),
+            "WCAID": df["person_id"].astype(str).to_numpy(),
+            "Competition": df["competition_id"].astype(str).to_numpy(),
+            "Average": uw.format_results(df["average"], event, logger).to_numpy(),
+            "Std": _to_display_units(df["std"], event).to_numpy(),
+            "Spread": _to_display_units(df["spread"], event).to_numpy(),
+            "Range": _to_display_units(df["range"], event).to_numpy(),
+        })
+        out.index += 1
+        return out
+
+    except Exception as e:
+        logger.error(f"Error computing most consistent averages for {event}: {e}", exc_info=True)
+        return pd.DataFrame()
+
+
+def _person_consistency(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger,
+    event: str,
+    min_solves: int
+) -> pd.DataFrame:
+    """
+    solve_summary rows for `event` with at least `min_solves` solves, joined
+    to current name and nationality, with CV (std / mean) and DNF rate.
+    """
+    summary = uw.get_product("solve_summary", db_tables, config, logger)
+    df = summary[(summary["event_id"] == event) & (summary["solves"] >= min_solves)]
+
+    persons = uw.get_current_persons(db_tables, ["wca_id", "name", "country_id"])
+    df = df.merge(persons, left_on="person_id", right_on="wca_id", how="inner")
+
+    return df.assign(cv=df["std"] / df["mean"], dnf_rate=df["dnfs"] / df["attempts"])
+
+
+def compute_most_consistent_competitors(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger,
+    event: str,
+    min_solves: int
+) -> pd.DataFrame:
+    """
+    The nationality's competitors in `event` with at least `min_solves`
+    solves, ranked by coefficient of variation of all their solves (std
+    relative to their mean, so fast and slow solvers compare fairly).
+    """
+    try:
+        nationality = config.nationality
+        logger.info(f"Computing most consistent {event} competitors for {nationality}...")
+
+        df = _person_consistency(db_tables, config, logger, event, min_solves)
+        df = df[df["country_id"] == nationality].sort_values(["cv", "dnf_rate"]).head(_TOP_N)
+        if df.empty:
+            logger.warning(f"No {nationality} competitors with {min_solves}+ solves in {event}.")
+            return pd.DataFrame()
+
+        out = pd.DataFrame({
+            "Name": df["name"].to_numpy(),
+            "WCAID": df["wca_id"].astype(str).to_numpy(),
+            "Solves": df["solves"].to_numpy(),
+            "Mean": _to_display_units(df["mean"], event).to_numpy(),
+            "Std": _to_display_units(df["std"], event).to_numpy(),
+            "CV %": (df["cv"] * 100).round(2).to_numpy(),
+            "DNF %": (df["dnf_rate"] * 100).round(2).to_numpy(),
+        })
+        out.index += 1
+        return out
+
+    except Exception as e:
+        logger.error(f"Error computing most consistent competitors for {event}: {e}", exc_info=True)
+        return pd.DataFrame()
+
+
+def compute_most_consistent_countries(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger,
+    event_list: list[str],
+    min_solves: int,
+    min_competitors: int
+) -> pd.DataFrame:
+    """
+    For each event, countries (current nationality) with at least
+    `min_competitors` competitors of `min_solves`+ solves, ranked by the
+    median competitor CV; the pooled DNF rate is shown alongside.
+    """
+    try:
+        logger.info(f"Computing most consistent countries for {event_list}...")
+
+        frames = []
+        for event in event_list:
+            df = _person_consistency(db_tables, config, logger, event, min_solves)
+            if df.empty:
+                continue
+
+            by_country = (
+                df.groupby("country_id", observed=True)
+                .agg(Competitors=("wca_id", "size"), cv=("cv", "median"), dnfs=("dnfs", "sum"), attempts=("attempts", "sum"))
+                .query("Competitors >= @min_competitors")
+                .sort_values("cv")
+                .reset_index()
+            )
+            by_country.insert(0, "Event", event)
+            by_country.insert(1, "Rank", np.arange(1, len(by_country) + 1))
+            frames.append(by_country)
+
+        if not frames:
+            logger.warning(f"No country reaches {min_competitors} competitors with {min_solves}+ solves.")
+            return pd.DataFrame()
+
+        df = pd.concat(frames, ignore_index=True).merge(
+            db_tables["countries"][["id", "name"]], left_on="country_id", right_on="id", how="left",
+        )
+        out = pd.DataFrame({
+            "Event": df["Event"].to_numpy(),
+            "Rank": df["Rank"].to_numpy(),
+            "Country": df["name"].to_numpy(),
+            "Competitors": df["Competitors"].to_numpy(),
+            "Median CV %": (df["cv"] * 100).round(2).to_numpy(),
+            "DNF %": (df["dnfs"] / df["attempts"] * 100).round(2).to_numpy(),
+        })
+        out.index += 1
+        return out
+
+    except Exception as e:
+        logger.error(f"Error computing most consistent countries: {e}", exc_info=True)
+        return pd.DataFrame()
+
+
+###################################################################
+############################### RUN ###############################
+###################################################################
+
+
+def run(db_tables, config):
+
+    logger = logging.getLogger(__name__)
+    logger.info("Producing stats for Consistency module")
+
+    event_list, min_solves, min_competitors = _get_settings(config, logger)
+    logger.info(f"Consistency stats will be computed for: {event_list}")
+
+    # --- Tables ---
+    results = {
+        "Most Consistent Countries": compute_most_consistent_countries(
+            db_tables, config, logger, event_list, min_solves, min_competitors,
+        ),
+    }
+
+    for event in event_list:
+        results[f"Most Consistent Averages {event}"] = compute_most_consistent_averages(db_tables, config, logger, event)
+        results[f"Most Consistent Competitors {event}"] = compute_most_consistent_competitors(
+            db_tables, config, logger, event, min_solves,
+        )
+
+    figures = {}
+
+    section_name = __name__.split(".")[-1]
+    uw.export_data(results, figures=figures, section_name=section_name, config=config, logger=logger)
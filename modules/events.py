@@ -18,6 +18,20 @@ _MBLD_EVENT = "333mbf"
 # Sentinels used by the WCA for DNF (-1) / DNS (-2) / no attempt (0)
 _INVALID_RESULT_VALUES = [0, -1, -2]
 
+# Raw export columns this module reads, directly or through the pre-filtered
+# tables built by process_tables (see uw.resolve_table_columns).
+REQUIRED_COLUMNS = {
+    "results": [
+        "pos", "best", "average", "competition_id", "round_type_id", "event_id",
+        "person_id", "regional_single_record", "regional_average_record",
+    ],
+    "persons": ["wca_id", "name", "sub_id", "country_id"],
+    "ranks_single": ["person_id", "event_id", "best"],
+    "ranks_average": ["person_id", "event_id", "best"],
+    "competitions": ["id", "country_id", "event_specs", "year", "month", "day"],
+    "championships": ["competition_id", "championship_type"],
+}
+
 
 ###################################################################
 ######################### COMPUTATIONS ############################
@@ -40,7 +54,7 @@ def compute_most_events_won(
             results.query("round_type_id in @_FINAL_ROUND_TYPES & pos == 1")
             .replace(_INVALID_RESULT_VALUES, np.nan)
             .dropna(subset=["best"])
-            .groupby("person_id")["event_id"]
+            .groupby("person_id", observed=True)["event_id"]
             .nunique()
             .rename("Different Events Won")
             .reset_index()
@@ -87,7 +101,7 @@ def compute_most_events_podiumed(
             results.query("round_type_id in @_FINAL_ROUND_TYPES & pos <= 3")
             .replace(_INVALID_RESULT_VALUES, np.nan)
             .dropna(subset=["best"])
-            .groupby("person_id")["event_id"]
+            .groupby("person_id", observed=True)["event_id"]
             .nunique()
             .rename("Different Events Podiumed")
             .reset_index()
@@ -205,51 +219,56 @@ def compute_most_common_event_combinations(
         return pd.DataFrame()
 
 
-def compute_average_events_per_competition(
+@uw.product("avgevents", deps=("results_country",), persist=True)
+def _build_average_events_per_competition(
     db_tables: dict,
     config: configparser.ConfigParser,
     logger: logging.Logger
 ) -> pd.DataFrame:
-    """
-    For each competition in the configured country, total events held and
-    the average number of events competitors participated in.
+    """Product 'avgevents': events held and average events per competitor, per competition."""
+    country = config.country
+    logger.info(f"Computing average events per competitor for competitions hosted in {country}...")
 
-    Side effect: caches the result in db_tables["avgevents"] for use by
-    compute_most_participated_competition.
-    """
-    try:
-        country = config.country
-        logger.info(f"Computing average events per competitor for competitions hosted in {country}...")
+    results = db_tables["results_country"].copy()
 
-        results = db_tables["results_country"].copy()
+    events_per_competition = (
+        results.groupby("competition_id", observed=True)["event_id"]
+        .nunique()
+        .rename("Events")
+    )
 
-        events_per_competition = (
-            results.groupby("competition_id", observed=True)["event_id"]
-            .nunique()
-            .rename("Events")
-        )
+    avg_events_per_competition = (
+        results.groupby(["competition_id", "person_id"], observed=True)["event_id"]
+        .nunique()
+        .groupby("competition_id", observed=True)
+        .mean()
+        .rename("Avg Events per Competitor")
+    )
 
-        avg_events_per_competition = (
-            results.groupby(["competition_id", "person_id"], observed=True)["event_id"]
-            .nunique()
-            .groupby("competition_id")
-            .mean()
-            .rename("Avg Events per Competitor")
-        )
+    avgevents = (
+        pd.concat([events_per_competition, avg_events_per_competition], axis=1)
+        .reset_index()
+        .sort_values(by="Avg Events per Competitor", ascending=False)
+        .reset_index(drop=True)
+    )
+    avgevents.index += 1
+    avgevents = avgevents.rename(columns={"competition_id": "Competition"})
 
-        avgevents = (
-            pd.concat([events_per_competition, avg_events_per_competition], axis=1)
-            .reset_index()
-            .sort_values(by="Avg Events per Competitor", ascending=False)
-            .reset_index(drop=True)
-        )
-        avgevents.index += 1
-        avgevents = avgevents.rename(columns={"competition_id": "Competition"})
+    logger.info(f"Computed average events per competitor for {len(avgevents)} competitions in {country}.")
+    return avgevents
 
-        db_tables["avgevents"] = avgevents
 
-        logger.info(f"Computed average events per competitor for {len(avgevents)} competitions in {country}.")
-        return avgevents
+def compute_average_events_per_competition(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger
+) -> pd.DataFrame:
+    """
+    For each competition in the configured country, total events held and
+    the average number of events competitors participated in (product 'avgevents').
+    """
+    try:
+        return uw.get_product("avgevents", db_tables, config, logger)
 
     except Exception as e:
         logger.error(f"Error computing average events per competition: {e}", exc_info=True)
@@ -262,20 +281,16 @@ def compute_most_participated_competition(
     logger: logging.Logger
 ) -> pd.DataFrame:
     """
-    Rank competitions by avg-events-per-competitor / total-events ratio.
-    Requires compute_average_events_per_competition to have run first
-    (reads db_tables["avgevents"]).
+    Rank competitions by avg-events-per-competitor / total-events ratio
+    (built on product 'avgevents').
     """
     try:
         country = config.country
         logger.info(f"Computing most competed competitions in {country}...")
 
-        avgevents = db_tables.get("avgevents", pd.DataFrame())
+        avgevents = uw.get_product("avgevents", db_tables, config, logger)
         if avgevents.empty:
-            logger.warning(
-                "'avgevents' table not available "
-                "(did compute_average_events_per_competition run?). Skipping."
-            )
+            logger.warning(f"No competitions hosted in {country}. Skipping.")
             return pd.DataFrame()
 
         results = avgevents.copy()
@@ -300,6 +315,17 @@ def compute_most_participated_competition(
 ###################################################################
 
 
+def _complete_pb_set(db_tables: dict, nationality: str, kind: str, events: list[str]) -> set:
+    """
+    Helper for Bronze/Silver: person_ids of `nationality` with a `kind`
+    (single/average) PB in every one of `events`, from the pb_matrix.
+    """
+    pbs = db_tables["pb_matrix"]
+    pool = pbs.persons(nationality)
+    complete = ~np.isnan(pbs.values(kind, events, pool)).any(axis=1)
+    return set(pbs.person_ids(pool[complete]).astype(str))
+
+
 def compute_bronze_membership(
     db_tables: dict,
     config: configparser.ConfigParser,
@@ -312,37 +338,28 @@ def compute_bronze_membership(
         nationality = config.nationality
         logger.info(f"Computing Bronze Membership for competitors from {nationality}...")
 
-        results = db_tables["results_fixed"].copy()
+        results = db_tables["results_fixed"]
         persons = db_tables["persons"].copy()
 
         events = config.current_events
-        num_events_needed = len(events)
+        bronze_ids = _complete_pb_set(db_tables, nationality, "single", events)
+
+        if not bronze_ids:
+            logger.info("No bronze members found.")
+            return pd.DataFrame(columns=["WCAID", "Name", "Last Event", "Completion Date"])
 
-        # --- Earliest valid single for each (person, event) ---
+        # --- Earliest valid single of each bronze member in each event ---
         first_result_date = (
-            results.query("best > 0 and event_id in @events")
+            results[results["person_id"].isin(bronze_ids)]
+            .query("best > 0 and event_id in @events")
             .sort_values("date")
             .groupby(["person_id", "event_id"], observed=True, as_index=False)
             .first()
         )
 
-        # --- Count unique events completed per person ---
-        events_per_person = (
-            first_result_date.groupby("person_id", observed=True)["event_id"]
-            .nunique()
-            .rename("num_events")
-            .reset_index()
-        )
-
-        bronze_ids = events_per_person.query("num_events == @num_events_needed")["person_id"].tolist()
-
-        if not bronze_ids:
-            logger.info("No bronze members found.")
-            return pd.DataFrame(columns=["WCAID", "Name", "Last Event", "Completion Date"])
-
         # --- Find when each bronze member completed their last required event ---
         last_event_date = (
-            first_result_date[first_result_date["person_id"].isin(bronze_ids)]
+            first_result_date
             .sort_values("date", ascending=False)
             .groupby("person_id", observed=True, as_index=False)
             .first()
@@ -369,73 +386,76 @@ def compute_bronze_membership(
         return pd.DataFrame()
 
 
-def compute_silver_membership(
+@uw.product("silver", deps=("results_fixed", "persons", "pb_matrix"), persist=True)
+def _build_silver_members(
     db_tables: dict,
     config: configparser.ConfigParser,
     logger: logging.Logger
 ) -> pd.DataFrame:
     """
-    Silver Membership: competitors with an official AVERAGE in all current
-    WCA events (excluding MBLD, which has no 'average' format).
-
-    Side effect: caches the result in db_tables["silver"] for use by
-    compute_gold_membership / compute_platinum_membership.
+    Product 'silver': competitors with an official AVERAGE in all current
+    WCA events (excluding MBLD, which has no 'average' format). Empty if
+    there are none.
     """
-    try:
-        nationality = config.nationality
-        logger.info(f"Computing Silver Membership for competitors from {nationality}...")
+    nationality = config.nationality
+    logger.info(f"Computing Silver Membership for competitors from {nationality}...")
 
-        results = db_tables["results_fixed"].copy()
-        persons = db_tables["persons"].copy()
+    results = db_tables["results_fixed"]
+    persons = db_tables["persons"].copy()
 
-        events = [e for e in config.current_events if e != _MBLD_EVENT]
-        num_events_needed = len(events)
+    events = [e for e in config.current_events if e != _MBLD_EVENT]
+    silver_ids = _complete_pb_set(db_tables, nationality, "average", events)
 
-        # --- Earliest valid average for each (person, event) ---
-        first_result_date = (
-            results.query("average > 0 and event_id in @events")
-            .sort_values("date")
-            .groupby(["person_id", "event_id"], observed=True, as_index=False)
-            .first()
-        )
-
-        events_per_person = (
-            first_result_date.groupby("person_id", observed=True)["event_id"]
-            .nunique()
-            .rename("num_events")
-            .reset_index()
-        )
+    if not silver_ids:
+        logger.info("No silver members found.")
+        return pd.DataFrame()
 
-        silver_ids = events_per_person.query("num_events == @num_events_needed")["person_id"].tolist()
+    # --- Earliest valid average of each silver member in each event ---
+    first_result_date = (
+        results[results["person_id"].isin(silver_ids)]
+        .query("average > 0 and event_id in @events")
+        .sort_values("date")
+        .groupby(["person_id", "event_id"], observed=True, as_index=False)
+        .first()
+    )
 
-        if not silver_ids:
-            logger.info("No silver members found.")
-            db_tables["silver"] = pd.DataFrame()
-            return pd.DataFrame(columns=["WCAID", "Name", "Last Event", "Completion Date"])
+    last_event_date = (
+        first_result_date
+        .sort_values("date", ascending=False)
+        .groupby("person_id", observed=True, as_index=False)
+        .first()
+        [["person_id", "event_id", "date"]]
+        .rename(columns={"event_id": "Last Event", "date": "Completion Date"})
+    )
 
-        last_event_date = (
-            first_result_date[first_result_date["person_id"].isin(silver_ids)]
-            .sort_values("date", ascending=False)
-            .groupby("person_id", observed=True, as_index=False)
-            .first()
-            [["person_id", "event_id", "date"]]
-            .rename(columns={"event_id": "Last Event", "date": "Completion Date"})
-        )
+    silver = (
+        persons[["wca_id", "name"]]
+        .drop_duplicates()
+        .merge(last_event_date, left_on="wca_id", right_on="person_id", how="inner")
+        .drop(columns="person_id")
+        .rename(columns={"wca_id": "WCAID", "name": "Name"})
+        .sort_values("Completion Date", ascending=True)
+        .reset_index(drop=True)
+    )
+    silver.index += 1
 
-        silver = (
-            persons[["wca_id", "name"]]
-            .drop_duplicates()
-            .merge(last_event_date, left_on="wca_id", right_on="person_id", how="inner")
-            .drop(columns="person_id")
-            .rename(columns={"wca_id": "WCAID", "name": "Name"})
-            .sort_values("Completion Date", ascending=True)
-            .reset_index(drop=True)
-        )
-        silver.index += 1
+    logger.info(f"Identified {len(silver)} silver members from {nationality}.")
+    return silver
 
-        db_tables["silver"] = silver
 
-        logger.info(f"Identified {len(silver)} silver members from {nationality}.")
+def compute_silver_membership(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger
+) -> pd.DataFrame:
+    """
+    Silver Membership: competitors with an official AVERAGE in all current
+    WCA events (excluding MBLD, which has no 'average' format).
+    """
+    try:
+        silver = uw.get_product("silver", db_tables, config, logger)
+        if silver.empty:
+            return pd.DataFrame(columns=["WCAID", "Name", "Last Event", "Completion Date"])
         return silver
 
     except Exception as e:
@@ -443,26 +463,18 @@ def compute_silver_membership(
         return pd.DataFrame()
 
 
-def _get_record_holder_sets(results: pd.DataFrame) -> tuple[set, set]:
+def _get_record_holder_sets(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> tuple[set, set]:
     """
-    Helper for Gold/Platinum: compute two sets of person_ids —
-      - has_wr: anyone with a 'WR' tag (single or average)
-      - has_cr: anyone with a continental-record tag (anything that is
-        neither 'WR' nor 'NR', matched implicitly so this works for any
-        continent: ER, AsR, AfR, NAR, SAR, OcR).
+    Helper for Gold/Platinum: compute two sets of person_ids, from the
+    record flags of product 'person_record_counts' —
+      - has_wr: anyone with a WR (single or average)
+      - has_cr: anyone with a continental record (ER, AsR, AfR, NAR, SAR, OcR)
     """
-    record_cols = ["regional_single_record", "regional_average_record"]
-    record_df = results[record_cols + ["person_id"]].copy()
+    holders = uw.get_product("person_record_counts", db_tables, config, logger)
+    tags = holders["record_tags"].to_numpy()
 
-    has_wr = record_df[
-        record_df[record_cols].apply(lambda x: x.str.contains("WR", na=False)).any(axis=1)
-    ]["person_id"].unique()
-
-    has_cr = record_df[
-        record_df[record_cols].apply(
-            lambda x: x.notna() & ~x.str.contains("WR|NR", na=False)
-        ).any(axis=1)
-    ]["person_id"].unique()
+    has_wr = holders.loc[(tags & uw.RECORD_WR) != 0, "person_id"].astype(str)
+    has_cr = holders.loc[(tags & uw.RECORD_CR) != 0, "person_id"].astype(str)
 
     return set(has_wr), set(has_cr)
 
@@ -490,15 +502,14 @@ def compute_gold_membership(
         - World Championship podium
         - Continental Record
         - World Record
-    Requires compute_silver_membership to have run first.
+    Filtered from product 'silver'.
     """
     try:
         nationality = config.nationality
         logger.info(f"Computing Gold Membership for competitors from {nationality}...")
 
         persons = db_tables["persons"]
-        results = db_tables["results_fixed"]
-        silver = db_tables.get("silver", pd.DataFrame())
+        silver = uw.get_product("silver", db_tables, config, logger)
 
         if silver.empty:
             logger.warning("No silver members found — gold membership cannot be computed.")
@@ -506,7 +517,7 @@ def compute_gold_membership(
 
         silver_ids = set(silver["WCAID"])
         wc_podium_set = _get_world_championship_podium_set(db_tables)
-        wr_set, cr_set = _get_record_holder_sets(results)
+        wr_set, cr_set = _get_record_holder_sets(db_tables, config, logger)
 
         gold_ids = [
             pid for pid in silver_ids
@@ -554,15 +565,14 @@ def compute_platinum_membership(
         - World Championship podium
         - Continental Record
         - World Record
-    Requires compute_silver_membership to have run first.
+    Filtered from product 'silver'.
     """
     try:
         nationality = config.nationality
         logger.info(f"Computing Platinum Membership for competitors from {nationality}...")
 
         persons = db_tables["persons"]
-        results = db_tables["results_fixed"]
-        silver = db_tables.get("silver", pd.DataFrame())
+        silver = uw.get_product("silver", db_tables, config, logger)
 
         if silver.empty:
             logger.warning("No silver members found — platinum membership cannot be computed.")
@@ -570,7 +580,7 @@ def compute_platinum_membership(
 
         silver_ids = set(silver["WCAID"])
         wc_podium_set = _get_world_championship_podium_set(db_tables)
-        wr_set, cr_set = _get_record_holder_sets(results)
+        wr_set, cr_set = _get_record_holder_sets(db_tables, config, logger)
 
         plat_ids = [
             pid for pid in silver_ids
@@ -616,7 +626,6 @@ def run(db_tables, config):
         "Event Combinations": compute_most_common_event_combinations(db_tables=db_tables, config=config, logger=logger),
         "Avg Events per Competition": compute_average_events_per_competition(db_tables=db_tables, config=config, logger=logger),
         "Most Participated Competitions": compute_most_participated_competition(db_tables=db_tables, config=config, logger=logger),
-        # Silver must be computed before Gold/Platinum (they read db_tables["silver"])
         "Bronze Membership": compute_bronze_membership(db_tables=db_tables, config=config, logger=logger),
         "Silver Membership": compute_silver_membership(db_tables=db_tables, config=config, logger=logger),
         "Gold Membership": compute_gold_membership(db_tables=db_tables, config=config, logger=logger),
@@ -0,0 +1,196 @@
+import pandas as pd
+import logging
+import configparser
+import matplotlib.pyplot as plt
+from matplotlib.ticker import FuncFormatter
+import utils_wca as uw
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+_KINDS = ("single", "average")
+
+# Raw export columns this module reads, directly or through the pre-filtered
+# tables built by process_tables (see uw.resolve_table_columns).
+REQUIRED_COLUMNS = {
+    "results": ["best", "average", "competition_id", "event_id", "person_id"],
+    "persons": ["wca_id", "name", "sub_id", "country_id"],
+    "competitions": ["id", "year", "month", "day"],
+    "countries": ["id", "continent_id"],
+}
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _get_plot_settings(config: configparser.ConfigParser, logger: logging.Logger) -> tuple[str, str, int]:
+    """
+    Read [rankings] -> plot_event / plot_kind / plot_top for the rank evolution plot.
+    Falls back to 333 average, top 5 with a warning if the section is missing.
+    """
+    if not config.has_section("rankings"):
+        logger.warning("Missing [rankings] section in config.ini; defaulting to 333 average, top 5.")
+        return "333", "average", 5
+
+    cfg = config["rankings"]
+    return cfg.get("plot_event", "333").strip(), cfg.get("plot_kind", "average").strip(), int(cfg.get("plot_top", 5))
+
+
+###################################################################
+######################### COMPUTATIONS ############################
+###################################################################
+
+
+def compute_national_number_ones(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger,
+    kind: str
+) -> pd.DataFrame:
+    """
+    Every change of national #1 (`kind` = single/average) in the current
+    events, from month-end ranking snapshots: who held it from which month,
+    with what result and at which world rank. Ties list all holders.
+    """
+    try:
+        nationality = config.nationality
+        logger.info(f"Computing national #1 {kind} history for {nationality}...")
+
+        history = db_tables[f"rankings_history_{kind}"]
+        persons = uw.get_current_persons(db_tables).set_index("wca_id")["name"]
+        dates = history.month_ends()
+
+        frames = []
+        for event in config.current_events:
+            snaps = history.snapshots(event, dates, country_id=nationality).query("country_rank == 1")
+            if snaps.empty:
+                continue
+
+            snaps = snaps.assign(
+                person_id=snaps["person_id"].astype(str),
+                name=snaps["person_id"].map(persons).astype(str),
+            )
+            holders = (
+                snaps.sort_values(["date", "person_id"])
+                .groupby("date", as_index=False)
+                .agg(WCAID=("person_id", " / ".join), Name=("name", " / ".join), best=("best", "first"), world_rank=("world_rank", "first"))
+            )
+
+            # Keep the months where holder or result changed
+            changed = (holders[["WCAID", "best"]] != holders[["WCAID", "best"]].shift()).any(axis=1)
+            holders = holders[changed]
+            holders.insert(0, "Event", event)
+            frames.append(holders)
+
+        if not frames:
+            logger.warning(f"No {kind} rankings found for {nationality}.")
+            return pd.DataFrame()
+
+        df = pd.concat(frames, ignore_index=True)
+        out = pd.DataFrame({
+            "Event": df["Event"],
+            "Since": df["date"].dt.strftime("%Y-%m"),
+            "WCAID": df["WCAID"],
+            "Name": df["Name"],
+            "Result": uw.format_results(df["best"], df["Event"], logger),
+            "World Rank": df["world_rank"],
+        })
+        out.index += 1
+        return out
+
+    except Exception as e:
+        logger.error(f"Error computing national #1 {kind} history: {e}", exc_info=True)
+        return pd.DataFrame()
+
+
+###################################################################
+############################# PLOTS ###############################
+###################################################################
+
+
+def plot_rank_evolution(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger,
+    event_id: str,
+    kind: str,
+    top: int
+) -> plt.Figure | None:
+    """
+    World rank at each month end of today's national top `top` in
+    `event_id` (`kind` = single/average), on a log scale.
+    """
+    try:
+        nationality = config.nationality
+        logger.info(f"Plotting {event_id} {kind} world rank evolution for the {nationality} top {top}...")
+
+        history = db_tables[f"rankings_history_{kind}"]
+        snaps = history.snapshots(event_id, history.month_ends(), country_id=nationality)
+        if snaps.empty:
+            logger.warning(f"No {event_id} {kind} rankings for {nationality}; skipping plot.")
+            return None
+
+        latest = snaps[snaps["date"] == snaps["date"].max()]
+        leaders = latest.nsmallest(top, "country_rank")["person_id"].astype(str).tolist()
+        names = uw.get_current_persons(db_tables).set_index("wca_id")["name"]
+
+        evolution = (
+            snaps.assign(person_id=snaps["person_id"].astype(str))
+            .query("person_id in @leaders")
+            .pivot(index="date", columns="person_id", values="world_rank")
+            .reindex(columns=leaders)
+        )
+
+        fig, ax = plt.subplots()
+        for person_id in leaders:
+            ax.plot(evolution.index, evolution[person_id], label=names.get(person_id, person_id))
+
+        ax.set_yscale("log")
+        ax.invert_yaxis()
+        ax.yaxis.set_major_formatter(FuncFormatter(lambda y, _: f"{y:g}"))
+        ax.yaxis.set_minor_formatter(FuncFormatter(lambda y, _: f"{y:g}"))
+        ax.set_xlabel("Date")
+        ax.set_ylabel("World rank")
+        ax.set_title(f"{nationality} — {event_id} {kind}: world rank of the current top {top}")
+        ax.legend()
+
+        fig.tight_layout()
+        plt.close(fig)
+        return fig
+
+    except Exception as e:
+        logger.error(f"Error plotting {event_id} {kind} rank evolution: {e}", exc_info=True)
+        return None
+
+
+###################################################################
+############################### RUN ###############################
+###################################################################
+
+
+def run(db_tables, config):
+
+    logger = logging.getLogger(__name__)
+    logger.info("Producing stats for Rankings module")
+
+    plot_event, plot_kind, plot_top = _get_plot_settings(config, logger)
+
+    # --- Tables ---
+    results = {
+        f"National Number Ones {kind.title()}": compute_national_number_ones(db_tables, config, logger, kind)
+        for kind in _KINDS
+    }
+
+    # --- Plots ---
+    figures = {
+        f"Rank_Evolution_{plot_event}_{plot_kind}": plot_rank_evolution(
+            db_tables, config, logger, plot_event, plot_kind, plot_top,
+        ),
+    }
+
+    section_name = __name__.split(".")[-1]
+    uw.export_data(results, figures=figures, section_name=section_name, config=config, logger=logger)
@@ -14,6 +14,20 @@ from datetime import datetime
 _FMC_EVENT = "333fm"
 _MBLD_EVENT = "333mbf"
 
+# Raw export columns this module reads, directly or through the pre-filtered
+# tables built by process_tables (see uw.resolve_table_columns).
+REQUIRED_COLUMNS = {
+    "results": [
+        "best", "average", "competition_id", "event_id", "person_name", "person_id",
+        "person_country_id", "regional_single_record", "regional_average_record",
+    ],
+    "ranks_single": ["person_id", "event_id", "best", "country_rank"],
+    "ranks_average": ["person_id", "event_id", "best", "country_rank"],
+    "persons": ["wca_id", "name", "sub_id", "country_id"],
+    "competitions": ["id", "name", "country_id", "year", "month", "day"],
+    "countries": ["id", "continent_id"],
+}
+
 
 def _parse_record_history_list(config: configparser.ConfigParser, logger: logging.Logger) -> list[str]:
     """
@@ -30,11 +44,61 @@ def _parse_record_history_list(config: configparser.ConfigParser, logger: loggin
     return [e.strip() for e in raw.split(",") if e.strip()]
 
 
+def _parse_longest_standing_top(config: configparser.ConfigParser, logger: logging.Logger) -> int:
+    """
+    Read [records] -> longest_standing_top, the length of the longest-standing
+    records tables. Falls back to 50 (with a warning) if missing.
+    """
+    if not config.has_section("records") or not config.has_option("records", "longest_standing_top"):
+        logger.warning("Missing [records] -> longest_standing_top in config.ini; defaulting to 50.")
+        return 50
+    return config["records"].getint("longest_standing_top")
+
+
 ###################################################################
 ####################### NATIONAL RECORDS ##########################
 ###################################################################
 
 
+@uw.product(
+    "national_records_single",
+    deps=("ranks_single_nationality", "results_nationality"),
+    persist=True,
+)
+def _build_national_records_single(db_tables: dict, config, logger) -> pd.DataFrame:
+    """Product 'national_records_single': current NR singles, with the raw and formatted result."""
+    ranks_s = db_tables["ranks_single_nationality"]
+    results = db_tables["results_nationality"].query("event_id in @config.current_events")
+
+    nrs = (
+        ranks_s.query("country_rank == 1 & event_id in @config.current_events")
+        [["person_id", "name", "event_id", "best"]]
+        .merge(
+            results[['person_id', 'event_id', 'best', 'competition_id', 'date']],
+            on=['person_id', 'event_id', 'best'],
+            how="left"
+        )
+        .rename(columns={"best": "result"})
+    )
+
+    if nrs.empty:
+        logger.warning("No national single records found.")
+        return pd.DataFrame(columns=["person_id", "name", "event_id", "type", "formatted_result", "competition_id", "date"])
+
+    nrs["type"] = "single"
+
+    # Format results for readability
+    nrs["formatted_result"] = np.where(
+        nrs["event_id"] == _FMC_EVENT,
+        nrs["result"].astype(str),
+        uw.format_results(nrs["result"], nrs["event_id"], logger),
+    )
+    nrs.index += 1
+
+    logger.info(f"Computed {len(nrs)} national single records for {config.nationality}")
+    return nrs
+
+
 def compute_national_records_single(
     db_tables: dict,
     config,
@@ -42,50 +106,58 @@ def compute_national_records_single(
 ) -> pd.DataFrame:
     """
     Compute current national single records for all events of the configured nationality.
-    Stores the resulting DataFrame in db_tables["national_records_single"].
+    The full table is the product 'national_records_single'.
     """
     try:
         logger.info(f"Computing national single records for {config.nationality}")
+        nrs = uw.get_product("national_records_single", db_tables, config, logger)
+        return nrs[["person_id", "name", "event_id", "type", "formatted_result", "competition_id", "date"]]
+
+    except Exception as e:
+        logger.error(f"Error while computing national single records: {e}", exc_info=True)
+        return pd.DataFrame()
 
-        ranks_s = db_tables["ranks_single_nationality"]
-        results = db_tables["results_nationality"].query("event_id in @config.current_events")
 
-        nrs = (
-            ranks_s.query("country_rank == 1 & event_id in @config.current_events")
-            [["person_id", "name", "event_id", "best"]]
-            .merge(
-                results[['person_id', 'event_id', 'best', 'competition_id', 'date']],
-                on=['person_id', 'event_id', 'best'],
-                how="left"
-            )
-            .rename(columns={"best": "result"})
+@uw.product(
+    "national_records_average",
+    deps=("ranks_average_nationality", "results_nationality"),
+    persist=True,
+)
+def _build_national_records_average(db_tables: dict, config, logger) -> pd.DataFrame:
+    """Product 'national_records_average': current NR averages, with the raw and formatted result."""
+    ranks_a = db_tables["ranks_average_nationality"]
+    results = db_tables["results_nationality"].query("event_id in @config.current_events")
+
+    nra = (
+        ranks_a.query("country_rank == 1 & event_id in @config.current_events")
+        [["person_id", "name", "event_id", "best"]]
+        .merge(
+            results[['person_id', 'event_id', 'average', 'competition_id', 'date']],
+            left_on=['person_id', 'event_id', 'best'],
+            right_on=['person_id', 'event_id', 'average'],
+            how="left"
         )
+        .drop(columns="best")
+        .rename(columns={"average": "result"})
+    )
 
-        if nrs.empty:
-            logger.warning("No national single records found.")
-            return pd.DataFrame(columns=["person_id", "name", "event_id", "type", "formatted_result", "competition_id", "date"])
+    if nra.empty:
+        logger.warning("No national average records found.")
+        return pd.DataFrame(columns=["person_id", "name", "event_id", "type", "formatted_result", "competition_id", "date"])
 
-        nrs["type"] = "single"
+    nra["type"] = "average"
 
-        # Format results for readability
-        nrs["formatted_result"] = np.where(
-            nrs["event_id"] == _MBLD_EVENT,
-            nrs["result"].apply(uw.multiresult),
-            np.where(
-                nrs["event_id"] == _FMC_EVENT,
-                nrs["result"].astype(str),
-                nrs["result"].apply(uw.timeconvert)
-            )
-        )
-        nrs.index += 1
-        db_tables["national_records_single"] = nrs
+    # Format results for readability
+    nra["formatted_result"] = np.where(
+        nra["event_id"] == _FMC_EVENT,
+        (nra["result"] / 100).astype(str),
+        uw.format_results(nra["result"], logger=logger),
+    )
 
-        logger.info(f"Computed {len(nrs)} national single records for {config.nationality}")
-        return nrs[["person_id", "name", "event_id", "type", "formatted_result", "competition_id", "date"]]
+    nra.index += 1
 
-    except Exception as e:
-        logger.error(f"Error while computing national single records: {e}", exc_info=True)
-        return pd.DataFrame()
+    logger.info(f"Computed {len(nra)} national average records for {config.nationality}")
+    return nra
 
 
 def compute_national_records_average(
@@ -95,44 +167,11 @@ def compute_national_records_average(
 ) -> pd.DataFrame:
     """
     Compute current national average records for all events of the configured nationality.
-    Stores the resulting DataFrame in db_tables["national_records_average"].
+    The full table is the product 'national_records_average'.
     """
     try:
         logger.info(f"Computing national average records for {config.nationality}")
-
-        ranks_a = db_tables["ranks_average_nationality"]
-        results = db_tables["results_nationality"].query("event_id in @config.current_events")
-
-        nra = (
-            ranks_a.query("country_rank == 1 & event_id in @config.current_events")
-            [["person_id", "name", "event_id", "best"]]
-            .merge(
-                results[['person_id', 'event_id', 'average', 'competition_id', 'date']],
-                left_on=['person_id', 'event_id', 'best'],
-                right_on=['person_id', 'event_id', 'average'],
-                how="left"
-            )
-            .drop(columns="best")
-            .rename(columns={"average": "result"})
-        )
-
-        if nra.empty:
-            logger.warning("No national average records found.")
-            return pd.DataFrame(columns=["person_id", "name", "event_id", "type", "formatted_result", "competition_id", "date"])
-
-        nra["type"] = "average"
-
-        # Format results for readability
-        nra["formatted_result"] = np.where(
-            nra["event_id"] == _FMC_EVENT,
-            (nra["result"] / 100).astype(str),
-            nra["result"].apply(uw.timeconvert)
-        )
-
-        nra.index += 1
-        db_tables["national_records_average"] = nra
-
-        logger.info(f"Computed {len(nra)} national average records for {config.nationality}")
+        nra = uw.get_product("national_records_average", db_tables, config, logger)
         return nra[["person_id", "name", "event_id", "type", "formatted_result", "competition_id", "date"]]
 
     except Exception as e:
@@ -146,14 +185,15 @@ def compute_oldest_standing_records(
     logger
 ) -> pd.DataFrame:
     """
-    Combine national single and average record tables, compute how long each has stood,
-    and return them sorted by oldest standing.
+    Combine the national single and average record products, compute how long
+    each has stood up to the last day of the export, and return them sorted
+    by oldest standing.
     """
     try:
         logger.info("Computing oldest standing national records")
 
-        nrs = db_tables.get("national_records_single", pd.DataFrame())
-        nra = db_tables.get("national_records_average", pd.DataFrame())
+        nrs = uw.get_product("national_records_single", db_tables, config, logger)
+        nra = uw.get_product("national_records_average", db_tables, config, logger)
 
         if nrs.empty and nra.empty:
             logger.warning("No record data available to compute oldest standing records.")
@@ -161,7 +201,7 @@ def compute_oldest_standing_records(
 
         combined = pd.concat([nrs, nra], ignore_index=True)
 
-        combined["days"] = (pd.Timestamp.today() - combined["date"]).dt.days
+        combined["days"] = (uw.last_results_date(db_tables) - combined["date"]).dt.days
         combined = combined.sort_values(by="days", ascending=False).reset_index(drop=True)
         combined.index += 1
 
@@ -181,6 +221,69 @@ def compute_oldest_standing_records(
 ###################################################################
 
 
+@uw.product("world_continental_records_nationality", deps=("results_nationality",), persist=True)
+def _build_world_continental_records(db_tables: dict, config, logger) -> pd.DataFrame:
+    """
+    Product 'world_continental_records_nationality': WR and CR results of the
+    configured nationality, single and average, oldest first. Empty if none.
+    """
+    cr_name = config.continental_record_name
+
+    results = db_tables["results_nationality"]
+
+    subset = results.query("event_id in @config.current_events and best > 0")
+    tags = subset["record_tags"].to_numpy()
+
+    if subset.empty:
+        logger.warning("No results available to compute World/Continental records.")
+        return pd.DataFrame()
+
+    # --- Single records ---
+    single_records = subset[(tags & (uw.RECORD_WR_SINGLE | uw.RECORD_CR_SINGLE)) != 0].copy()
+    single_records = single_records[[
+        "person_id", "person_name", "event_id", "competition_id",
+        "competition_name", "date", "best", "regional_single_record"
+    ]]
+    single_records["type"] = "single"
+    single_records = single_records.rename(columns={
+        "best": "result",
+        "regional_single_record": "record_type"
+    })
+
+    # --- Average records ---
+    average_records = subset[(tags & (uw.RECORD_WR_AVERAGE | uw.RECORD_CR_AVERAGE)) != 0].copy()
+    average_records = average_records[[
+        "person_id", "person_name", "event_id", "competition_id",
+        "competition_name", "date", "average", "regional_average_record"
+    ]]
+    average_records["type"] = "average"
+    average_records = average_records.rename(columns={
+        "average": "result",
+        "regional_average_record": "record_type"
+    })
+
+    # --- Combine and sort chronologically ---
+    records = (
+        pd.concat([single_records, average_records], ignore_index=True)
+        .sort_values(by="date", ascending=True)
+        .reset_index(drop=True)
+    )
+
+    if records.empty:
+        logger.warning(f"No World or Continental ({cr_name}) records found.")
+        return pd.DataFrame()
+
+    # --- Format results for readability ---
+    records["formatted_result"] = np.where(
+        records["event_id"] == _FMC_EVENT,
+        records["result"].astype(str),
+        uw.format_results(records["result"], records["event_id"], logger),
+    )
+
+    logger.info(f"Computed {len(records)} World/Continental ({cr_name}) records")
+    return records
+
+
 def compute_country_world_continental_records(
     db_tables: dict,
     config,
@@ -193,74 +296,16 @@ def compute_country_world_continental_records(
     The continental record acronym is taken from `config.continental_record_name`,
     derived from the country/continent in process_tables.
     """
-    cr_name = config.continental_record_name
-    record_labels = ["WR", cr_name]
-
     try:
         logger.info(
-            f"Computing World and Continental ({cr_name}) records for country {config.nationality}"
-        )
-
-        results = db_tables["results_nationality"]
-
-        subset = results.query("event_id in @config.current_events and best > 0")
-
-        if subset.empty:
-            logger.warning("No results available to compute World/Continental records.")
-            db_tables["world_continental_records_nationality"] = pd.DataFrame()
-            return pd.DataFrame()
-
-        # --- Single records ---
-        single_records = subset[subset["regional_single_record"].isin(record_labels)].copy()
-        single_records = single_records[[
-            "person_id", "person_name", "event_id", "competition_id",
-            "competition_name", "date", "best", "regional_single_record"
-        ]]
-        single_records["type"] = "single"
-        single_records = single_records.rename(columns={
-            "best": "result",
-            "regional_single_record": "record_type"
-        })
-
-        # --- Average records ---
-        average_records = subset[subset["regional_average_record"].isin(record_labels)].copy()
-        average_records = average_records[[
-            "person_id", "person_name", "event_id", "competition_id",
-            "competition_name", "date", "average", "regional_average_record"
-        ]]
-        average_records["type"] = "average"
-        average_records = average_records.rename(columns={
-            "average": "result",
-            "regional_average_record": "record_type"
-        })
-
-        # --- Combine and sort chronologically ---
-        records = (
-            pd.concat([single_records, average_records], ignore_index=True)
-            .sort_values(by="date", ascending=True)
-            .reset_index(drop=True)
+            f"Computing World and Continental ({config.continental_record_name}) records "
+            f"for country {config.nationality}"
         )
 
+        records = uw.get_product("world_continental_records_nationality", db_tables, config, logger)
         if records.empty:
-            logger.warning(f"No World or Continental ({cr_name}) records found.")
-            db_tables["world_continental_records_nationality"] = pd.DataFrame()
             return pd.DataFrame()
 
-        # --- Format results for readability ---
-        records["formatted_result"] = np.where(
-            records["event_id"] == _MBLD_EVENT,
-            records["result"].apply(uw.multiresult),
-            np.where(
-                records["event_id"] == _FMC_EVENT,
-                records["result"].astype(str),
-                records["result"].apply(uw.timeconvert)
-            )
-        )
-
-        # --- Store in db_tables ---
-        db_tables["world_continental_records_nationality"] = records
-        logger.info(f"Computed {len(records)} World/Continental ({cr_name}) records")
-
         return records[[
             "person_id", "person_name", "event_id", "type",
             "formatted_result", "record_type",
@@ -277,6 +322,62 @@ def compute_country_world_continental_records(
 ###################################################################
 
 
+@uw.product("record_history", deps=("record_progression", "persons"))
+def _build_event_record_history(db_tables: dict, config, logger, event_id: str) -> dict[str, pd.DataFrame]:
+    """
+    Product 'record_history_<event_id>': NR and WR single/average histories
+    as long-form frames {"nrs", "nra", "wrs", "wra"}, sliced from the
+    'record_progression' product, each extended with a copy of its last row
+    dated a few weeks from today so step charts reach the present.
+    """
+    progression = uw.get_product("record_progression", db_tables, config, logger)
+    progression = progression[progression["event_id"] == event_id]
+    names = uw.get_current_persons(db_tables, ["wca_id", "name"]).set_index("wca_id")["name"]
+
+    if progression.empty:
+        logger.warning(f"No records found for event {event_id}; history will be empty.")
+
+    def history(record: str, kind: str, label: str) -> pd.DataFrame:
+        rows = progression[(progression["record"] == record) & (progression["type"] == kind)]
+        if record == "NR":
+            rows = rows[rows["country_id"] == config.nationality]
+        return (
+            pd.DataFrame({
+                "WCAID": rows["person_id"].astype(str),
+                "Name": rows["person_id"].astype(str).map(names),
+                "competition_id": rows["competition_id"],
+                label: rows["value"].astype(np.int64),
+                "date": rows["date"],
+            })
+            .sort_values(by=["date", label], ascending=[True, False])
+            .reset_index(drop=True)
+        )
+
+    nrs = history("NR", "single", "NR single")
+    nra = history("NR", "average", "NR average")
+    wrs = history("WR", "single", "WR single")
+    wra = history("WR", "average", "WR average")
+
+    # --- Extend all to "today" so step chart continues ---
+    today = pd.to_datetime(datetime.now().date()) + pd.Timedelta(weeks=8)
+
+    def extend_latest(df):
+        if df.empty:
+            return df
+        last = df.iloc[-1:].copy()
+        last["date"] = today
+        return pd.concat([df, last], ignore_index=True)
+
+    nrs, nra, wrs, wra = map(extend_latest, [nrs, nra, wrs, wra])
+
+    return {
+        "nrs": nrs,
+        "nra": nra,
+        "wrs": wrs,
+        "wra": wra,
+    }
+
+
 def compute_event_record_history(
     db_tables: dict,
     config,
@@ -287,91 +388,14 @@ def compute_event_record_history(
     Compute the chronological history of National (NR) and World (WR)
     records for a given event, both single and average.
 
-    Side effect: caches the underlying long-form frames (nrs/nra/wrs/wra)
-    in db_tables[f"record_history_{event_id}"] for use by the matching plot.
-
     Returns a single, flat DataFrame suitable for export. The chart itself
-    uses the cached structured dict.
+    uses the structured product 'record_history_<event_id>'.
     """
     try:
         logger.info(f"Computing national/world record history for event {event_id}")
 
-        results_nationality = db_tables["results_nationality"].query("event_id == @event_id")
-        results = db_tables["results"].query("event_id == @event_id")
-        competitions = db_tables["competitions"][["competition_id", "date"]]
-
-        if results_nationality.empty:
-            logger.warning(f"No national results found for event {event_id}; history will be empty.")
-        if results.empty:
-            logger.warning(f"No world results found for event {event_id}; history will be empty.")
-
-        nr_tags = ["NR", config.continental_record_name, "WR"]
-
-        # --- National record SINGLE history ---
-        nrs = results_nationality[
-            results_nationality["regional_single_record"].isin(nr_tags)
-        ][["person_id", "person_name", "competition_id", "best", "date"]].copy()
-        nrs = nrs.rename(columns={
-            "person_id": "WCAID",
-            "person_name": "Name",
-            "best": "NR single"
-        }).sort_values(by=["date", "NR single"], ascending=[True, False])
-
-        # --- National record AVERAGE history ---
-        nra = results_nationality[
-            results_nationality["regional_average_record"].isin(nr_tags)
-        ][["person_id", "person_name", "competition_id", "average", "date"]].copy()
-        nra = nra.rename(columns={
-            "person_id": "WCAID",
-            "person_name": "Name",
-            "average": "NR average"
-        }).sort_values(by=["date", "NR average"], ascending=[True, False])
-
-        # --- World record SINGLE history ---
-        wrs = (
-            results.query("regional_single_record == 'WR'")
-            .rename(columns={
-                "person_id": "WCAID",
-                "person_name": "Name",
-                "best": "WR single"
-            })
-            .merge(competitions, on="competition_id", how="left")
-            [["WCAID", "Name", "competition_id", "WR single", "date"]]
-            .sort_values(by=["date", "WR single"], ascending=[True, False])
-        )
-
-        # --- World record AVERAGE history ---
-        wra = (
-            results.query("regional_average_record == 'WR'")
-            .rename(columns={
-                "person_id": "WCAID",
-                "person_name": "Name",
-                "average": "WR average"
-            })
-            .merge(competitions, on="competition_id", how="left")
-            [["WCAID", "Name", "competition_id", "WR average", "date"]]
-            .sort_values(by=["date", "WR average"], ascending=[True, False])
-        )
-
-        # --- Extend all to "today" so step chart continues ---
-        today = pd.to_datetime(datetime.now().date()) + pd.Timedelta(weeks=8)
-
-        def extend_latest(df):
-            if df.empty:
-                return df
-            last = df.iloc[-1:].copy()
-            last["date"] = today
-            return pd.concat([df, last], ignore_index=True)
-
-        nrs, nra, wrs, wra = map(extend_latest, [nrs, nra, wrs, wra])
-
-        # --- Cache structured frames for the matching plot ---
-        db_tables[f"record_history_{event_id}"] = {
-            "nrs": nrs,
-            "nra": nra,
-            "wrs": wrs,
-            "wra": wra,
-        }
+        history = uw.get_product("record_history", db_tables, config, logger, event_id)
+        nrs, nra = history["nrs"], history["nra"]
 
         # --- Flat output for export ---
         if nrs.empty and nra.empty:
@@ -389,6 +413,106 @@ def compute_event_record_history(
         return pd.DataFrame()
 
 
+###################################################################
+#################### RECORDS STANDING OVER TIME ###################
+###################################################################
+
+
+def compute_longest_standing_records(
+    db_tables: dict,
+    config,
+    logger,
+    record: str,
+    top: int
+) -> pd.DataFrame:
+    """
+    The `top` longest-standing `record`s (NR, CR or WR) ever, worldwide, in
+    the current events: how long each stood before it was beaten, or has
+    stood so far, up to the last day of the export. Ties keep all holders.
+    """
+    try:
+        logger.info(f"Computing the longest-standing {record}s")
+
+        history = db_tables["records_history"]
+        names = uw.get_current_persons(db_tables, ["wca_id", "name"]).set_index("wca_id")["name"]
+
+        durations = history.durations()
+        durations = durations[(durations["record"] == record) & durations["event_id"].isin(config.current_events)]
+        longest = durations.nlargest(top, "days", keep="all")
+
+        if record == "NR":
+            region = longest["country_id"].astype(str)
+        elif record == "CR":
+            region = longest["continent_id"].astype(str).str.lstrip("_")
+        else:
+            region = pd.Series("World", index=longest.index)
+
+        out = pd.DataFrame({
+            "Event": longest["event_id"].astype(str),
+            "Type": longest["type"].astype(str),
+            "Region": region,
+            "WCAID": longest["person_id"].astype(str),
+            "Name": longest["person_id"].astype(str).map(names),
+            "Result": uw.format_results(longest["value"], longest["event_id"].astype(str), logger),
+            "Set": longest["date"],
+            "Until": longest["until"],
+            "Days": longest["days"],
+        }).reset_index(drop=True)
+        out.index += 1
+
+        logger.info(f"Computed {len(out)} longest-standing {record}s")
+        return out
+
+    except Exception as e:
+        logger.error(f"Error while computing the longest-standing {record}s: {e}", exc_info=True)
+        return pd.DataFrame()
+
+
+def compute_national_records_by_month(
+    db_tables: dict,
+    config,
+    logger,
+    kind: str
+) -> pd.DataFrame:
+    """
+    The NR `kind` (single/average) of config.nationality standing at every
+    month end, one row per month and one column per current event.
+    """
+    try:
+        logger.info(f"Computing monthly NR {kind} snapshots for {config.nationality}")
+
+        history = db_tables["records_history"]
+        standing = history.standing(history.month_ends(), record="NR", kind=kind, region=config.nationality)
+        standing = standing[standing["event_id"].isin(config.current_events)]
+
+        if standing.empty:
+            logger.warning(f"No NR {kind} found for {config.nationality}.")
+            return pd.DataFrame()
+
+        # Tied holders share the value; one cell per month and event
+        standing = standing.drop_duplicates(subset=["as_of", "event_id"])
+        events = standing["event_id"].astype(str)
+        out = (
+            standing.assign(
+                Month=standing["as_of"].dt.strftime("%Y-%m"),
+                event=events,
+                result=uw.format_results(standing["value"], events, logger).to_numpy(),
+            )
+            .pivot(index="Month", columns="event", values="result")
+            .reindex(columns=[e for e in config.current_events if e in set(events)])
+            .fillna("")
+            .rename_axis(columns=None)
+            .reset_index()
+        )
+
+        logger.info(f"Computed {len(out)} monthly NR {kind} snapshots")
+        return out
+
+    except Exception as e:
+        logger.error(f"Error while computing monthly NR {kind} snapshots: {e}", exc_info=True)
+        return pd.DataFrame()
+
+
 ###################################################################
 ########################### PLOTS #################################
 ###################################################################
@@ -410,7 +534,7 @@ def plot_world_continental_records(
             f"Plotting World and Continental ({cr_name}) record timeline for {config.nationality}"
         )
 
-        records = db_tables.get("world_continental_records_nationality", pd.DataFrame())
+        records = uw.get_product("world_continental_records_nationality", db_tables, config, logger)
         if records.empty:
             logger.warning("No data available for World/Continental record plot; skipping.")
             return None
@@ -425,7 +549,7 @@ def plot_world_continental_records(
 
         # --- Count records by year and record type ---
         summary = (
-            records.groupby(["year", "record_type"])
+            records.groupby(["year", "record_type"], observed=True)
             .size()
             .unstack(fill_value=0)
             .reindex(columns=["WR", cr_name], fill_value=0)
@@ -477,13 +601,7 @@ def plot_event_record_history(
     try:
         logger.info(f"Plotting record history for event {event_id}")
 
-        record_data = db_tables.get(f"record_history_{event_id}")
-        if record_data is None:
-            logger.warning(
-                f"No precomputed record data for {event_id} "
-                f"(did compute_event_record_history run first?). Skipping plot."
-            )
-            return None
+        record_data = uw.get_product("record_history", db_tables, config, logger, event_id)
 
         # Defensive copies — we mutate columns below for unit conversion
         nrs = record_data["nrs"].copy()
@@ -503,13 +621,9 @@ def plot_event_record_history(
 
         elif event_id == _MBLD_EVENT:
             if not nrs.empty:
-                nrs["solved"] = nrs["NR single"].apply(uw.multisolved)
-                nrs["wrong"] = nrs["NR single"].apply(uw.multiwrong)
-                nrs["solved"] = nrs["solved"] - nrs["wrong"]
+                nrs["solved"] = uw.decode_multi(nrs["NR single"])["points"]
             if not wrs.empty:
-                wrs["solved"] = wrs["WR single"].apply(uw.multisolved)
-                wrs["wrong"] = wrs["WR single"].apply(uw.multiwrong)
-                wrs["solved"] = wrs["solved"] - wrs["wrong"]
+                wrs["solved"] = uw.decode_multi(wrs["WR single"])["points"]
 
         else:
             if not nrs.empty:
@@ -591,12 +705,7 @@ def plot_national_record_month_distribution(
             return None
 
         # --- Extract month of each record (single or average) ---
-        cr_name = config.continental_record_name
-        record_tags = ["NR", cr_name, "WR"]
-        records = results[
-            results["regional_single_record"].isin(record_tags)
-            | results["regional_average_record"].isin(record_tags)
-        ].copy()
+        records = results[results["record_tags"] != 0].copy()
 
         if records.empty:
             logger.warning("No national record data available for plotting.")
@@ -604,7 +713,7 @@ def plot_national_record_month_distribution(
 
         records["month"] = pd.to_datetime(records["date"]).dt.month
         nr_counts = (
-            records.groupby("month")
+            records.groupby("month", observed=True)
             .size()
             .reindex(range(1, 13), fill_value=0)
         )
@@ -614,11 +723,11 @@ def plot_national_record_month_distribution(
         competitions["year"] = pd.to_datetime(competitions["date"]).dt.year
 
         comps_per_month_year = (
-            competitions.groupby(["year", "month"]).size().reset_index(name="count")
+            competitions.groupby(["year", "month"], observed=True).size().reset_index(name="count")
         )
 
         comps_avg = (
-            comps_per_month_year.groupby("month")["count"].mean()
+            comps_per_month_year.groupby("month", observed=True)["count"].mean()
             .reindex(range(1, 13), fill_value=0)
         )
 
@@ -669,6 +778,7 @@ def run(db_tables, config):
 
     # --- Read the per-event history list from config (drives the loop below) ---
     event_history_list = _parse_record_history_list(config, logger)
+    longest_standing_top = _parse_longest_standing_top(config, logger)
 
     # --- Tables ---
     results = {
@@ -676,7 +786,13 @@ def run(db_tables, config):
         "NR Averages": compute_national_records_average(db_tables=db_tables, config=config, logger=logger),
         "Oldest Standing Records": compute_oldest_standing_records(db_tables=db_tables, config=config, logger=logger),
         "WR + Continental Records": compute_country_world_continental_records(db_tables=db_tables, config=config, logger=logger),
+        "NR Singles by Month": compute_national_records_by_month(db_tables=db_tables, config=config, logger=logger, kind="single"),
+        "NR Averages by Month": compute_national_records_by_month(db_tables=db_tables, config=config, logger=logger, kind="average"),
     }
+    for record in ("WR", "CR", "NR"):
+        results[f"Longest Standing {record}s"] = compute_longest_standing_records(
+            db_tables=db_tables, config=config, logger=logger, record=record, top=longest_standing_top
+        )
 
     # --- Per-event record history (driven by config.records.record_history_list) ---
     for event_id in event_history_list:
@@ -108,6 +108,17 @@ REGIONS_DICT = {
     'Sardegna': 20,
 }
 
+# Raw export columns this module reads, directly or through the pre-filtered
+# tables built by process_tables (see uw.resolve_table_columns).
+REQUIRED_COLUMNS = {
+    "results": ["pos", "best", "average", "competition_id", "round_type_id", "event_id", "person_id", "format_id"],
+    "persons": ["wca_id", "name"],
+    "competitions": [
+        "id", "city_name", "country_id", "cancelled", "year", "month", "day",
+        "latitude_microdegrees", "longitude_microdegrees",
+    ],
+}
+
 
 def _country_supported(config, logger, what: str) -> bool:
     """
@@ -224,7 +235,7 @@ def compute_average_win_times_by_region(
         # --- Special handling for MBLD: net solved (solved - wrong) ---
         df["best"] = np.where(
             df["event_id"] == "333mbf",
-            df["best"].apply(uw.multisolved) - df["best"].apply(uw.multiwrong),
+            uw.decode_multi(df["best"])["points"],
             df["best"],
         )
 
@@ -249,20 +260,18 @@ def compute_average_win_times_by_region(
         )
 
         # --- Post-process metrics by event type ---
-        def convert_metric(row):
-            event = row["event_id"]
-            val = row["metric"]
-            if pd.isna(val) or val <= 0:
-                return np.nan
-            if event == "333fm_m":
-                return str(val / 100)
-            elif event not in ['333', '333fm_1', '333mbf']:
-                return uw.timeconvert(val)
-            else:
-                # Keep 333 numeric for sorting; converted to time below.
-                return val
-
-        region_event_avg["metric"] = region_event_avg.apply(convert_metric, axis=1)
+        # FMC means as moves, other events as times; 333 stays numeric for
+        # sorting (converted to time below), as do FMC singles and MBLD points.
+        metric = region_event_avg["metric"]
+        event = region_event_avg["event_id"]
+        valid = metric.notna() & (metric > 0)
+        fmc_mean = valid & (event == "333fm_m")
+        timed = valid & ~event.isin(["333", "333fm_1", "333mbf", "333fm_m"])
+
+        converted = metric.astype(object).where(valid, np.nan)
+        converted[fmc_mean] = (metric[fmc_mean] / 100).astype(str)
+        converted[timed] = uw.format_results(metric[timed], logger=logger)
+        region_event_avg["metric"] = converted
 
         # --- Pivot to wide format ---
         pivot_df = region_event_avg.pivot(
@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 import logging
 import configparser
 import utils_wca as uw
@@ -22,6 +23,13 @@ _LUCKY_RELAY_EVENTS = ["222", "pyram", "skewb"]
 _BLIND_RELAY_EVENTS = ["333bf", "444bf", "555bf"]
 _3X3_MASTER_RELAY_EVENTS = ["333", "333oh", "333bf"]
 
+# Raw export columns this module reads, directly or through the pre-filtered
+# tables built by process_tables (see uw.resolve_table_columns).
+REQUIRED_COLUMNS = {
+    "ranks_single": ["person_id", "event_id", "best", "country_rank"],
+    "persons": ["wca_id", "name", "sub_id", "country_id"],
+}
+
 
 ###################################################################
 ######################### COMPUTATIONS ############################
@@ -36,8 +44,8 @@ def _compute_relay_base(
     relay_name: str
 ) -> pd.DataFrame:
     """
-    Compute a relay-style leaderboard using pre-filtered national ranks
-    (ranks_single_nationality).
+    Compute a relay-style leaderboard from the single PBs and national ranks
+    of the competitors of config.nationality (pb_matrix).
 
     Adds per-event times, total summed score, and consistency metrics
     (Best Rank, Median Rank).
@@ -45,23 +53,22 @@ def _compute_relay_base(
     try:
         logger.info(f"Computing {relay_name} relay for {config.nationality} using official ranks...")
 
-        ranks = db_tables["ranks_single_nationality"].copy()
+        pbs = db_tables["pb_matrix"]
         persons = db_tables["persons"][["wca_id", "name"]].drop_duplicates()
 
-        df = ranks.query("event_id in @event_list")
+        pool = pbs.persons(config.nationality)
+        best = pbs.values("single", event_list, pool)
+        has_any = ~np.isnan(best).all(axis=1)
 
-        if df.empty:
+        if not has_any.any():
             logger.warning(f"No ranks found for any of the required events ({event_list}).")
             return pd.DataFrame()
 
-        # --- Pivot to get one row per competitor ---
-        pivot_best = (
-            df.pivot_table(index="person_id", columns="event_id", values="best")
-            .reindex(columns=event_list)
-        )
-        pivot_rank = (
-            df.pivot_table(index="person_id", columns="event_id", values="country_rank")
-            .reindex(columns=event_list)
+        # --- One row per competitor with a PB in any of the events ---
+        index = pd.CategoricalIndex(pbs.person_ids(pool[has_any]), name="person_id")
+        pivot_best = pd.DataFrame(best[has_any], index=index, columns=event_list)
+        pivot_rank = pd.DataFrame(
+            pbs.ranks("single", "country", event_list, pool[has_any]), index=index, columns=event_list
         )
 
         # --- Fill missing times/ranks with worst + 1 (WCA convention) ---
@@ -90,7 +97,7 @@ def _compute_relay_base(
 
         # --- Convert all numeric times to readable WCA format ---
         for e in event_list + ["Total"]:
-            df_out[e] = df_out[e].apply(uw.timeconvert)
+            df_out[e] = uw.format_results(df_out[e], logger=logger)
 
         df_out = df_out.reset_index(drop=True)
         df_out.index += 1
@@ -16,6 +16,22 @@ _TOP_N = 100
 _MBLD_EVENT = "333mbf"
 _FMC_EVENT = "333fm"
 
+# Raw export columns this module reads, directly or through the pre-filtered
+# tables built by process_tables (see uw.resolve_table_columns).
+REQUIRED_COLUMNS = {
+    "results": [
+        "pos", "best", "average", "competition_id", "round_type_id", "event_id",
+        "person_name", "person_id", "person_country_id",
+    ],
+    "attempts": ["value", "result_id"],
+    "ranks_single": ["person_id", "event_id", "best", "world_rank", "country_rank"],
+    "ranks_average": ["person_id", "event_id", "best", "world_rank", "country_rank"],
+    "persons": ["wca_id", "name", "sub_id", "gender", "country_id"],
+    "competitions": ["id", "country_id", "year", "month", "day"],
+    "rounds": ["id", "rank"],
+    "countries": ["id", "continent_id"],
+}
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -143,7 +159,7 @@ def compute_current_world_rankings(
         )
 
         out = pd.concat([single, avg], ignore_index=True)
-        out["Result"] = out.apply(lambda r: uw.format_result(r["best"], r["event_id"], logger), axis=1)
+        out["Result"] = uw.format_results(out["best"], out["event_id"], logger)
         out = (
             out.rename(columns={
                 "person_id": "WCAID", "name": "Name", "event_id": "Event",
@@ -176,12 +192,12 @@ def compute_most_top10_rankings(
         single = (
             db_tables["ranks_single_nationality"]
             .query("event_id in @config.current_events and 0 < country_rank <= 10")
-            .groupby("person_id").size()
+            .groupby("person_id", observed=True).size()
         )
         avg = (
             db_tables["ranks_average_nationality"]
             .query("event_id in @config.current_events and 0 < country_rank <= 10")
-            .groupby("person_id").size()
+            .groupby("person_id", observed=True).size()
         )
 
         total = single.add(avg, fill_value=0).astype(int)
@@ -234,7 +250,7 @@ def compute_top100_singles(
             return pd.DataFrame(columns=["WCAID", "Name", f"Top{_TOP_N} singles"])
 
         counts = (
-            df.groupby("person_id").size()
+            df.groupby("person_id", observed=True).size()
             .reset_index(name=f"Top{_TOP_N} singles")
             .merge(uw.get_current_persons(db_tables), left_on="person_id", right_on="wca_id", how="left")
             .drop(columns="wca_id")
@@ -276,7 +292,7 @@ def compute_top100_averages(
             return pd.DataFrame(columns=["WCAID", "Name", f"Top{_TOP_N} averages"])
 
         counts = (
-            df.groupby("person_id").size()
+            df.groupby("person_id", observed=True).size()
             .reset_index(name=f"Top{_TOP_N} averages")
             .merge(uw.get_current_persons(db_tables), left_on="person_id", right_on="wca_id", how="left")
             .drop(columns="wca_id")
@@ -329,6 +345,7 @@ def compute_best_podiums(
                 columns="pos",
                 values=["person_name", "average"],
                 aggfunc="first",
+                observed=True,
             )
         )
         # Keep only competitions with all three positions populated
@@ -350,10 +367,10 @@ def compute_best_podiums(
         out = out.sort_values("raw_sum", ascending=True).reset_index(drop=True)
 
         # Format for display (event-aware)
-        out["Average1"]   = out["raw1"].apply(lambda v: uw.format_result(v, event_id, logger))
-        out["Average2"]   = out["raw2"].apply(lambda v: uw.format_result(v, event_id, logger))
-        out["Average3"]   = out["raw3"].apply(lambda v: uw.format_result(v, event_id, logger))
-        out["Podium Sum"] = out["raw_sum"].apply(lambda v: uw.format_result(v, event_id, logger))
+        out["Average1"]   = uw.format_results(out["raw1"], event_id, logger)
+        out["Average2"]   = uw.format_results(out["raw2"], event_id, logger)
+        out["Average3"]   = uw.format_results(out["raw3"], event_id, logger)
+        out["Podium Sum"] = uw.format_results(out["raw_sum"], event_id, logger)
 
         out = out[[
             "competition_id", "Podium Sum",
@@ -379,35 +396,36 @@ def compute_best_first_average(
     valid official average (regardless of nationality at the time), then rank
     by speed.
 
-    Uses `results_fixed`, where person_country_id is overwritten with each
-    competitor's current (sub_id=1) nationality. This ensures that someone who
-    e.g. used to compete as American but is now Italian still has their early
-    American results considered.
-
-    Within a single competition, multiple rounds may exist; the chronologically
-    earliest round is the one with the LOWEST `rank` value (round rank
-    increases with later rounds: 1st round < 2nd round < semifinal < final).
+    Reads the first average of every (person, event) from the
+    `pb_progression` product (its first row per group, ordered by date and
+    round rank), restricted to persons whose current (sub_id=1) nationality
+    is the configured one. Someone who e.g. used to compete as American but
+    is now Italian still has their early American results considered.
     """
     try:
         logger.info(f"Computing best first averages for {event_id}")
 
-        df = (
-            db_tables["results_fixed"]
-            .query("event_id == @event_id and average > 0")
-            [["person_id", "average", "competition_id", "date", "rank"]]
-            .sort_values(["date", "rank"], ascending=[True, True])
-        )
+        progression = uw.get_product("pb_progression", db_tables, config, logger)
+        current = uw.get_current_persons(db_tables, ["wca_id", "name", "country_id"]).query("country_id == @config.nationality")
 
-        if df.empty:
+        first = progression[
+            (progression["type"] == "average")
+            & (progression["event_id"] == event_id)
+            & progression["previous"].isna()
+            & progression["person_id"].isin(current["wca_id"])
+        ]
+
+        if first.empty:
             logger.warning(f"No valid averages for event {event_id}.")
             return pd.DataFrame()
 
         first = (
-            df.groupby("person_id", as_index=False).first()
-            .merge(uw.get_current_persons(db_tables), left_on="person_id", right_on="wca_id", how="left")
+            first[["person_id", "value", "competition_id", "date"]]
+            .rename(columns={"value": "average"})
+            .merge(current[["wca_id", "name"]], left_on="person_id", right_on="wca_id", how="left")
             .drop(columns="wca_id")
         )
-        first["First Average"] = first["average"].apply(lambda v: uw.format_result(v, event_id, logger))
+        first["First Average"] = uw.format_results(first["average"], event_id, logger)
 
         out = (
             first.sort_values("average", ascending=True)
@@ -426,6 +444,63 @@ def compute_best_first_average(
         return pd.DataFrame()
 
 
+def compute_latest_average_percentiles(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger,
+    event_id: str,
+) -> pd.DataFrame:
+    """
+    Most recent valid average of every competitor of the configured (current)
+    nationality in `event_id`, placed among today's personal-best averages:
+    the world/continental/national rank it would have and its percentile
+    (see uw.PercentileIndex).
+    """
+    try:
+        logger.info(f"Computing latest average percentiles for {event_id}")
+
+        df = (
+            db_tables["results_fixed"]
+            .query("event_id == @event_id and average > 0")
+            [["person_id", "person_country_id", "average", "competition_id", "date", "rank"]]
+            .sort_values(["date", "rank"], ascending=[True, True])
+        )
+
+        if df.empty:
+            logger.warning(f"No valid averages for event {event_id}.")
+            return pd.DataFrame()
+
+        latest = (
+            df.groupby("person_id", as_index=False, observed=True).last()
+            .merge(uw.get_current_persons(db_tables), left_on="person_id", right_on="wca_id", how="left")
+            .sort_values("average", ascending=True)
+            .reset_index(drop=True)
+        )
+        placed = db_tables["percentile_index_average"].annotate(
+            np.full(len(latest), event_id), latest["average"], latest["person_country_id"],
+        )
+
+        out = pd.DataFrame({
+            "WCAID": latest["person_id"],
+            "Name": latest["name"],
+            "Latest Average": uw.format_results(latest["average"], event_id, logger),
+            "Competition ID": latest["competition_id"],
+            "Date": latest["date"],
+            "World Rank": placed["world_rank"],
+            "World Percentile": placed["world_percentile"].round(2),
+            "Continental Rank": placed["continent_rank"],
+            "Continental Percentile": placed["continent_percentile"].round(2),
+            "National Rank": placed["country_rank"],
+            "National Percentile": placed["country_percentile"].round(2),
+        })
+        out.index += 1
+        return out
+
+    except Exception as e:
+        logger.error(f"Error computing latest average percentiles for {event_id}: {e}", exc_info=True)
+        return pd.DataFrame()
+
+
 ###################################################################
 ############################# PLOTS ###############################
 ###################################################################
@@ -531,12 +606,13 @@ def run(db_tables, config):
             db_tables=db_tables, config=config, logger=logger, year=medal_year,
         )
 
-    # --- Per-event tables (stats 4, 5, 6, 7) ---
+    # --- Per-event tables (stats 4, 5, 6, 7, 7b) ---
     for event in event_list:
         results[f"Top100 Singles {event}"]  = compute_top100_singles(db_tables, config, logger, event)
         results[f"Top100 Averages {event}"] = compute_top100_averages(db_tables, config, logger, event)
         results[f"Best Podiums {event}"]    = compute_best_podiums(db_tables, config, logger, event)
         results[f"Best First Average {event}"] = compute_best_first_average(db_tables, config, logger, event)
+        results[f"Latest Average Percentiles {event}"] = compute_latest_average_percentiles(db_tables, config, logger, event)
 
     # --- Per-event plots (stat 8) ---
     figures = {
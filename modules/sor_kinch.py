@@ -27,6 +27,18 @@ _ALL_KINCH_EVENTS = (
 )
 _N_KINCH_EVENTS = len(_ALL_KINCH_EVENTS)   # 18
 
+# Raw export columns this module reads, directly or through the pre-filtered
+# tables built by process_tables (see uw.resolve_table_columns).
+REQUIRED_COLUMNS = {
+    "ranks_single": ["person_id", "event_id", "best", "world_rank", "continent_rank", "country_rank"],
+    "ranks_average": ["person_id", "event_id", "best", "world_rank", "continent_rank", "country_rank"],
+    "attempts": ["value", "result_id"],
+    "results": ["id", "best", "average", "competition_id", "event_id", "person_id", "person_country_id"],
+    "persons": ["wca_id", "name", "sub_id", "country_id"],
+    "competitions": ["id", "year", "month", "day"],
+    "countries": ["id", "continent_id"],
+}
+
 
 ###################################################################
 ########################## SUM OF RANKS ###########################
@@ -38,8 +50,10 @@ def compute_sor_single(db_tables: dict, config, logger) -> pd.DataFrame:
     Sum of Ranks across all events for single results (lower = better).
     """
     return _compute_sor(
-        ranks=db_tables["ranks_single_nationality"],
+        pbs=db_tables["pb_matrix"],
+        kind="single",
         persons=db_tables["persons"],
+        nationality=config.nationality,
         events=config.current_events,
         score_col="SOR single",
         label=f"Single ({config.nationality})",
@@ -52,8 +66,10 @@ def compute_sor_average(db_tables: dict, config, logger) -> pd.DataFrame:
     Sum of Ranks across all events for average results (lower = better).
     """
     return _compute_sor(
-        ranks=db_tables["ranks_average_nationality"],
+        pbs=db_tables["pb_matrix"],
+        kind="average",
         persons=db_tables["persons"],
+        nationality=config.nationality,
         events=config.current_events,
         score_col="SOR average",
         label=f"Average ({config.nationality})",
@@ -62,31 +78,33 @@ def compute_sor_average(db_tables: dict, config, logger) -> pd.DataFrame:
 
 
 def _compute_sor(
-    ranks: pd.DataFrame,
+    pbs: uw.PBMatrix,
+    kind: str,
     persons: pd.DataFrame,
+    nationality: str,
     events: list,
     score_col: str,
     label: str,
     logger,
 ) -> pd.DataFrame:
     """
-    Shared SOR computation.
+    Shared SOR computation, from the national ranks (`kind` = single/average)
+    of the competitors of `nationality` in the pb_matrix.
     Missing events get max_rank_in_event + 1 (worst possible rank).
     """
     try:
         logger.info(f"Computing Sum of Ranks - {label}")
 
-        ranks = ranks[ranks["event_id"].isin(events)]
         persons = persons[["wca_id", "name"]].drop_duplicates()
 
-        pivot = (
-            ranks.pivot_table(
-                index="person_id",
-                columns="event_id",
-                values="country_rank",
-                aggfunc="min",
-            )
-            .reindex(columns=events)
+        # One row per competitor ranked in any of the events
+        pool = pbs.persons(nationality)
+        ranks = pbs.ranks(kind, "country", events, pool)
+        ranked = ~np.isnan(ranks).all(axis=1)
+        pivot = pd.DataFrame(
+            ranks[ranked],
+            index=pd.CategoricalIndex(pbs.person_ids(pool[ranked]), name="person_id"),
+            columns=events,
         )
 
         # Vectorized fill: each missing event -> max_rank_in_column + 1
@@ -128,7 +146,7 @@ def compute_kinch_score(db_tables: dict, config, logger) -> pd.DataFrame:
         config=config,
         logger=logger,
         national_level=False,
-        event_scores_key="kinch_event_scores",
+        event_scores_product="kinch_event_scores",
     )
 
 
@@ -141,7 +159,42 @@ def compute_national_level_kinch_score(db_tables: dict, config, logger) -> pd.Da
         config=config,
         logger=logger,
         national_level=True,
-        event_scores_key="kinch_event_scores_national",
+        event_scores_product="kinch_event_scores_national",
+    )
+
+
+@uw.product(
+    "kinch_country_event_scores",
+    deps=("pb_matrix", "multi_results"),
+    persist=True,
+)
+def _build_country_kinch_event_scores(db_tables: dict, config, logger) -> pd.DataFrame:
+    """
+    Product 'kinch_country_event_scores': per-country per-event Kinch scores.
+    Each country's best result per event is scored against the World Record.
+    """
+    pbs = db_tables["pb_matrix"]
+    multi_results = db_tables["multi_results"]
+
+    single = pbs.values("single", _ALL_KINCH_EVENTS)
+    average = pbs.values("average", _ALL_KINCH_EVENTS)
+
+    # Best result per country per event
+    countries, country_single = _reduce_groups(np.fmin, single, pbs.country)
+    _, country_average = _reduce_groups(np.fmin, average, pbs.country)
+
+    # Country-level MBLD source: rename person_country_id -> country_id
+    country_multi = multi_results.copy()
+    country_multi["country_id"] = country_multi["person_country_id"]
+
+    return _compute_kinch_event_scores(
+        single=country_single,
+        average=country_average,
+        bench_single=_best_per_event(single),
+        bench_average=_best_per_event(average),
+        ids=pd.Categorical.from_codes(countries, dtype=pbs.country_dtype),
+        multi_results=country_multi,
+        id_col="country_id",
     )
 
 
@@ -153,37 +206,7 @@ def compute_country_kinch_score(db_tables: dict, config, logger) -> pd.DataFrame
     try:
         logger.info("Computing Country Kinch scores")
 
-        ranks_single = db_tables["ranks_single"]
-        ranks_average = db_tables["ranks_average"]
-        multi_results = db_tables["multi_results"]
-
-        # World records
-        wr_single = _best_per_event(ranks_single)
-        wr_average = _best_per_event(ranks_average)
-
-        # Best result per country per event
-        country_single = (
-            ranks_single.groupby(["country_id", "event_id"], as_index=False)["best"].min()
-        )
-        country_average = (
-            ranks_average.groupby(["country_id", "event_id"], as_index=False)["best"].min()
-        )
-
-        # Country-level MBLD source: rename person_country_id -> country_id
-        country_multi = multi_results.copy()
-        country_multi["country_id"] = country_multi["person_country_id"]
-
-        event_scores = _compute_kinch_event_scores(
-            ranks_single=country_single,
-            ranks_average=country_average,
-            wr_single=wr_single,
-            wr_average=wr_average,
-            multi_results=country_multi,
-            id_col="country_id",
-        )
-
-        # Cache event-level scores for potential downstream use
-        db_tables["kinch_country_event_scores"] = event_scores
+        event_scores = uw.get_product("kinch_country_event_scores", db_tables, config, logger)
 
         result = _finalize_kinch_ranking(
             event_scores=event_scores,
@@ -205,7 +228,7 @@ def _compute_kinch_person(
     config,
     logger,
     national_level: bool,
-    event_scores_key: str,
+    event_scores_product: str,
 ) -> pd.DataFrame:
     """
     Shared logic for person-level Kinch (world or national benchmark).
@@ -216,30 +239,7 @@ def _compute_kinch_person(
         logger.info(f"Computing {kind}-level Kinch scores for {config.nationality}")
 
         persons = db_tables["persons"][["wca_id", "name"]].drop_duplicates()
-        ranks_single = db_tables["ranks_single_nationality"]
-        ranks_average = db_tables["ranks_average_nationality"]
-
-        # Benchmark records: national pool (if national_level) or global
-        if national_level:
-            wr_single = _best_per_event(ranks_single)
-            wr_average = _best_per_event(ranks_average)
-            multi_results = db_tables["multi_results"][db_tables["multi_results"]["person_country_id"] == config.country]
-        else:
-            wr_single = _best_per_event(db_tables["ranks_single"])
-            wr_average = _best_per_event(db_tables["ranks_average"])
-            multi_results = db_tables["multi_results"]
-
-        event_scores = _compute_kinch_event_scores(
-            ranks_single=ranks_single,
-            ranks_average=ranks_average,
-            wr_single=wr_single,
-            wr_average=wr_average,
-            multi_results=multi_results,
-            id_col="person_id",
-        )
-
-        # Cache event-level scores for the plots (reused downstream)
-        db_tables[event_scores_key] = event_scores
+        event_scores = uw.get_product(event_scores_product, db_tables, config, logger)
 
         result = _finalize_kinch_ranking(
             event_scores=event_scores,
@@ -255,62 +255,100 @@ def _compute_kinch_person(
         return pd.DataFrame()
 
 
+def _person_kinch_event_scores(db_tables: dict, config, national_level: bool) -> pd.DataFrame:
+    """
+    Per-person per-event Kinch scores for the configured nationality, against
+    the national pool (if national_level) or the World Records.
+    """
+    pbs = db_tables["pb_matrix"]
+    pool = pbs.persons(config.nationality)
+    single = pbs.values("single", _ALL_KINCH_EVENTS, pool)
+    average = pbs.values("average", _ALL_KINCH_EVENTS, pool)
+
+    if national_level:
+        wr_single = _best_per_event(single)
+        wr_average = _best_per_event(average)
+        multi_results = db_tables["multi_results"][db_tables["multi_results"]["person_country_id"] == config.country]
+    else:
+        wr_single = _best_per_event(pbs.values("single", _ALL_KINCH_EVENTS))
+        wr_average = _best_per_event(pbs.values("average", _ALL_KINCH_EVENTS))
+        multi_results = db_tables["multi_results"]
+
+    return _compute_kinch_event_scores(
+        single=single,
+        average=average,
+        bench_single=wr_single,
+        bench_average=wr_average,
+        ids=pbs.person_ids(pool),
+        multi_results=multi_results,
+        id_col="person_id",
+    )
+
+
+@uw.product(
+    "kinch_event_scores",
+    deps=("pb_matrix", "multi_results"),
+    persist=True,
+)
+def _build_kinch_event_scores(db_tables: dict, config, logger) -> pd.DataFrame:
+    """Product 'kinch_event_scores': person Kinch scores per event, against World Records."""
+    return _person_kinch_event_scores(db_tables, config, national_level=False)
+
+
+@uw.product(
+    "kinch_event_scores_national",
+    deps=("pb_matrix", "multi_results"),
+    persist=True,
+)
+def _build_kinch_event_scores_national(db_tables: dict, config, logger) -> pd.DataFrame:
+    """Product 'kinch_event_scores_national': person Kinch scores per event, against National Records."""
+    return _person_kinch_event_scores(db_tables, config, national_level=True)
+
+
 # ---------------------------------------------------------------------------
 # Internal helpers (Kinch)
 # ---------------------------------------------------------------------------
 
 
-def _best_per_event(ranks: pd.DataFrame) -> pd.DataFrame:
-    """Return best (min) result per event, columns [event_id, wr]."""
-    return (
-        ranks.groupby("event_id", as_index=False)["best"]
-        .min()
-        .rename(columns={"best": "wr"})
-    )
+def _best_per_event(matrix: np.ndarray) -> np.ndarray:
+    """Best (min) result of every column of a PB matrix, NaN where there is none."""
+    best = np.fmin.reduce(matrix, axis=0, initial=np.inf)
+    return np.where(np.isinf(best), np.nan, best)
 
 
 def _compute_kinch_event_scores(
-    ranks_single: pd.DataFrame,
-    ranks_average: pd.DataFrame,
-    wr_single: pd.DataFrame,
-    wr_average: pd.DataFrame,
+    single: np.ndarray,
+    average: np.ndarray,
+    bench_single: np.ndarray,
+    bench_average: np.ndarray,
+    ids: pd.Categorical,
     multi_results: pd.DataFrame,
     id_col: str,
 ) -> pd.DataFrame:
     """
-    Compute per-entity per-event Kinch scores. Returns a long DataFrame
-    with columns [id_col, event_id, score] where score is in [0, 100].
+    Compute per-entity per-event Kinch scores. `single` and `average` are
+    PB matrices (one row per entity in `ids`, _ALL_KINCH_EVENTS columns, NaN
+    where none) and bench_* the benchmark of every column. Returns a long
+    DataFrame with columns [id_col, event_id, score] where score is in [0, 100].
 
     Only (entity, event) pairs that actually have a result are returned.
     The "score 0 for missing events" logic is handled by _finalize_kinch_ranking.
     """
-    avg_events_set = set(_KINCH_AVERAGE_EVENTS) | set(_KINCH_BEST_OF_BOTH_EVENTS)
-    sngl_events_set = set(_KINCH_SINGLE_ONLY_EVENTS) | set(_KINCH_BEST_OF_BOTH_EVENTS)
-
-    avg_long = (
-        ranks_average[ranks_average["event_id"].isin(avg_events_set)]
-        .groupby([id_col, "event_id"], as_index=False)["best"].min()
-        .assign(mode="average")
-    )
-    sngl_long = (
-        ranks_single[ranks_single["event_id"].isin(sngl_events_set)]
-        .groupby([id_col, "event_id"], as_index=False)["best"].min()
-        .assign(mode="single")
+    uses_average = np.isin(_ALL_KINCH_EVENTS, _KINCH_AVERAGE_EVENTS + _KINCH_BEST_OF_BOTH_EVENTS)
+    uses_single = np.isin(_ALL_KINCH_EVENTS, _KINCH_SINGLE_ONLY_EVENTS + _KINCH_BEST_OF_BOTH_EVENTS)
+
+    # Score = (benchmark / best) * 100, capped at 100; the better of the
+    # two for best-of-both events
+    ratio = np.fmax(
+        np.where(uses_average, bench_average / average, np.nan),
+        np.where(uses_single, bench_single / single, np.nan),
     )
-    long = pd.concat([avg_long, sngl_long], ignore_index=True)
-
-    # Merge benchmark records
-    wr_df = pd.concat([
-        wr_average.assign(mode="average"),
-        wr_single.assign(mode="single"),
-    ], ignore_index=True)
-    long = long.merge(wr_df, on=["event_id", "mode"], how="left")
-
-    # Score = (benchmark / best) * 100, capped at 100
-    long["score"] = (long["wr"] / long["best"]).clip(upper=1.0) * 100
-
-    # For best-of-both events, keep the better score per entity
-    scores = long.groupby([id_col, "event_id"], as_index=False)["score"].max()
+    row, column = np.nonzero(~np.isnan(ratio))
+    scores = pd.DataFrame({
+        id_col: ids[row],
+        "event_id": np.array(_ALL_KINCH_EVENTS)[column],
+        "score": np.minimum(ratio[row, column], 1.0) * 100,
+    })
 
     # MBLD from multi_results
     mbf_scores = _compute_mbld_kinch_scores(multi_results, id_col)
@@ -339,7 +377,7 @@ def _compute_mbld_kinch_scores(multi_results: pd.DataFrame, id_col: str) -> pd.D
 
     best_mbf = (
         pd.DataFrame({id_col: mbf[id_col].values, "kinch_val": kinch_val.values})
-        .groupby(id_col, as_index=False)["kinch_val"].max()
+        .groupby(id_col, observed=True, as_index=False)["kinch_val"].max()
     )
     benchmark = best_mbf["kinch_val"].max()
     if benchmark <= 0:
@@ -362,7 +400,7 @@ def _finalize_kinch_ranking(
     """
     pivot = (
         event_scores
-        .pivot_table(index=id_col, columns="event_id", values="score", aggfunc="max")
+        .pivot_table(index=id_col, columns="event_id", values="score", aggfunc="max", observed=True)
         .reindex(columns=_ALL_KINCH_EVENTS)
         .fillna(0.0)
     )
@@ -393,6 +431,432 @@ def _finalize_kinch_ranking(
     return result
 
 
+###################################################################
+##################### WORLD-SCALE KINCH & SOR #####################
+###################################################################
+
+
+# Benchmark pools of the world-scale Kinch/SOR, widest first
+_SCOPES = ("world", "continent", "country")
+
+# MBLD Kinch time limit per attempted cube (capped at 6 cubes), in seconds
+_MBLD_SECONDS_PER_CUBE = 10 * 60
+_MBLD_MAX_TIMED_CUBES = 6
+
+
+def _get_world_top(config: configparser.ConfigParser, logger: logging.Logger) -> int:
+    """
+    Read [sor_kinch] -> world_top, the length of the world Kinch/SOR
+    leaderboards (0 disables them). Falls back to 100 with a warning.
+    """
+    if not config.has_section("sor_kinch") or not config.has_option("sor_kinch", "world_top"):
+        logger.warning("Missing [sor_kinch] -> world_top in config.ini; defaulting to 100.")
+        return 100
+    return config["sor_kinch"].getint("world_top")
+
+
+def _reduce_groups(ufunc: np.ufunc, matrix: np.ndarray, group: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Column-wise `ufunc` (np.fmin / np.fmax: NaN-skipping) of the rows of
+    each group; rows without a group (-1) are left out. Returns the group
+    codes present, sorted, and one reduced row per group.
+    """
+    rows = np.flatnonzero(group >= 0)
+    order = rows[np.argsort(group[rows], kind="stable")]
+    groups, starts = np.unique(group[order], return_index=True)
+    if not len(order):
+        return groups, np.empty((0, matrix.shape[1]), dtype=matrix.dtype)
+    return groups, ufunc.reduceat(matrix[order], starts, axis=0)
+
+
+def _group_reduce(ufunc: np.ufunc, matrix: np.ndarray, group: np.ndarray) -> np.ndarray:
+    """
+    _reduce_groups broadcast back to the rows: the reduced row of each
+    row's group; NaN for rows without a group (-1).
+    """
+    groups, reduced = _reduce_groups(ufunc, matrix, group)
+    lookup = np.full((int(groups.max()) + 1 if len(groups) else 0, matrix.shape[1]), np.nan, dtype=matrix.dtype)
+    lookup[groups] = reduced
+
+    rows = np.flatnonzero(group >= 0)
+    out = np.full_like(matrix, np.nan)
+    out[rows] = lookup[group[rows]]
+    return out
+
+
+def _mbld_kinch_values(values: np.ndarray) -> np.ndarray:
+    """
+    MBLD Kinch value (see _compute_mbld_kinch_scores) of raw 333mbf results,
+    decoded in one pass; NaN where there is no result.
+    """
+    decoded = uw.decode_multi(values)
+    time_limit = decoded["attempted"].clip(upper=_MBLD_MAX_TIMED_CUBES) * _MBLD_SECONDS_PER_CUBE
+    return (decoded["points"] + (time_limit - decoded["time"] / 100) / time_limit).to_numpy(dtype=np.float64)
+
+
+def _kinch_matrix(single: np.ndarray, average: np.ndarray, group: np.ndarray) -> np.ndarray:
+    """
+    Per-person per-event Kinch scores (persons x _ALL_KINCH_EVENTS, 0 where
+    none) against the best result of the person's `group`, with the same
+    event rules as _compute_kinch_event_scores. `single` holds MBLD Kinch
+    values (higher is better) in the MBLD column.
+    """
+    uses_average = np.isin(_ALL_KINCH_EVENTS, _KINCH_AVERAGE_EVENTS + _KINCH_BEST_OF_BOTH_EVENTS)
+    uses_single = np.isin(_ALL_KINCH_EVENTS, _KINCH_SINGLE_ONLY_EVENTS + _KINCH_BEST_OF_BOTH_EVENTS)
+    mbld = _ALL_KINCH_EVENTS.index(_KINCH_MBLD_EVENT)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio_single = _group_reduce(np.fmin, single, group) / single
+        ratio_average = _group_reduce(np.fmin, average, group) / average
+        ratio_single[:, mbld] = single[:, mbld] / _group_reduce(np.fmax, single[:, [mbld]], group)[:, 0]
+
+    scores = np.fmax(
+        np.where(uses_average, ratio_average, np.nan),
+        np.where(uses_single | (np.arange(_N_KINCH_EVENTS) == mbld), ratio_single, np.nan),
+    )
+    return np.nan_to_num(np.minimum(scores, 1.0) * 100, nan=0.0)
+
+
+def _sor(ranks: np.ndarray, group: np.ndarray) -> np.ndarray:
+    """
+    Sum of ranks of every row of `ranks` (persons x events), missing events
+    counted as the worst rank of the person's group in that event + 1.
+    NaN for rows without any rank or group.
+    """
+    has_rank = ~np.isnan(ranks).all(axis=1) & (group >= 0)
+    filled = np.where(np.isnan(ranks), _group_reduce(np.fmax, ranks, np.where(has_rank, group, -1)) + 1, ranks)
+    return np.where(has_rank, np.nansum(filled, axis=1), np.nan)
+
+
+@uw.product("world_kinch_sor", deps=("pb_matrix", "countries"), persist=True)
+def _build_world_kinch_sor(db_tables: dict, config, logger) -> pd.DataFrame:
+    """
+    Product 'world_kinch_sor': Kinch and single/average SOR of every ranked
+    competitor, against the world, their continent and their country
+    (current nationality, as in ranks_*).
+
+    Works on the dense persons x events matrices of the pb_matrix (PBs for
+    Kinch, world/continent/country ranks for SOR); benchmarks and worst
+    ranks per pool are column-wise reductions over the persons of each
+    group, so every score is whole-matrix arithmetic. MBLD is scored from
+    the decoded single PB rather than from every attempt.
+    """
+    pbs = db_tables["pb_matrix"]
+    countries = db_tables["countries"]
+    country = pbs.country
+
+    # Continent of every person code
+    continent_dtype = pd.CategoricalDtype(sorted(countries["continent_id"].dropna().unique()))
+    continent_of = np.full(len(pbs.country_dtype.categories), -1, dtype=np.int64)
+    country_codes = pd.Categorical(countries["id"], dtype=pbs.country_dtype).codes
+    continent_of[country_codes[country_codes >= 0]] = pd.Categorical(
+        countries["continent_id"], dtype=continent_dtype
+    ).codes[country_codes >= 0]
+    continent = np.where(country >= 0, continent_of[country], -1)
+    groups = {"world": np.where(country >= 0, 0, -1), "continent": continent, "country": country}
+
+    # --- Kinch: PB matrices, MBLD as Kinch values ---
+    single = pbs.values("single", _ALL_KINCH_EVENTS)
+    average = pbs.values("average", _ALL_KINCH_EVENTS)
+    mbld = _ALL_KINCH_EVENTS.index(_KINCH_MBLD_EVENT)
+    mbld_code = pbs.event_dtype.categories.get_indexer([_KINCH_MBLD_EVENT])[0]
+    single[:, mbld] = np.nan
+    if mbld_code >= 0:
+        raw = pbs.best["single"][:, mbld_code]
+        single[raw > 0, mbld] = _mbld_kinch_values(raw[raw > 0].astype(np.int64))
+
+    # Every person with a PB and a known country
+    people = pbs.persons()
+    people = people[country[people] >= 0]
+
+    df = pd.DataFrame({
+        "person_id": pbs.person_ids(people),
+        "country_id": pd.Categorical.from_codes(country[people], dtype=pbs.country_dtype),
+        "continent_id": pd.Categorical.from_codes(continent[people], dtype=continent_dtype),
+    })
+    for scope in _SCOPES:
+        kinch = _kinch_matrix(single, average, groups[scope])
+        df[f"kinch_{scope}"] = kinch[people].sum(axis=1) / _N_KINCH_EVENTS
+
+    # --- SOR: rank matrices over the current events ---
+    for kind in ("single", "average"):
+        for scope in _SCOPES:
+            matrix = pbs.ranks(kind, scope, config.current_events)
+            df[f"sor_{kind}_{scope}"] = _sor(matrix, groups[scope])[people]
+
+    logger.info(f"Computed world, continental and national Kinch/SOR for {len(df):,} competitors")
+    return df
+
+
+def compute_world_kinch_leaderboard(db_tables: dict, config, logger, top: int) -> pd.DataFrame:
+    """
+    The `top` competitors of the world by world-benchmark Kinch, with their
+    continental and national Kinch and the rank in each pool.
+    """
+    try:
+        logger.info(f"Computing the world Kinch leaderboard (top {top})")
+        scores = uw.get_product("world_kinch_sor", db_tables, config, logger)
+        return _world_leaderboard(db_tables, scores, "kinch", ascending=False, top=top, label="Kinch")
+
+    except Exception as e:
+        logger.error(f"Error computing the world Kinch leaderboard: {e}", exc_info=True)
+        return pd.DataFrame()
+
+
+def compute_world_sor_leaderboard(db_tables: dict, config, logger, kind: str, top: int) -> pd.DataFrame:
+    """
+    The `top` competitors of the world by world Sum of Ranks (`kind` =
+    single/average), with their continental and national SOR and the rank
+    in each pool.
+    """
+    try:
+        logger.info(f"Computing the world SOR {kind} leaderboard (top {top})")
+        scores = uw.get_product("world_kinch_sor", db_tables, config, logger)
+        return _world_leaderboard(db_tables, scores, f"sor_{kind}", ascending=True, top=top, label=f"SOR {kind}")
+
+    except Exception as e:
+        logger.error(f"Error computing the world SOR {kind} leaderboard: {e}", exc_info=True)
+        return pd.DataFrame()
+
+
+def _world_leaderboard(db_tables: dict, scores: pd.DataFrame, prefix: str, ascending: bool, top: int, label: str) -> pd.DataFrame:
+    """Top `top` rows of `scores` by `<prefix>_world`, with the score and rank of every pool."""
+    scores = scores.dropna(subset=[f"{prefix}_world"])
+    pools = {"world": None, "continent": "continent_id", "country": "country_id"}
+
+    ranked = scores[["person_id", "country_id"]].copy()
+    for scope, by in pools.items():
+        column = scores[f"{prefix}_{scope}"]
+        ranked[f"{label} ({scope.title()})"] = column.round(2)
+        rank = column.rank(method="min", ascending=ascending) if by is None else (
+            column.groupby(scores[by], observed=True).rank(method="min", ascending=ascending)
+        )
+        ranked[f"{scope.title()} Rank"] = rank.astype("Int32")
+
+    names = uw.get_current_persons(db_tables).set_index("wca_id")["name"]
+    out = (
+        ranked.sort_values(["World Rank", "person_id"])
+        .head(top)
+        .assign(Name=lambda d: d["person_id"].map(names))
+        .rename(columns={"person_id": "WCAID", "country_id": "Country"})
+        .reset_index(drop=True)
+    )
+    out.index += 1
+    return out[["Name", "WCAID", "Country"] + [c for c in out.columns if c not in ("Name", "WCAID", "Country")]]
+
+
+###################################################################
+###################### KINCH & SOR HISTORY ########################
+###################################################################
+
+
+def _get_history_settings(config: configparser.ConfigParser, logger: logging.Logger) -> tuple[str, int]:
+    """
+    Read [sor_kinch] -> history_freq (pandas frequency of the Kinch/SOR
+    snapshots, e.g. ME, QE, YE) and history_top (lines per history plot).
+    Falls back to month ends and 10 with a warning.
+    """
+    if not config.has_section("sor_kinch") or not config.has_option("sor_kinch", "history_freq"):
+        logger.warning("Missing [sor_kinch] -> history_freq in config.ini; defaulting to month ends (ME).")
+    cfg = config["sor_kinch"] if config.has_section("sor_kinch") else {}
+    return cfg.get("history_freq", "ME").strip(), int(cfg.get("history_top", 10))
+
+
+class _KinchState:
+    """
+    Running PBs, benchmarks and Kinch scores of the incremental Kinch/SOR
+    walk (see _build_kinch_sor_history). PB matrices are persons x event
+    codes; `kinch` holds the per-event Kinch score of every person
+    (persons x _ALL_KINCH_EVENTS) and `total` its row sums, kept in step
+    with only the cells and benchmark columns a batch of PBs changes.
+    """
+
+    def __init__(self, n_persons: int, n_events: int, kinch_codes: np.ndarray):
+        self.single = np.full((n_persons, n_events), np.nan)
+        self.average = np.full((n_persons, n_events), np.nan)
+        self.mbld_cost = np.full(n_persons, np.nan)      # 1 / MBLD Kinch value of the single PB
+        self.bench_single = np.full(n_events, np.nan)
+        self.bench_average = np.full(n_events, np.nan)
+        self.bench_mbld = np.full(1, np.nan)
+        self.kinch = np.zeros((n_persons, _N_KINCH_EVENTS))
+        self.total = np.zeros(n_persons)
+
+        self.codes = kinch_codes
+        self.uses_average = np.isin(_ALL_KINCH_EVENTS, _KINCH_AVERAGE_EVENTS + _KINCH_BEST_OF_BOTH_EVENTS)
+        self.uses_single = np.isin(_ALL_KINCH_EVENTS, _KINCH_SINGLE_ONLY_EVENTS + _KINCH_BEST_OF_BOTH_EVENTS + [_KINCH_MBLD_EVENT])
+        self.mbld = _ALL_KINCH_EVENTS.index(_KINCH_MBLD_EVENT)
+
+    def scores(self, persons: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """Kinch score (0-100) of each (person, Kinch column) pair."""
+        codes = self.codes[columns]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio_single = np.where(
+                columns == self.mbld,
+                self.bench_mbld[0] / self.mbld_cost[persons],
+                self.bench_single[codes] / self.single[persons, codes],
+            )
+            ratio_average = self.bench_average[codes] / self.average[persons, codes]
+        ratio = np.fmax(
+            np.where(self.uses_average[columns], ratio_average, np.nan),
+            np.where(self.uses_single[columns], ratio_single, np.nan),
+        )
+        ratio = np.where(codes >= 0, ratio, np.nan)
+        return np.nan_to_num(np.minimum(ratio, 1.0) * 100, nan=0.0)
+
+    def apply(self, person: np.ndarray, event: np.ndarray, is_single: np.ndarray, value: np.ndarray) -> None:
+        """Record a batch of PB improvements and update the affected Kinch scores."""
+        before = np.r_[self.bench_single, self.bench_average, self.bench_mbld]
+
+        # PBs only improve, so the minimum is the latest one
+        for matrix, bench, rows in ((self.single, self.bench_single, is_single), (self.average, self.bench_average, ~is_single)):
+            np.fmin.at(matrix, (person[rows], event[rows]), value[rows])
+            np.fmin.at(bench, event[rows], value[rows])
+
+        mbld_code = self.codes[self.mbld]
+        touched_mbld = np.unique(person[is_single & (event == mbld_code)])
+        if len(touched_mbld):
+            kinch_value = _mbld_kinch_values(self.single[touched_mbld, mbld_code].astype(np.int64))
+            with np.errstate(divide="ignore"):
+                self.mbld_cost[touched_mbld] = np.where(kinch_value > 0, 1 / kinch_value, np.nan)
+            self.bench_mbld = np.fmin(self.bench_mbld, np.fmin.reduce(self.mbld_cost[touched_mbld]))
+
+        # Kinch columns whose benchmark moved are rescored whole
+        after = np.r_[self.bench_single, self.bench_average, self.bench_mbld]
+        moved = ~((before == after) | (np.isnan(before) & np.isnan(after)))
+        n = len(self.bench_single)
+        moved_codes = np.flatnonzero(moved[:n] | moved[n:2 * n])
+        rescored = np.isin(self.codes, moved_codes)
+        rescored[self.mbld] |= bool(moved[-1])
+
+        everyone = np.arange(len(self.total))
+        for column in np.flatnonzero(rescored):
+            new = self.scores(everyone, np.full(len(everyone), column))
+            self.total += new - self.kinch[:, column]
+            self.kinch[:, column] = new
+
+        # Then the cells of the new PBs in the other columns
+        column_of = np.full(n, -1)
+        column_of[self.codes[self.codes >= 0]] = np.flatnonzero(self.codes >= 0)
+        column = column_of[event]
+        keep = (column >= 0) & ~rescored[np.maximum(column, 0)]
+        cells = np.unique(np.c_[person[keep], column[keep]], axis=0)
+        if len(cells):
+            p, c = cells[:, 0], cells[:, 1]
+            new = self.scores(p, c)
+            np.add.at(self.total, p, new - self.kinch[p, c])
+            self.kinch[p, c] = new
+
+
+def _national_sor(matrix: np.ndarray, pool: np.ndarray, codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sum of ranks among `pool` (person codes) over the `codes` columns of a
+    PB matrix, as _compute_sor: missing events count as the pool's worst
+    rank + 1. Returns the persons with a PB in any column and their SOR.
+    """
+    values = matrix[np.ix_(pool, codes)]
+    has = ~np.isnan(values)
+    ranked = has.any(axis=1)
+    values, has = values[ranked], has[ranked]
+
+    ranks = np.zeros(values.shape)
+    for j in range(values.shape[1]):
+        present = np.sort(values[has[:, j], j])
+        ranks[has[:, j], j] = np.searchsorted(present, values[has[:, j], j], side="left") + 1
+    worst = np.where(has, ranks, 0).max(axis=0) + 1
+    return pool[ranked], np.where(has, ranks, np.where(has.any(axis=0), worst, 0)).sum(axis=1)
+
+
+@uw.product("kinch_sor_history", deps=("pb_progression", "persons"))
+def _build_kinch_sor_history(db_tables: dict, config, logger) -> dict[str, pd.DataFrame]:
+    """
+    Product 'kinch_sor_history': Kinch (world benchmark) and national SOR
+    of every competitor of config.nationality, and the Kinch of every
+    country (its best results against the World Records), at every
+    [sor_kinch] history_freq date. {"persons": date, person_id, kinch,
+    sor_single, sor_average; "countries": date, country_id, kinch}.
+
+    The PB improvements of 'pb_progression' are replayed in date order, one
+    batch per snapshot, through a _KinchState: only the new PBs' cells are
+    rescored, plus whole columns when a record (the benchmark) moves.
+    Nationality is the current one for persons and countries alike, as in
+    the ranks-based tables; MBLD is scored from the single PB.
+    """
+    progression = uw.get_product("pb_progression", db_tables, config, logger)
+    persons = db_tables["persons"].query("sub_id == 1")
+    freq, _ = _get_history_settings(config, logger)
+
+    person_dtype = progression["person_id"].dtype
+    event_dtype = progression["event_id"].dtype
+    country_dtype = persons["country_id"].dtype
+    n_persons, n_events, n_countries = len(person_dtype.categories), len(event_dtype.categories), len(country_dtype.categories)
+
+    country_of = np.full(n_persons, -1, dtype=np.int64)
+    country_of[persons["wca_id"].cat.codes.to_numpy()] = persons["country_id"].cat.codes.to_numpy()
+    nationality = country_dtype.categories.get_indexer([config.nationality])[0]
+    pool = np.flatnonzero(country_of == nationality) if nationality >= 0 else np.zeros(0, dtype=np.int64)
+
+    kinch_codes = event_dtype.categories.get_indexer(_ALL_KINCH_EVENTS)
+    sor_codes = event_dtype.categories.get_indexer(config.current_events)
+    sor_codes = sor_codes[sor_codes >= 0]
+
+    # PB improvements in date order
+    day = (progression["date"] - pd.Timestamp("1970-01-01")).dt.days.to_numpy()
+    order = np.argsort(day, kind="stable")
+    day = day[order]
+    person = progression["person_id"].cat.codes.to_numpy()[order].astype(np.int64)
+    event = progression["event_id"].cat.codes.to_numpy()[order].astype(np.int64)
+    is_single = (progression["type"] == "single").to_numpy()[order]
+    value = progression["value"].to_numpy()[order].astype(np.float64)
+
+    if not len(day):
+        logger.warning("No PB history available; Kinch/SOR history is empty.")
+        return {"persons": pd.DataFrame(), "countries": pd.DataFrame()}
+
+    # Snapshot dates up to the first one on or after the last PB
+    epoch = pd.Timestamp("1970-01-01")
+    first, last = epoch + pd.Timedelta(days=int(day[0])), epoch + pd.Timedelta(days=int(day[-1]))
+    dates = pd.date_range(first, last + pd.tseries.frequencies.to_offset(freq), freq=freq)
+    dates = dates[: np.searchsorted(dates, last) + 1]
+    bounds = np.searchsorted(day, (dates - epoch).days.to_numpy(), side="right")
+
+    state = _KinchState(n_persons, n_events, kinch_codes)
+    countries = _KinchState(n_countries, n_events, kinch_codes)
+    has_country = country_of[person] >= 0
+
+    person_frames, country_frames = [], []
+    start = 0
+    for date, stop in zip(dates, bounds):
+        batch = slice(start, stop)
+        state.apply(person[batch], event[batch], is_single[batch], value[batch])
+        in_country = has_country[batch]
+        countries.apply(
+            country_of[person[batch]][in_country], event[batch][in_country],
+            is_single[batch][in_country], value[batch][in_country],
+        )
+        start = stop
+
+        # --- Snapshot ---
+        active = pool[state.total[pool] > 0]
+        frame = pd.DataFrame({"person_id": active, "kinch": state.total[active] / _N_KINCH_EVENTS})
+        for kind, matrix in (("single", state.single), ("average", state.average)):
+            who, sor = _national_sor(matrix, pool, sor_codes)
+            frame = frame.merge(pd.DataFrame({"person_id": who, f"sor_{kind}": sor}), on="person_id", how="outer")
+        person_frames.append(frame.assign(date=date))
+
+        ranked = np.flatnonzero(countries.total > 0)
+        country_frames.append(pd.DataFrame({"date": date, "country_id": ranked, "kinch": countries.total[ranked] / _N_KINCH_EVENTS}))
+
+    people = pd.concat(person_frames, ignore_index=True)
+    people["person_id"] = pd.Categorical.from_codes(people["person_id"].to_numpy(), dtype=person_dtype)
+    people = people[["date", "person_id", "kinch", "sor_single", "sor_average"]].fillna({"kinch": 0.0})
+
+    nations = pd.concat(country_frames, ignore_index=True)
+    nations["country_id"] = pd.Categorical.from_codes(nations["country_id"].to_numpy(), dtype=country_dtype)
+
+    logger.info(f"Replayed {len(day):,} PB improvements into {len(dates):,} Kinch/SOR snapshots")
+    return {"persons": people, "countries": nations}
+
+
 ###################################################################
 ########################### KINCH PLOTS ###########################
 ###################################################################
@@ -594,7 +1058,7 @@ def plot_country_kinch_vs_size(
         persons = db_tables["persons"]
         size = (
             persons[persons["sub_id"] == 1]
-            .groupby("country_id", as_index=False)["wca_id"].count()
+            .groupby("country_id", observed=True, as_index=False)["wca_id"].count()
             .rename(columns={"wca_id": "n", "country_id": "Country"})
         )
 
@@ -685,6 +1149,109 @@ def plot_country_kinch_vs_size(
         return None
 
 
+def _plot_history(
+    history: pd.DataFrame,
+    id_col: str,
+    value_col: str,
+    ids: list,
+    labels: pd.Series | None,
+    title: str,
+    ylabel: str,
+) -> plt.Figure:
+    """One line per id in `ids` of `value_col` over the snapshot dates of `history`."""
+    wide = (
+        history[history[id_col].isin(ids)]
+        .assign(**{id_col: lambda d: d[id_col].astype(str)})
+        .pivot(index="date", columns=id_col, values=value_col)
+    )
+
+    fig, ax = plt.subplots()
+    for entity in map(str, ids):
+        if entity in wide.columns:
+            label = labels.get(entity, entity) if labels is not None else entity
+            ax.plot(wide.index, wide[entity], label=label)
+
+    ax.set_title(title, fontweight="bold")
+    ax.set_xlabel("Date", fontweight="bold")
+    ax.set_ylabel(ylabel, fontweight="bold")
+    ax.grid(True, which="major", zorder=1)
+    ax.legend(loc="best", fontsize=8, ncol=2)
+
+    fig.tight_layout()
+    plt.close(fig)
+    return fig
+
+
+def plot_kinch_history(db_tables: dict, config, logger, top: int) -> plt.Figure | None:
+    """Kinch (world benchmark) over time of today's top `top` competitors of config.nationality."""
+    try:
+        logger.info(f"Plotting the Kinch history of the {config.nationality} top {top}")
+        history = uw.get_product("kinch_sor_history", db_tables, config, logger)["persons"]
+        if history.empty:
+            logger.warning("No Kinch history available; skipping plot.")
+            return None
+
+        latest = history[history["date"] == history["date"].max()]
+        leaders = latest.nlargest(top, "kinch")["person_id"].astype(str).tolist()
+        names = uw.get_current_persons(db_tables).set_index("wca_id")["name"]
+        return _plot_history(
+            history, "person_id", "kinch", leaders, names,
+            title=f"Kinch history - current top {top}, {config.nationality}", ylabel="Kinch (world benchmark)",
+        )
+
+    except Exception as e:
+        logger.error(f"Error plotting the Kinch history: {e}", exc_info=True)
+        return None
+
+
+def plot_sor_history(db_tables: dict, config, logger, kind: str, top: int) -> plt.Figure | None:
+    """National SOR (`kind` = single/average) over time of today's top `top` competitors of config.nationality."""
+    try:
+        logger.info(f"Plotting the SOR {kind} history of the {config.nationality} top {top}")
+        history = uw.get_product("kinch_sor_history", db_tables, config, logger)["persons"]
+        column = f"sor_{kind}"
+        if history.empty or history[column].isna().all():
+            logger.warning(f"No SOR {kind} history available; skipping plot.")
+            return None
+
+        latest = history[history["date"] == history["date"].max()]
+        leaders = latest.nsmallest(top, column)["person_id"].astype(str).tolist()
+        names = uw.get_current_persons(db_tables).set_index("wca_id")["name"]
+        fig = _plot_history(
+            history, "person_id", column, leaders, names,
+            title=f"SOR {kind} history - current top {top}, {config.nationality}", ylabel=f"SOR {kind} (national)",
+        )
+        fig.axes[0].invert_yaxis()
+        return fig
+
+    except Exception as e:
+        logger.error(f"Error plotting the SOR {kind} history: {e}", exc_info=True)
+        return None
+
+
+def plot_country_kinch_history(db_tables: dict, config, logger, top: int) -> plt.Figure | None:
+    """Country Kinch over time of today's top `top` countries and config.country."""
+    try:
+        logger.info(f"Plotting the Country Kinch history (top {top})")
+        history = uw.get_product("kinch_sor_history", db_tables, config, logger)["countries"]
+        if history.empty:
+            logger.warning("No Country Kinch history available; skipping plot.")
+            return None
+
+        latest = history[history["date"] == history["date"].max()]
+        leaders = latest.nlargest(top, "kinch")["country_id"].astype(str).tolist()
+        if config.country not in leaders:
+            leaders.append(config.country)
+        return _plot_history(
+            history, "country_id", "kinch", leaders, None,
+            title=f"Country Kinch history - current top {top} and {config.country}", ylabel="Country Kinch",
+        )
+
+    except Exception as e:
+        logger.error(f"Error plotting the Country Kinch history: {e}", exc_info=True)
+        return None
+
+
 ###################################################################
 ############################### RUN ###############################
 ###################################################################
@@ -694,6 +1261,9 @@ def run(db_tables, config):
  
     logger = logging.getLogger(__name__)
     logger.info("Producing stats for SOR & Kinch module")
+
+    world_top = _get_world_top(config, logger)
+    _, history_top = _get_history_settings(config, logger)
  
     # --- Tables ---
     kinch_world = compute_kinch_score(db_tables=db_tables, config=config, logger=logger)
@@ -707,6 +1277,10 @@ def run(db_tables, config):
         "Kinch (National)": kinch_national,
         "Country Kinch": kinch_country,
     }
+    if world_top > 0:
+        results["World Kinch"] = compute_world_kinch_leaderboard(db_tables, config, logger, top=world_top)
+        for kind in ("single", "average"):
+            results[f"World SOR {kind.title()}"] = compute_world_sor_leaderboard(db_tables, config, logger, kind=kind, top=world_top)
  
     # --- Figures ---
     figures = {}
@@ -715,6 +1289,10 @@ def run(db_tables, config):
     figures["Country Kinch vs Size"] = plot_country_kinch_vs_size(
         db_tables=db_tables, config=config, logger=logger, country_kinch=kinch_country
     )
+    figures["Kinch History"] = plot_kinch_history(db_tables, config, logger, top=history_top)
+    for kind in ("single", "average"):
+        figures[f"SOR {kind.title()} History"] = plot_sor_history(db_tables, config, logger, kind=kind, top=history_top)
+    figures["Country Kinch History"] = plot_country_kinch_history(db_tables, config, logger, top=history_top)
  
     section_name = __name__.split(".")[-1]
     uw.export_data(results, figures=figures, section_name=section_name, config=config, logger=logger)
\ No newline at end of file
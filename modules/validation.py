@@ -0,0 +1,292 @@
+import pandas as pd
+import numpy as np
+import logging
+import configparser
+import utils_wca as uw
+
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+_MBLD_EVENT = "333mbf"
+_FMC_EVENT = "333fm"
+
+# Formats with fewer attempts than this never carry an average (Bo1, Bo2)
+_MIN_AVERAGE_SOLVES = 3
+
+# Raw export columns this module reads, directly or through the pre-filtered
+# tables built by process_tables (see uw.resolve_table_columns).
+REQUIRED_COLUMNS = {
+    "results": [
+        "id", "pos", "best", "average", "competition_id", "round_type_id", "event_id",
+        "format_id", "person_id",
+    ],
+    "attempts": ["value", "attempt_number", "result_id"],
+    "formats": ["id", "sort_by", "expected_solve_count", "trim_fastest_n", "trim_slowest_n"],
+}
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def recompute_best(values: np.ndarray, filled: np.ndarray) -> np.ndarray:
+    """
+    Best of every attempt row, as the export stores it: the fastest success,
+    else -1 if any attempt is a DNF, -2 if all are DNS, 0 without attempts.
+    """
+    solved = filled & (values > 0)
+    fastest = np.where(solved, values, np.iinfo(np.int32).max).min(axis=1, initial=np.iinfo(np.int32).max)
+    failed = np.where((filled & (values == -1)).any(axis=1), -1, np.where(filled.any(axis=1), -2, 0))
+    return np.where(solved.any(axis=1), fastest, failed).astype(np.int32)
+
+
+def recompute_average(values: np.ndarray, filled: np.ndarray, solves: int, trim_fastest: int, trim_slowest: int, fmc: np.ndarray) -> np.ndarray:
+    """
+    Average of every attempt row for one format, with the WCA rules: rows
+    without all `solves` attempts (cutoff not made) have none (0); otherwise
+    the attempts are sorted with DNF/DNS as +inf, the trimmed ones dropped,
+    and the result is a DNF (-1) if an unsuccessful attempt still counts.
+    Times go through uw.round_average; FMC means are stored x100, rounded.
+    """
+    values = values[:, :solves]
+    complete = filled[:, :solves].all(axis=1)
+
+    ordered = np.sort(np.where(values > 0, values, np.inf), axis=1)
+    counting = ordered[:, trim_fastest:solves - trim_slowest]
+    n = counting.shape[1]
+    dnf = ~np.isfinite(counting[:, -1])
+
+    totals = np.where(dnf[:, None], 0, counting).sum(axis=1)
+    average = np.where(fmc, np.floor(totals * 100 / n + 0.5), uw.round_average(totals, n))
+
+    return np.where(~complete, 0, np.where(dnf, -1, average)).astype(np.int32)
+
+
+###################################################################
+######################### COMPUTATIONS ############################
+###################################################################
+
+
+@uw.product("recomputed_results", deps=("results", "attempt_matrix", "formats"))
+def _build_recomputed_results(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger
+) -> pd.DataFrame:
+    """
+    Product 'recomputed_results': best and average of every result recomputed
+    from its attempts, aligned with db_tables["results"]. Each format is
+    handled in one vectorised pass with its expected_solve_count and trims
+    from the formats table. MBLD averages are not recomputed (NaN).
+    """
+    results = db_tables["results"]
+    matrix = db_tables["attempt_matrix"]
+    formats = db_tables["formats"].set_index("id")
+
+    best = recompute_best(matrix.values, matrix.filled)
+    average = np.zeros(len(results), dtype=np.float64)
+
+    event = results["event_id"].astype(str).to_numpy()
+    fmt = results["format_id"].astype(str).to_numpy()
+
+    for format_id in np.unique(fmt):
+        if format_id not in formats.index:
+            logger.warning(f"Format '{format_id}' not in the formats table; its averages are not checked.")
+            average[fmt == format_id] = np.nan
+            continue
+
+        spec = formats.loc[format_id]
+        solves = int(spec["expected_solve_count"])
+        if solves < _MIN_AVERAGE_SOLVES:
+            continue
+
+        rows = np.flatnonzero(fmt == format_id)
+        sub = matrix.rows(rows)
+        average[rows] = recompute_average(
+            sub.values, sub.filled, solves,
+            int(spec["trim_fastest_n"]), int(spec["trim_slowest_n"]),
+            event[rows] == _FMC_EVENT,
+        )
+
+    average[event == _MBLD_EVENT] = np.nan
+
+    logger.info(f"Recomputed best/average of {len(results):,} results from their attempts.")
+    return pd.DataFrame({"best": best, "average": average}, index=results.index)
+
+
+def _attempt_columns(db_tables: dict, rows: np.ndarray) -> pd.DataFrame:
+    """value1..value5 of the given `results` rows, blank where there is no attempt."""
+    sub = db_tables["attempt_matrix"].rows(rows)
+    return pd.DataFrame({
+        f"value{k + 1}": pd.Series(sub.values[:, k]).where(sub.filled[:, k]).astype("Int32")
+        for k in range(sub.values.shape[1])
+    })
+
+
+def _stored_vs_recomputed(
+    db_tables: dict,
+    config: configparser.ConfigParser,
+    logger: logging.Logger,
+    column: str
+) -> pd.DataFrame:
+    """
+    Results whose stored `column` (best/average) differs from the value
+    recomputed from the attempts. DNF and DNS count as the same outcome, as
+    the export is not consistent in telling them apart for averages.
+    """
+    results = db_tables["results"]
+    recomputed = uw.get_product("recomputed_results", db_tables, config, logger)[column].to_numpy()
+    stored = results[column].to_numpy()
+
+    checked = ~np.isnan(recomputed)
+    both_failed = (stored < 0) & (recomputed < 0)
+    rows = np.flatnonzero(checked & ~both_failed & (stored != recomputed))
+
+    df = results.iloc[rows][["id", "competition_id", "event_id", "round_type_id", "format_id", "person_id", column]]
+    df = df.assign(**{f"recomputed_{column}": recomputed[rows].astype(np.int64)}).reset_index(drop=True)
+    return pd.concat([df, _attempt_columns(db_tables, rows)], axis=1)
+
+
+def compute_average_mismatches(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> pd.DataFrame:
+    """Results whose stored average differs from the one recomputed from the attempts."""
+    try:
+        logger.info("Checking stored averages against the attempts...")
+        df = _stored_vs_recomputed(db_tables, config, logger, "average")
+        logger.info(f"{len(df):,} average mismatch(es).")
+        return df
+
+    except Exception as e:
+        logger.error(f"Error checking averages: {e}", exc_info=True)
+        return pd.DataFrame()
+
+
+def compute_best_mismatches(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> pd.DataFrame:
+    """Results whose stored best differs from the best attempt."""
+    try:
+        logger.info("Checking stored bests against the attempts...")
+        df = _stored_vs_recomputed(db_tables, config, logger, "best")
+        logger.info(f"{len(df):,} best mismatch(es).")
+        return df
+
+    except Exception as e:
+        logger.error(f"Error checking bests: {e}", exc_info=True)
+        return pd.DataFrame()
+
+
+def compute_position_violations(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> pd.DataFrame:
+    """
+    Rounds where `pos` does not follow the results. Within each round the
+    results are ordered by pos; the ranking key is (average, best) for
+    formats sorted by average and (best, average) otherwise, with invalid
+    results after valid ones. A row is reported when its key is better
+    than the previous row's (out of order), or when it shares the previous
+    row's pos with a different key (false tie).
+
+    Results without a valid ranking value are not ordered against each other
+    when one has a DNF and the other no result at all (cutoff), since the
+    export orders those groups inconsistently over the years.
+    """
+    try:
+        logger.info("Checking positions within rounds...")
+
+        results = db_tables["results"]
+        by_average = results["format_id"].astype(str).map(
+            db_tables["formats"].set_index("id")["sort_by"].eq("average")
+        ).fillna(False).to_numpy(dtype=bool)
+
+        best = results["best"].to_numpy()
+        average = results["average"].to_numpy()
+        primary = np.where(by_average, average, best)
+        secondary = np.where(by_average, best, average)
+
+        # Invalid values sort last; their kind (DNF vs none) is kept aside
+        k1 = np.where(primary > 0, primary, np.inf)
+        k2 = np.where(secondary > 0, secondary, np.inf)
+        kind = np.sign(primary)
+
+        pos = results["pos"].to_numpy()
+        round_keys = [results[c].cat.codes.to_numpy() for c in ("competition_id", "event_id", "round_type_id")]
+        order = np.lexsort([pos] + round_keys[::-1])
+
+        k1, k2, kind, pos = k1[order], k2[order], kind[order], pos[order]
+        same_round = np.ones(len(order), dtype=bool)
+        for codes in round_keys:
+            codes = codes[order]
+            same_round[1:] &= codes[1:] == codes[:-1]
+        same_round[0] = False
+
+        prev = slice(None, -1)
+        cur = slice(1, None)
+        comparable = np.zeros(len(order), dtype=bool)
+        comparable[cur] = (kind[cur] == kind[prev]) | (np.isfinite(k1[cur]) | np.isfinite(k1[prev]))
+
+        better = np.zeros(len(order), dtype=bool)
+        better[cur] = (k1[cur] < k1[prev]) | ((k1[cur] == k1[prev]) & (k2[cur] < k2[prev]))
+        false_tie = np.zeros(len(order), dtype=bool)
+        false_tie[cur] = (pos[cur] == pos[prev]) & ((k1[cur] != k1[prev]) | (k2[cur] != k2[prev]))
+
+        out_of_order = same_round & comparable & better
+        tied = same_round & comparable & false_tie & ~out_of_order
+        flagged = np.flatnonzero(out_of_order | tied)
+
+        rows = order[flagged]
+        prev_rows = order[flagged - 1]
+        df = pd.DataFrame({
+            "competition_id": results["competition_id"].to_numpy()[rows],
+            "event_id": results["event_id"].to_numpy()[rows],
+            "round_type_id": results["round_type_id"].to_numpy()[rows],
+            "issue": np.where(out_of_order[flagged], "out of order", "false tie"),
+            "pos": results["pos"].to_numpy()[rows],
+            "person_id": results["person_id"].to_numpy()[rows],
+            "best": best[rows],
+            "average": average[rows],
+            "previous_pos": results["pos"].to_numpy()[prev_rows],
+            "previous_person_id": results["person_id"].to_numpy()[prev_rows],
+            "previous_best": best[prev_rows],
+            "previous_average": average[prev_rows],
+        })
+
+        logger.info(f"{len(df):,} position issue(s).")
+        return df
+
+    except Exception as e:
+        logger.error(f"Error checking positions: {e}", exc_info=True)
+        return pd.DataFrame()
+
+
+def compute_summary(db_tables: dict, checks: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """One row per check with the number of flagged rows."""
+    return pd.DataFrame({
+        "Check": list(checks),
+        "Results Checked": len(db_tables["results"]),
+        "Issues": [len(df) for df in checks.values()],
+    })
+
+
+###################################################################
+############################### RUN ###############################
+###################################################################
+
+
+def run(db_tables, config):
+
+    logger = logging.getLogger(__name__)
+    logger.info("Validating the export")
+
+    checks = {
+        "Average Mismatches": compute_average_mismatches(db_tables=db_tables, config=config, logger=logger),
+        "Best Mismatches": compute_best_mismatches(db_tables=db_tables, config=config, logger=logger),
+        "Position Issues": compute_position_violations(db_tables=db_tables, config=config, logger=logger),
+    }
+
+    issues = sum(len(df) for df in checks.values())
+    if issues:
+        logger.warning(f"Export validation found {issues:,} issue(s); see the validation report.")
+
+    results = {"Summary": compute_summary(db_tables, checks), **checks}
+
+    section_name = __name__.split(".")[-1]
+    uw.export_data(results, figures={}, section_name=section_name, config=config, logger=logger)
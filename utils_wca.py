@@ -1,5 +1,12 @@
 from pathlib import Path
 import configparser
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import urllib.error
 import urllib.request
 import zipfile
 import pandas as pd
@@ -10,7 +17,13 @@ import inspect
 import numpy as np
 import matplotlib.pyplot as plt
 from cycler import cycler
+import time
 import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from collections.abc import Callable, MutableMapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import cached_property
 
 
 ############ LOGGER ############
@@ -90,6 +103,17 @@ def setup_logger(name: str, level=logging.INFO, log_root: Path | str = "./logs")
     return logging.getLogger(name)
 
 
+@contextmanager
+def timed(logger: logging.Logger, label: str):
+    """Context manager that logs how long the wrapped block took."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        logger.info(f"[timing] {label} completed in {elapsed:.1f}s")
+
+
 ############ CONFIG ############
 
 
@@ -239,6 +263,20 @@ def get_regions_dir(config: configparser.ConfigParser) -> Path:
     return reg_dir
 
 
+def get_cache_dir(config: configparser.ConfigParser) -> Path:
+    """
+    Return the path to the columnar cache directory, creating it if needed.
+    Defaults to <database_export_dir>/cache when [paths] -> cache_dir is missing.
+    """
+    try:
+        cache_dir = Path(config["paths"]["cache_dir"]).resolve()
+    except KeyError:
+        cache_dir = get_database_dir(config) / "cache"
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
 def get_current_persons(db_tables: dict, columns: list[str] | None = None) -> pd.DataFrame:
     """
     Return one row per WCA competitor with their CURRENT (most recent) attributes.
@@ -271,19 +309,261 @@ def get_current_persons(db_tables: dict, columns: list[str] | None = None) -> pd
     )
 
 
+def last_results_date(db_tables: dict) -> pd.Timestamp:
+    """
+    Date of the latest competition with results in the export, the "today"
+    of the data (the export date itself is later, and unknown offline).
+    Needs "results" and "competitions" (after process_tables); NaT if empty.
+    """
+    competitions = db_tables["competitions"]
+    held = competitions["competition_id"].isin(db_tables["results"]["competition_id"].unique())
+    return competitions.loc[held, "date"].max()
+
+
+_EXPORT_STORAGE_MODES = ("zip", "extract")
+_DOWNLOAD_CHUNK_SIZE = 1 << 20   # 1 MiB
+
+# Written after every successful check/refresh: HTTP validators of the export
+# currently on disk plus the export_date from the archive's metadata.json.
+_EXPORT_STATE_FILE = "export_state.json"
+
+# storage = extract: each export is unpacked into its own export-<timestamp>
+# directory and this file names the current one, so swapping it switches
+# every table at once. Without it the TSVs sit directly in database_export_dir.
+_EXPORT_POINTER_FILE = "current_export.json"
+_EXPORT_VERSION_PREFIX = "export-"
+_EXPORT_DIR_LOCK = threading.Lock()
+
+
+def _export_settings(config: configparser.ConfigParser) -> tuple[str, Path]:
+    """
+    Read [export] -> storage / archive_name from config.ini.
+
+    storage = "zip" keeps only the downloaded archive in database_export_dir and
+    read_table streams each TSV out of it; "extract" unpacks the TSVs next to it
+    (the historical behaviour, and the default when the section is missing).
+    """
+    storage, archive_name = "extract", "WCA_export.tsv.zip"
+    if config.has_section("export"):
+        storage = config["export"].get("storage", storage).strip().lower()
+        archive_name = config["export"].get("archive_name", archive_name).strip()
+    if storage not in _EXPORT_STORAGE_MODES:
+        storage = "extract"
+    return storage, get_database_dir(config) / archive_name
+
+
+def _read_json(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json_atomic(path: Path, data: dict) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(data, indent=2))
+    os.replace(tmp_path, path)
+
+
+def _current_export_dir(db_dir: Path) -> Path:
+    """Directory holding the current extracted export (see _EXPORT_POINTER_FILE)."""
+    name = _read_json(db_dir / _EXPORT_POINTER_FILE).get("dir")
+    return db_dir / name if name and (db_dir / name).is_dir() else db_dir
+
+
+def _pinned_export_dir(config: configparser.ConfigParser) -> Path:
+    """
+    _current_export_dir, resolved once per run and kept on config.export_dir,
+    so every table of a run comes from the same export even if update_data
+    swaps in a new one meanwhile.
+    """
+    with _EXPORT_DIR_LOCK:
+        if getattr(config, "export_dir", None) is None:
+            config.export_dir = _current_export_dir(get_database_dir(config))
+        return config.export_dir
+
+
+def _pinned_archive(config: configparser.ConfigParser, archive_path: Path) -> zipfile.ZipFile:
+    """
+    The zip-mode counterpart of _pinned_export_dir: the archive is opened once
+    per run and the handle kept on config.export_archive, so every table is
+    read from the same file even if update_data renames a new one over it.
+    """
+    with _EXPORT_DIR_LOCK:
+        if getattr(config, "export_archive", None) is None:
+            config.export_archive = zipfile.ZipFile(archive_path)
+        return config.export_archive
+
+
+def _install_export(part_path: Path, db_dir: Path, export_date: str | None, table_files: list[str]) -> Path:
+    """
+    Unpack the archive `part_path` into a new export-<timestamp> directory,
+    then point _EXPORT_POINTER_FILE at it with one atomic rename. Versions
+    older than the one it replaces are deleted; that one is kept for runs
+    still reading it. The first versioned install also deletes the
+    `table_files` TSVs unpacked straight into `db_dir` by earlier releases.
+    Returns the new directory.
+    """
+    previous = _current_export_dir(db_dir)
+    version = db_dir / f"{_EXPORT_VERSION_PREFIX}{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+
+    staging = Path(tempfile.mkdtemp(dir=db_dir, prefix=".staging-"))
+    try:
+        with zipfile.ZipFile(part_path, "r") as f:
+            f.extractall(staging)
+        # Flatten any folder inside the archive: tables are looked up by file name
+        for extracted in list(staging.rglob("*")):
+            if extracted.is_file() and extracted.parent != staging:
+                os.replace(extracted, staging / extracted.name)
+        os.rename(staging, version)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    _write_json_atomic(db_dir / _EXPORT_POINTER_FILE, {"dir": version.name, "export_date": export_date})
+
+    for old in db_dir.glob(f"{_EXPORT_VERSION_PREFIX}*"):
+        if old.is_dir() and old not in (version, previous):
+            shutil.rmtree(old, ignore_errors=True)
+    if previous == db_dir:
+        for name in table_files:
+            (db_dir / name).unlink(missing_ok=True)
+    return version
+
+
+def _download_file(
+    url: str,
+    part_path: Path,
+    logger: logging.Logger | None = None,
+    validators: dict | None = None,
+) -> dict | None:
+    """
+    Stream `url` into `part_path` in chunks, resuming a previous partial download.
+
+    If `part_path` exists from an interrupted run, an HTTP Range request asks
+    only for the missing tail, guarded by If-Range so that a changed export is
+    sent in full instead of being glued onto stale bytes. Servers that ignore
+    Range answer 200 and the download restarts from scratch.
+
+    Otherwise, `validators` ({"etag", "last_modified"} of the copy already on
+    disk) turn the request into a conditional GET.
+
+    Returns the validators of the downloaded body, or None if the server
+    answered 304 Not Modified (nothing is written in that case). Renaming the
+    finished .part file is left to the caller.
+    """
+    part_state_path = part_path.with_name(part_path.name + ".json")
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    part_validators = _read_json(part_state_path) if offset else {}
+
+    request = urllib.request.Request(url)
+    if offset:
+        request.add_header("Range", f"bytes={offset}-")
+        if_range = part_validators.get("etag") or part_validators.get("last_modified")
+        if if_range:
+            request.add_header("If-Range", if_range)
+    elif validators:
+        if validators.get("etag"):
+            request.add_header("If-None-Match", validators["etag"])
+        if validators.get("last_modified"):
+            request.add_header("If-Modified-Since", validators["last_modified"])
+
+    try:
+        response = urllib.request.urlopen(request)
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None
+        if e.code == 416 and offset:
+            # Range not satisfiable: the .part file already holds the whole body
+            return part_validators
+        raise
+
+    with response:
+        if offset and response.status != 206:
+            offset = 0
+        if offset:
+            msg = f"Resuming download at {offset / 1e6:,.1f} MB"
+            if logger:
+                logger.info(msg)
+            else:
+                print(msg)
+        else:
+            part_validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            _write_json_atomic(part_state_path, part_validators)
+
+        length = response.headers.get("Content-Length")
+        expected = offset + int(length) if length is not None else None
+
+        with open(part_path, "ab" if offset else "wb") as fh:
+            while chunk := response.read(_DOWNLOAD_CHUNK_SIZE):
+                fh.write(chunk)
+
+    # A dropped connection just ends the body early: keep the .part for next time
+    received = part_path.stat().st_size
+    if expected is not None and received < expected:
+        raise ConnectionError(
+            f"Download of {url} interrupted at {received:,} of {expected:,} bytes; "
+            f"run again to resume."
+        )
+
+    part_state_path.unlink(missing_ok=True)
+    return part_validators
+
+
+def _export_on_disk(config: configparser.ConfigParser, storage: str, archive_path: Path) -> bool:
+    """True if a complete export is already available locally in `storage` form."""
+    if storage == "zip":
+        return archive_path.exists()
+    export_dir = _current_export_dir(get_database_dir(config))
+    file_names = dict(config.items("tables")).values() if config.has_section("tables") else []
+    return all((export_dir / name).exists() for name in file_names)
+
+
+def _export_date(zip_path: Path) -> str | None:
+    """export_date from the metadata.json shipped inside the export archive."""
+    try:
+        with zipfile.ZipFile(zip_path) as zf:
+            member = next((m for m in zf.namelist() if Path(m).name == "metadata.json"), None)
+            if member is None:
+                return None
+            return json.loads(zf.read(member)).get("export_date")
+    except (OSError, ValueError, zipfile.BadZipFile):
+        return None
+
+
 def update_data(config: configparser.ConfigParser, logger: logging.Logger | None = None) -> None:
     """
-    Download the latest WCA export if not already downloaded today.
+    Refresh the WCA export, at most one check per day.
     Uses logger if provided.
+
+    The check is a conditional GET using the ETag / Last-Modified of the copy
+    on disk (kept in export_state.json), so an unchanged export is not
+    downloaded again. A new archive is downloaded in chunks to a .part file
+    (resumed if a previous run was interrupted) and only then:
+      - storage = zip: renamed over the previous archive;
+      - storage = extract: unpacked into a new versioned directory, which then
+        becomes current through one atomic swap of a pointer file (see
+        _install_export).
+    Either way the whole export changes in one rename. With storage = extract
+    a run also reads all its tables from the export that was current when it
+    started (see _pinned_export_dir), and with storage = zip from the archive
+    it opened first (see _pinned_archive), so it never mixes tables of two
+    exports. The state file is written last.
     """
     db_dir = get_database_dir(config)
     meta_file = db_dir / "last_update.txt"
+    state_file = db_dir / _EXPORT_STATE_FILE
     url = config["url"]["wca_export_url"]
+    storage, archive_path = _export_settings(config)
 
     today_str = datetime.now().date().isoformat()
+    on_disk = _export_on_disk(config, storage, archive_path)
 
-    # Check if already updated today
-    if meta_file.exists():
+    # Check if already checked today
+    if meta_file.exists() and on_disk:
         last_update = meta_file.read_text().strip()
         if last_update == today_str:
             if logger:
@@ -292,28 +572,408 @@ def update_data(config: configparser.ConfigParser, logger: logging.Logger | None
                 print(f"Data already up to date (last update: {last_update})")
             return
 
+    # Only trust the validators if they describe what is actually on disk
+    state = _read_json(state_file)
+    validators = state if on_disk and state.get("url") == url and state.get("storage") == storage else None
+
     if logger:
-        logger.info(f"Downloading new WCA export from {url} ...")
+        logger.info(f"Checking for a new WCA export at {url} ...")
     else:
-        print(f"Downloading new WCA export from {url} ...")
+        print(f"Checking for a new WCA export at {url} ...")
 
-    zip_path, _ = urllib.request.urlretrieve(url)
-    with zipfile.ZipFile(zip_path, "r") as f:
-        f.extractall(db_dir)
+    part_path = archive_path.with_name(archive_path.name + ".part")
+    new_validators = _download_file(url, part_path, logger, validators)
 
+    if new_validators is None:
+        meta_file.write_text(today_str)
+        if logger:
+            logger.info(f"WCA export not modified since last download (export date: {state.get('export_date')})")
+        else:
+            print(f"WCA export not modified since last download (export date: {state.get('export_date')})")
+        return
+
+    if not zipfile.is_zipfile(part_path):
+        part_path.unlink(missing_ok=True)
+        if logger:
+            logger.critical(f"Downloaded export from {url} is not a valid zip archive.")
+        else:
+            raise zipfile.BadZipFile(f"Downloaded export from {url} is not a valid zip archive.")
+
+    export_date = _export_date(part_path)
+
+    if storage == "zip":
+        os.replace(part_path, archive_path)
+    else:
+        table_files = list(dict(config.items("tables")).values()) if config.has_section("tables") else []
+        _install_export(part_path, db_dir, export_date, table_files)
+        part_path.unlink()
+
+    _write_json_atomic(state_file, {
+        "url": url,
+        "storage": storage,
+        "etag": new_validators.get("etag"),
+        "last_modified": new_validators.get("last_modified"),
+        "export_date": export_date,
+    })
     meta_file.write_text(today_str)
+
     if logger:
-        logger.info(f"WCA data updated successfully on {today_str} in {db_dir}")
+        logger.info(f"WCA data updated successfully on {today_str} in {db_dir} (storage: {storage}, export date: {export_date})")
+    else:
+        print(f"WCA data updated successfully on {today_str} in {db_dir} (storage: {storage}, export date: {export_date})")
+
+
+# Bump whenever the way a table is parsed changes, so stale caches are rebuilt.
+_CACHE_VERSION = 3
+
+# Compact dtypes for every WCA export table (v2 TSV column names).
+# Low-cardinality strings and the person/competition/event/country keys become
+# categoricals (the keys get one shared vocabulary in encode_shared_keys);
+# result values and ranks fit in int32 (MBLD encodings top out below
+# 10^10 / 10 = 999,999,999). Columns not listed here keep the dtype pandas infers.
+_TABLE_SCHEMAS = {
+    "results": {
+        "id": "int32",
+        "pos": "int16",
+        "best": "int32",
+        "average": "int32",
+        "competition_id": "category",
+        "round_type_id": "category",
+        "event_id": "category",
+        "person_name": "object",
+        "person_id": "category",
+        "person_country_id": "category",
+        "format_id": "category",
+        "regional_single_record": "category",
+        "regional_average_record": "category",
+    },
+    "attempts": {
+        "value": "int32",
+        "attempt_number": "int8",
+        "result_id": "int32",
+    },
+    "persons": {
+        "name": "object",
+        "gender": "category",
+        "wca_id": "category",
+        "sub_id": "int8",
+        "country_id": "category",
+    },
+    "competitions": {
+        "id": "category",
+        "name": "object",
+        "city_name": "object",
+        "country_id": "category",
+        "information": "object",
+        "year": "int16",
+        "month": "int8",
+        "day": "int8",
+        "end_year": "int16",
+        "end_month": "int8",
+        "end_day": "int8",
+        "cancelled": "int8",
+        "event_specs": "object",
+        "delegates": "object",
+        "organizers": "object",
+        "venue": "object",
+        "venue_address": "object",
+        "venue_details": "object",
+        "external_website": "object",
+        "cell_name": "object",
+        "latitude_microdegrees": "int32",
+        "longitude_microdegrees": "int32",
+    },
+    "events": {
+        "id": "category",
+        "name": "object",
+        "rank": "int16",
+        "format": "object",
+        "cell_name": "object",
+    },
+    "formats": {
+        "id": "object",
+        "name": "object",
+        "sort_by": "object",
+        "sort_by_second": "object",
+        "expected_solve_count": "int8",
+        "trim_fastest_n": "int8",
+        "trim_slowest_n": "int8",
+    },
+    "ranks_single": {
+        "person_id": "category",
+        "event_id": "category",
+        "best": "int32",
+        "world_rank": "int32",
+        "continent_rank": "int32",
+        "country_rank": "int32",
+    },
+    "ranks_average": {
+        "person_id": "category",
+        "event_id": "category",
+        "best": "int32",
+        "world_rank": "int32",
+        "continent_rank": "int32",
+        "country_rank": "int32",
+    },
+    "countries": {
+        "id": "category",
+        "name": "object",
+        "continent_id": "object",
+        "iso2": "object",
+    },
+    "continents": {
+        "id": "object",
+        "name": "object",
+        "record_name": "object",
+        "latitude": "int32",
+        "longitude": "int32",
+        "zoom": "int8",
+    },
+    "championships": {
+        "id": "int32",
+        "competition_id": "category",
+        "championship_type": "object",
+    },
+    "rounds": {
+        "id": "object",
+        "rank": "int16",
+        "name": "object",
+        "cell_name": "object",
+        "final": "int8",
+    },
+    "scrambles": {
+        "id": "int32",
+        "competition_id": "category",
+        "event_id": "category",
+        "round_type_id": "category",
+        "group_id": "object",
+        "is_extra": "int8",
+        "scramble_num": "int16",
+        "scramble": "object",
+    },
+}
+
+_CACHE_FORMATS = ("parquet", "feather")
+
+# Columns process_tables needs on top of what the modules declare.
+# Tables listed here are always loaded (they feed the pre-filtered results
+# tables and the config attributes); everything is small except `results`.
+_PREPROCESS_COLUMNS = {
+    "results": ["id", "competition_id", "round_type_id", "event_id", "person_id", "person_country_id"],
+    "persons": ["name", "gender", "wca_id", "sub_id", "country_id"],
+    "competitions": ["id", "name", "city_name", "country_id", "year", "month", "day"],
+    "rounds": ["id", "rank"],
+    "countries": ["id", "continent_id"],
+    "continents": ["id", "record_name"],
+    "championships": ["competition_id", "championship_type"],
+    "events": ["id"],
+}
+
+# Optional inputs of process_tables: loaded only if a module asks for them,
+# in which case the columns below are added to the module's request.
+_OPTIONAL_PREPROCESS_COLUMNS = {
+    "attempts": ["value", "attempt_number", "result_id"],
+    "ranks_single": ["person_id"],
+    "ranks_average": ["person_id"],
+}
+
+
+def _cache_settings(config: configparser.ConfigParser) -> tuple[bool, str]:
+    """
+    Read [cache] -> enabled / format from config.ini.
+    The cache is on by default and stored as Parquet.
+    """
+    if not config.has_section("cache"):
+        return True, "parquet"
+
+    enabled = config["cache"].getboolean("enabled", True)
+    fmt = config["cache"].get("format", "parquet").strip().lower()
+    if fmt not in _CACHE_FORMATS:
+        fmt = "parquet"
+    return enabled, fmt
+
+
+def _locate_export_file(
+    file_name: str, config: configparser.ConfigParser
+) -> tuple[Path | zipfile.ZipFile, str | None]:
+    """
+    Find an export TSV: either a file of the current extracted export (see
+    _pinned_export_dir), or a member of the downloaded archive when
+    [export] -> storage = zip (see _pinned_archive).
+
+    Returns (path, None) for a plain file on disk, or (archive, member) with
+    the run's open archive.
+    Raises FileNotFoundError if the table cannot be found.
+    """
+    storage, archive_path = _export_settings(config)
+
+    if storage == "extract":
+        file_path = _pinned_export_dir(config) / file_name
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}. You may need to run update_data().")
+        return file_path, None
+
+    if not archive_path.exists():
+        raise FileNotFoundError(f"Export archive not found: {archive_path}. You may need to run update_data().")
+
+    zf = _pinned_archive(config, archive_path)
+    for member in zf.namelist():
+        if Path(member).name == file_name:
+            return zf, member
+
+    raise FileNotFoundError(f"'{file_name}' not found inside {archive_path.name}.")
+
+
+@contextmanager
+def _open_export_file(file_path: Path | zipfile.ZipFile, member: str | None = None):
+    """
+    Open an export TSV for binary reading, decompressing on the fly if it is
+    an archive member. `file_path` may be an already open archive, which is
+    left open. Nothing is written to disk.
+    """
+    if member is None:
+        with open(file_path, "rb") as fh:
+            yield fh
+    elif isinstance(file_path, zipfile.ZipFile):
+        with file_path.open(member) as fh:
+            yield fh
+    else:
+        with zipfile.ZipFile(file_path) as zf, zf.open(member) as fh:
+            yield fh
+
+
+def export_fingerprint(file_path: Path | zipfile.ZipFile, member: str | None = None) -> str:
+    """
+    Cheap identity of an export file: a hash of its name, size and mtime.
+
+    A new download from update_data rewrites the TSVs, which changes size
+    and/or mtime, so any cache keyed on this value is invalidated automatically
+    without having to hash gigabytes of data on every run.
+
+    For an archive member the CRC-32 and size stored in the zip directory are
+    used instead, so re-downloading an unchanged table keeps its cache valid.
+    """
+    if isinstance(file_path, zipfile.ZipFile):
+        info = file_path.getinfo(member)
+        raw = f"{member}:{info.file_size}:{info.CRC:08x}:v{_CACHE_VERSION}"
+    elif member is not None:
+        with zipfile.ZipFile(file_path) as zf:
+            info = zf.getinfo(member)
+        raw = f"{member}:{info.file_size}:{info.CRC:08x}:v{_CACHE_VERSION}"
+    else:
+        stat = file_path.stat()
+        raw = f"{file_path.name}:{stat.st_size}:{stat.st_mtime_ns}:v{_CACHE_VERSION}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _read_header(file_path: Path | zipfile.ZipFile, member: str | None = None) -> list[str]:
+    with _open_export_file(file_path, member) as fh:
+        return list(pd.read_csv(fh, sep="\t", nrows=0).columns)
+
+
+def _read_tsv(
+    file_path: Path | zipfile.ZipFile,
+    table_name: str,
+    logger: logging.Logger | None = None,
+    columns: list[str] | None = None,
+    member: str | None = None,
+) -> pd.DataFrame:
+    """
+    Parse an export TSV applying the compact dtypes from _TABLE_SCHEMAS.
+    With `member` set, `file_path` is the export archive (path or open
+    ZipFile) and the TSV is streamed out of it.
+
+    Categoricals are applied while parsing (they never fail); integer downcasts
+    are applied afterwards and skipped, with a warning, if a column has missing
+    values or does not fit. Columns the schema does not know about are reported
+    and left as inferred. If `columns` is given, only those are parsed.
+    """
+    schema = _TABLE_SCHEMAS.get(table_name, {})
+    header = _read_header(file_path, member)
+
+    def report(msg):
+        if logger:
+            logger.warning(msg)
+        else:
+            print(msg)
+
+    if not schema:
+        report(f"No dtype schema registered for '{table_name}'; dtypes will be inferred.")
+    else:
+        unexpected = [c for c in header if c not in schema]
+        missing = [c for c in schema if c not in header]
+        if unexpected:
+            report(f"Unexpected column(s) in '{table_name}' (kept with inferred dtype): {unexpected}")
+        if missing:
+            report(f"Column(s) missing from '{table_name}' compared to its schema: {missing}")
+
+    parse_dtypes = {c: t for c, t in schema.items() if c in header and t == "category"}
+    with _open_export_file(file_path, member) as fh:
+        df = pd.read_csv(fh, sep="\t", low_memory=False, dtype=parse_dtypes, usecols=columns)
+
+    for col, dtype in schema.items():
+        if col not in df.columns or dtype in ("category", "object"):
+            continue
+        try:
+            if df[col].isna().any():
+                raise ValueError("column has missing values")
+            info = np.iinfo(dtype)
+            if len(df) and (df[col].min() < info.min or df[col].max() > info.max):
+                raise ValueError(f"values out of {dtype} range")
+            df[col] = df[col].astype(dtype)
+        except (ValueError, TypeError) as e:
+            report(f"Keeping inferred dtype {df[col].dtype} for '{table_name}.{col}' (wanted {dtype}): {e}")
+
+    return df
+
+
+def _read_cached_table(cache_path: Path, fmt: str, columns: list[str] | None = None) -> pd.DataFrame:
+    if fmt == "feather":
+        return pd.read_feather(cache_path, columns=columns)
+    return pd.read_parquet(cache_path, columns=columns)
+
+
+def _write_cached_table(df: pd.DataFrame, table_name: str, cache_path: Path, fmt: str) -> None:
+    """
+    Write `df` to `cache_path` atomically and drop older caches of the same table.
+    """
+    tmp_path = cache_path.with_suffix(cache_path.suffix + ".tmp")
+    if fmt == "feather":
+        df.reset_index(drop=True).to_feather(tmp_path)
     else:
-        print(f"WCA data updated successfully on {today_str} in {db_dir}")
+        df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, cache_path)
+
+    for old in cache_path.parent.glob(f"{table_name}.*.{fmt}"):
+        if old != cache_path:
+            old.unlink(missing_ok=True)
 
 
-def read_table(table_name: str, config: configparser.ConfigParser, logger: logging.Logger | None = None) -> pd.DataFrame:
+def read_table(
+    table_name: str,
+    config: configparser.ConfigParser,
+    logger: logging.Logger | None = None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
     """
     Reads a WCA table (.tsv) based on config mappings.
     Logs messages if logger is provided.
+
+    If `columns` is given only those columns are returned (in file order);
+    requested columns that the export does not have are reported and skipped.
+    See resolve_table_columns for how main.py builds these lists.
+
+    Columns are parsed with the compact dtypes declared in _TABLE_SCHEMAS
+    (categoricals for ids/tags, int32 for result values). Grouping on a
+    categorical column needs `observed=True` to avoid empty groups.
+
+    With [export] -> storage = zip the TSV is streamed straight out of the
+    downloaded archive; nothing is extracted to disk.
+
+    The first time an export file is parsed, a columnar copy (Parquet or Feather,
+    see [cache] in config.ini) is written under the cache directory, keyed by the
+    file's fingerprint. Later runs load that copy instead of re-parsing the TSV.
     """
-    db_dir = get_database_dir(config)
 
     if not config.has_section("tables"):
         if logger:
@@ -329,24 +989,128 @@ def read_table(table_name: str, config: configparser.ConfigParser, logger: loggi
             raise KeyError(f"Table '{table_name}' not found in [tables] section of config.ini")
 
     file_name = tables_map[table_name]
-    file_path = db_dir / file_name
 
-    if not file_path.exists():
+    try:
+        file_path, member = _locate_export_file(file_name, config)
+    except FileNotFoundError as e:
         if logger:
-            logger.critical(f"File not found: {file_path}. You may need to run update_data().")
-        else:
-            raise FileNotFoundError(f"File not found: {file_path}. You may need to run update_data().")
+            logger.critical(str(e))
+        raise
 
-    df = pd.read_csv(file_path, sep="\t", low_memory=False)
+    source_name = file_path.name if member is None else f"{Path(file_path.filename).name}:{member}"
+
+    if columns is not None:
+        header = _read_header(file_path, member)
+        absent = [c for c in columns if c not in header]
+        if absent:
+            msg = f"Requested column(s) not in '{table_name}' export, skipping: {absent}"
+            if logger:
+                logger.warning(msg)
+            else:
+                print(msg)
+        columns = [c for c in header if c in columns]
+
+    cache_enabled, cache_format = _cache_settings(config)
+    cache_path = None
+
+    if cache_enabled:
+        cache_path = get_cache_dir(config) / f"{table_name}.{export_fingerprint(file_path, member)}.{cache_format}"
+        if cache_path.exists():
+            try:
+                df = _read_cached_table(cache_path, cache_format, columns)
+                if logger:
+                    logger.info(f"Loaded '{table_name}' from cache {cache_path.name} ({len(df):,} rows)")
+                else:
+                    print(f"Loaded '{table_name}' from cache {cache_path.name} ({len(df):,} rows)")
+                return df
+            except Exception as e:
+                if logger:
+                    logger.warning(f"Could not read cache {cache_path.name}, re-parsing the TSV: {e}")
+                cache_path.unlink(missing_ok=True)
+
+    # The cache always holds the full table so that any later projection can be
+    # served from it; without a cache only the requested columns are parsed.
+    df = _read_tsv(
+        file_path, table_name, logger,
+        columns=None if cache_path is not None else columns,
+        member=member,
+    )
 
     if logger:
-        logger.info(f"Loaded '{table_name}' from {file_path.name} ({len(df):,} rows)")
+        logger.info(f"Loaded '{table_name}' from {source_name} ({len(df):,} rows)")
     else:
-        print(f"Loaded '{table_name}' from {file_path.name} ({len(df):,} rows)")
+        print(f"Loaded '{table_name}' from {source_name} ({len(df):,} rows)")
+
+    if cache_path is not None:
+        try:
+            _write_cached_table(df, table_name, cache_path, cache_format)
+            if logger:
+                logger.info(f"Cached '{table_name}' to {cache_path}")
+        except Exception as e:
+            # Missing pyarrow or an unserialisable column: keep going without a cache
+            if logger:
+                logger.warning(f"Could not write {cache_format} cache for '{table_name}': {e}")
+
+        if columns is not None:
+            df = df[columns]
 
     return df
 
 
+def resolve_table_columns(modules: list, logger: logging.Logger | None = None) -> dict[str, list[str] | None]:
+    """
+    Work out which export tables, and which of their columns, a run needs.
+
+    Every module declares a REQUIRED_COLUMNS dict (table name -> list of columns,
+    or None for "all columns") of the raw export columns it reads, directly or
+    through the pre-filtered tables built by process_tables. The result is the
+    union of those declarations plus what process_tables itself needs, in
+    _TABLE_SCHEMAS order. Tables nobody asks for (e.g. scrambles) are left out.
+
+    Example
+    -------
+    resolve_table_columns([relays])
+    -> {"persons": [...], "competitions": [...], ..., "ranks_single": ["person_id", "event_id", "best", "country_rank"]}
+    """
+    needed: dict[str, set | None] = {t: set(cols) for t, cols in _PREPROCESS_COLUMNS.items()}
+
+    for module in modules:
+        declared = getattr(module, "REQUIRED_COLUMNS", None)
+        if declared is None:
+            # Undeclared module: play safe and load everything
+            msg = f"Module '{module.__name__}' has no REQUIRED_COLUMNS; loading all export tables in full."
+            if logger:
+                logger.warning(msg)
+            else:
+                print(msg)
+            return {t: None for t in _TABLE_SCHEMAS}
+
+        for table, cols in declared.items():
+            if table in needed and needed[table] is None:
+                continue
+            if cols is None:
+                needed[table] = None
+                continue
+            needed.setdefault(table, set()).update(cols)
+            needed[table].update(_OPTIONAL_PREPROCESS_COLUMNS.get(table, []))
+
+    # read_table returns columns in file order, so sorting here is just for the logs
+    resolved = {
+        table: None if needed[table] is None else sorted(needed[table])
+        for table in _TABLE_SCHEMAS
+        if table in needed
+    }
+
+    skipped = [t for t in _TABLE_SCHEMAS if t not in resolved]
+    msg = f"Loading {len(resolved)} export table(s); skipping unused: {skipped}"
+    if logger:
+        logger.info(msg)
+    else:
+        print(msg)
+
+    return resolved
+
+
 def read_aux_file(file_key: str, db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> pd.DataFrame:
     """
     Reads auxiliary .csv files defined in [aux_files] section of config.ini
@@ -391,18 +1155,864 @@ def read_aux_file(file_key: str, db_tables: dict, config: configparser.ConfigPar
     return df
 
 
-def make_localized_results_df(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger):
-    
+class LazyTables(MutableMapping):
     """
-    Create 'results_nationality' — same as results, but with all person_country_id values
-    filtered by the nationality of config - and 'results_country' - same as results, 
-    but with all competition_id filtered by the country of config
+    dict-like container for db_tables whose derived tables are built on demand.
+
+    Export tables are plain entries. Derived tables, and the products modules
+    share (see get_product), are declared with register(name, builder): the
+    builder runs the first time the name is accessed and its result is
+    memoised, so a derived table nobody reads costs no time or memory. `name in db_tables` and
+    iteration see registered tables without building them.
+
+    Example
+    -------
+    db_tables.register("results_fixed", lambda tables: build_results_fixed(tables, config, logger))
+    db_tables["results_fixed"]   # built here, cached afterwards
     """
-    
+
+    def __init__(self, tables: dict | None = None):
+        self._tables = dict(tables or {})
+        self._builders = {}
+        self._lock = threading.RLock()
+
+        # Set by load_tables: snapshot key and the tables the snapshot may hold
+        self.snapshot_key = None
+        self.snapshot_tables = set()
+        self.snapshot_saved = set()
+
+    def register(self, name: str, builder) -> None:
+        """Declare `name` as a derived table built by builder(db_tables) on first access."""
+        with self._lock:
+            if name not in self._tables:
+                self._builders[name] = builder
+
+    def is_built(self, name: str) -> bool:
+        return name in self._tables
+
+    def __getitem__(self, name):
+        try:
+            return self._tables[name]
+        except KeyError:
+            pass
+
+        # Builders may read other derived tables, hence the re-entrant lock
+        with self._lock:
+            if name not in self._tables:
+                builder = self._builders[name]
+                self._tables[name] = builder(self)
+                del self._builders[name]
+            return self._tables[name]
+
+    def __setitem__(self, name, df):
+        with self._lock:
+            self._tables[name] = df
+            self._builders.pop(name, None)
+
+    def __delitem__(self, name):
+        with self._lock:
+            if name not in self:
+                raise KeyError(name)
+            self._tables.pop(name, None)
+            self._builders.pop(name, None)
+
+    def __contains__(self, name):
+        return name in self._tables or name in self._builders
+
+    def __iter__(self):
+        return iter(list(self._tables) + [n for n in self._builders if n not in self._tables])
+
+    def __len__(self):
+        return len(self._tables) + len(self._builders)
+
+    def __repr__(self):
+        pending = [n for n in self._builders if n not in self._tables]
+        return f"LazyTables(built={list(self._tables)}, pending={pending})"
+
+
+@dataclass(frozen=True)
+class Product:
+    """
+    An intermediate result shared between module computations (e.g. the Silver
+    members that Gold and Platinum are filtered from).
+
+    builder(db_tables, config, logger, *params) returns the product. deps names
+    the db_tables entries and other products it reads: products are built
+    first, tables must be loaded. With persist=True the product (a DataFrame)
+    is saved with the preprocessed snapshot and restored on the next run; its
+    builder may then only depend on the export and _SNAPSHOT_CONFIG_KEYS, and
+    _SNAPSHOT_VERSION must be bumped when its output changes.
+    """
+    name: str
+    builder: Callable
+    deps: tuple[str, ...] = ()
+    persist: bool = False
+
+
+# name -> Product, filled by the @product decorator as the modules are imported
+_PRODUCTS: dict[str, Product] = {}
+_PRODUCTS_LOCK = threading.RLock()
+
+
+def product(name: str, deps: tuple[str, ...] = (), persist: bool = False):
+    """
+    Decorator declaring a builder function as the product `name`; see Product.
+    Read products with get_product, never by calling the builder directly.
+
+    Example
+    -------
+    @uw.product("silver", deps=("results_fixed", "persons"))
+    def _build_silver_members(db_tables, config, logger) -> pd.DataFrame: ...
+    """
+    def register(builder):
+        spec = Product(name=name, builder=builder, deps=tuple(deps), persist=persist)
+        known = _PRODUCTS.get(name)
+        if known is not None and known.builder.__qualname__ != builder.__qualname__:
+            raise ValueError(f"Product '{name}' is already declared by {known.builder.__module__}.{known.builder.__qualname__}")
+        _PRODUCTS[name] = spec
+        return builder
+    return register
+
+
+def product_key(name: str, *params) -> str:
+    """db_tables key of a product: 'record_history' + '333' -> 'record_history_333'."""
+    return "_".join([name, *map(str, params)])
+
+
+def get_product(name: str, db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger, *params):
+    """
+    Return the product `name` (for `params`, if it takes any), building it and
+    its dependencies on first use. Later calls, from any module or thread,
+    get the same object; consumers must not modify it.
+
+    Builder errors propagate to the caller and the build is retried on the
+    next request.
+    """
+    spec = _PRODUCTS[name]
+    key = product_key(name, *params)
+
+    def build(tables):
+        for dep in spec.deps:
+            if dep in _PRODUCTS:
+                get_product(dep, tables, config, logger)
+            elif dep not in tables:
+                raise KeyError(f"Product '{key}' needs table '{dep}', which is not loaded")
+        with timed(logger, f"product {key}"):
+            return spec.builder(tables, config, logger, *params)
+
+    if isinstance(db_tables, LazyTables):
+        if key not in db_tables:
+            db_tables.register(key, build)
+        if spec.persist:
+            db_tables.snapshot_tables.add(key)
+        return db_tables[key]
+
+    # Plain dict (e.g. a notebook calling one module function)
+    with _PRODUCTS_LOCK:
+        if key not in db_tables:
+            db_tables[key] = build(db_tables)
+        return db_tables[key]
+
+
+# Attempts per result in the widest format (Average of 5).
+_MAX_ATTEMPTS = 5
+
+
+@dataclass(eq=False)
+class AttemptMatrix:
+    """
+    The attempts of a set of results as a fixed-width matrix: row i holds the
+    attempts of result result_ids[i] in attempt order.
+
+    Built once from the long `attempts` table by build_attempt_matrix, with
+    rows in db_tables["results"] order, so any boolean mask or index over
+    `results` selects the matching attempt rows (basic slices are views; masks
+    gather just the selected rows, no 5x row explosion or join).
+
+    Attributes
+    ----------
+    result_ids : np.ndarray
+        (N,) int32, results.id of each row.
+    values : np.ndarray
+        (N, 5) int32 attempt values (DNF -1, DNS -2); 0 where `filled` is False.
+    filled : np.ndarray
+        (N, 5) bool, True where the attempt exists (Mo3/Bo3/Bo1 results and
+        results cut off after the first attempts leave trailing slots empty).
+    """
+    result_ids: np.ndarray
+    values: np.ndarray
+    filled: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.result_ids)
+
+    @property
+    def count(self) -> np.ndarray:
+        """(N,) number of attempts each result has."""
+        return self.filled.sum(axis=1, dtype=np.int8)
+
+    @property
+    def solved(self) -> np.ndarray:
+        """(N, 5) True for successful attempts (value > 0)."""
+        return self.values > 0
+
+    def rows(self, selector) -> "AttemptMatrix":
+        """Rows selected by a slice, boolean mask or positional index (e.g. a mask over `results`)."""
+        if isinstance(selector, pd.Series):
+            selector = selector.to_numpy()
+        return AttemptMatrix(self.result_ids[selector], self.values[selector], self.filled[selector])
+
+    def for_ids(self, result_ids) -> "AttemptMatrix":
+        """
+        Rows for the given result ids, in that order, for tables that kept the
+        `id` column but not the `results` row order (e.g. results_nationality).
+        Raises KeyError if an id is not in the matrix.
+        """
+        ids = np.asarray(result_ids)
+        sorted_ids = self.result_ids[self._id_order]
+        pos = np.searchsorted(sorted_ids, ids).clip(max=max(len(sorted_ids) - 1, 0))
+        if len(ids) and (not len(sorted_ids) or (sorted_ids[pos] != ids).any()):
+            raise KeyError("Some result ids are not in the attempt matrix")
+        return self.rows(self._id_order[pos])
+
+    @cached_property
+    def _id_order(self) -> np.ndarray:
+        return np.argsort(self.result_ids, kind="stable")
+
+
+# Averages and means of 10 minutes or more are rounded to whole seconds.
+_WHOLE_SECOND_AVERAGE = 60_000
+
+
+def round_average(totals, counts) -> np.ndarray:
+    """
+    Turn sums of counting attempts (centiseconds) into WCA averages: the mean
+    rounded half up to the centisecond, or to the second from 10:00.00 on.
+    Works element-wise on whole arrays; NaN totals stay NaN.
+
+    Example
+    -------
+    round_average(np.array([3001, 180_010]), 3) -> array([1000., 60000.])
+    """
+    mean = np.asarray(totals, dtype=np.float64) / counts
+    return np.where(
+        mean >= _WHOLE_SECOND_AVERAGE,
+        np.floor(mean / 100 + 0.5) * 100,
+        np.floor(mean + 0.5),
+    )
+
+
+# Ranking scopes of a PercentileIndex, widest first
+_PERCENTILE_SCOPES = ("world", "continent", "country")
+
+
+@dataclass(eq=False)
+class PercentileIndex:
+    """
+    Sorted personal bests (one per ranked person) of every event, per world,
+    continent and country, for placing any result among them.
+
+    Each scope is one sorted int64 array of (group << 32 | value) keys, where
+    the group is the event, or the event and region, so a whole column of
+    results is placed with one np.searchsorted per scope.
+
+    For a result, `rank` is the rank it would have among the current
+    personal bests (1 + the number of strictly better ones, so ties share a
+    rank as in ranks_*) and `percentile` the share of ranked persons whose
+    PB is not better than it: 100 for a new #1, 100/n for the slowest PB.
+
+    Build it from ranks_single/ranks_average with build_percentile_index_*.
+
+    Example
+    -------
+    index = db_tables["percentile_index_average"]
+    index.lookup("333", 950, "Italy")
+    -> {"world_rank": 3141, "world_percentile": 98.7, ..., "country_percentile": 99.4}
+    """
+    event_dtype: pd.CategoricalDtype
+    country_dtype: pd.CategoricalDtype
+    continent_of: np.ndarray        # country code -> continent code (-1 if unknown)
+    n_continents: int
+    keys: dict                      # scope -> sorted (group << 32 | value) keys
+    starts: dict                    # scope -> first position of each group in keys
+    counts: dict                    # scope -> persons ranked in each group
+
+    def _groups(self, scope: str, event: np.ndarray, country: np.ndarray) -> np.ndarray:
+        """Group code of each row in `scope` (-1 where the row has no group)."""
+        n_events = len(self.event_dtype.categories)
+        if scope == "world":
+            return event
+        if scope == "continent":
+            region = np.where(country >= 0, self.continent_of[country], -1)
+            return np.where((event >= 0) & (region >= 0), region.astype(np.int64) * n_events + event, -1)
+        return np.where((event >= 0) & (country >= 0), country.astype(np.int64) * n_events + event, -1)
+
+    def annotate(self, event_ids, values, country_ids) -> pd.DataFrame:
+        """
+        Would-be rank and percentile of every value, for each scope.
+
+        Parameters
+        ----------
+        event_ids, country_ids : array-like or pd.Series
+            Labels or categoricals (any dtype sharing the labels).
+        values : array-like or pd.Series
+            Raw results; values <= 0 (DNF, DNS, no result) get no rank.
+
+        Returns
+        -------
+        pd.DataFrame
+            world/continent/country _rank (Int32) and _percentile (float),
+            with the index of `values` if it is a Series.
+        """
+        index = values.index if isinstance(values, pd.Series) else None
+        event = pd.Categorical(np.asarray(event_ids), dtype=self.event_dtype).codes.astype(np.int64)
+        country = pd.Categorical(np.asarray(country_ids), dtype=self.country_dtype).codes.astype(np.int64)
+        values = np.asarray(values, dtype=np.int64)
+
+        out = {}
+        for scope in _PERCENTILE_SCOPES:
+            group = self._groups(scope, event, country)
+            valid = (group >= 0) & (values > 0)
+            g = np.where(valid, group, 0)
+            n = self.counts[scope][g]
+            better = np.searchsorted(self.keys[scope], (g << 32) | np.where(valid, values, 0)) - self.starts[scope][g]
+            valid &= n > 0
+
+            out[f"{scope}_rank"] = pd.arrays.IntegerArray(np.where(valid, better + 1, 0).astype(np.int32), ~valid)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[f"{scope}_percentile"] = np.where(valid, 100 * (n - better) / n, np.nan)
+
+        return pd.DataFrame(out, index=index)
+
+    def lookup(self, event_id: str, value: int, country_id: str | None = None) -> dict:
+        """
+        annotate() for a single result, without building arrays: a handful of
+        dict lookups and scalar binary searches.
+        """
+        out = {}
+        event = self._event_codes.get(event_id, -1)
+        country = self._country_codes.get(country_id, -1)
+        n_events = len(self.event_dtype.categories)
+        groups = {
+            "world": event,
+            "continent": self.continent_of[country] * n_events + event if country >= 0 and self.continent_of[country] >= 0 else -1,
+            "country": country * n_events + event if country >= 0 else -1,
+        }
+        for scope, group in groups.items():
+            n = int(self.counts[scope][group]) if event >= 0 and group >= 0 and value > 0 else 0
+            if not n:
+                out[f"{scope}_rank"], out[f"{scope}_percentile"] = None, None
+                continue
+            better = int(self.keys[scope].searchsorted((group << 32) | int(value))) - int(self.starts[scope][group])
+            out[f"{scope}_rank"] = better + 1
+            out[f"{scope}_percentile"] = 100 * (n - better) / n
+        return out
+
+    @cached_property
+    def _event_codes(self) -> dict:
+        return {label: i for i, label in enumerate(self.event_dtype.categories)}
+
+    @cached_property
+    def _country_codes(self) -> dict:
+        return {label: i for i, label in enumerate(self.country_dtype.categories)}
+
+
+@dataclass(eq=False)
+class PBMatrix:
+    """
+    Current personal bests and ranks of every competitor as dense persons x
+    events matrices, laid out once from ranks_single/ranks_average so SOR,
+    Kinch, relays and memberships index arrays instead of each pivoting the
+    ranks tables.
+
+    Rows are person_id codes and columns event_id codes of the ranks tables
+    (shared, see encode_shared_keys); 0 marks no PB/rank, as in the export.
+    values() and ranks() give float sub-matrices with NaN there instead,
+    ready for pandas-style fills and NaN-skipping reductions.
+
+    Build it with build_pb_matrix.
+
+    Example
+    -------
+    pbs = db_tables["pb_matrix"]
+    italians = pbs.persons("Italy")
+    pbs.ranks("single", "country", ["333", "222"], italians)   # (n, 2) national ranks
+    """
+    person_dtype: pd.CategoricalDtype
+    event_dtype: pd.CategoricalDtype
+    country_dtype: pd.CategoricalDtype
+    country: np.ndarray             # person code -> current country code (-1 if unknown)
+    best: dict                      # kind -> (P, E) int32 PBs
+    rank: dict                      # kind -> scope -> (P, E) int32 ranks (loaded rank columns only)
+
+    def persons(self, country_id: str | None = None) -> np.ndarray:
+        """Codes of the persons with any PB, optionally only those of `country_id`."""
+        ranked = np.zeros(len(self.country), dtype=bool)
+        for best in self.best.values():
+            ranked |= (best > 0).any(axis=1)
+        if country_id is not None:
+            ranked &= self.country == self.country_dtype.categories.get_indexer([country_id])[0]
+        return np.flatnonzero(ranked)
+
+    def person_ids(self, persons: np.ndarray) -> pd.Categorical:
+        """person_id labels of the given person codes."""
+        return pd.Categorical.from_codes(persons, dtype=self.person_dtype)
+
+    def _take(self, matrix: np.ndarray, events: list[str], persons: np.ndarray | None) -> np.ndarray:
+        codes = self.event_dtype.categories.get_indexer(events)
+        rows = matrix if persons is None else matrix[persons]
+        out = np.where(codes >= 0, rows[:, np.maximum(codes, 0)], 0).astype(np.float64)
+        out[out <= 0] = np.nan
+        return out
+
+    def values(self, kind: str, events: list[str], persons: np.ndarray | None = None) -> np.ndarray:
+        """(n, len(events)) PBs of `kind` (single/average) of `persons` (default: everyone), NaN if none."""
+        return self._take(self.best[kind], events, persons)
+
+    def ranks(self, kind: str, scope: str, events: list[str], persons: np.ndarray | None = None) -> np.ndarray:
+        """(n, len(events)) world/continent/country ranks of `kind`, NaN if none."""
+        return self._take(self.rank[kind][scope], events, persons)
+
+
+def _ranks_within(group: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Rank of each value among the values of its group (1 + strictly better
+    ones, ties sharing a rank); groups are int codes, -1 for none (rank 0).
+    """
+    keys = (group.astype(np.int64) << 32) | values.astype(np.int64)
+    ordered = np.sort(keys)
+    ranks = np.searchsorted(ordered, keys) - np.searchsorted(ordered, group.astype(np.int64) << 32) + 1
+    return np.where(group >= 0, ranks, 0)
+
+
+# Cells (dates x persons) placed per block by RankingsHistory.snapshots
+_SNAPSHOT_CELLS = 4_000_000
+
+
+@dataclass(eq=False)
+class RankingsHistory:
+    """
+    Personal-best change points of every (person, event), for rankings as of
+    any date without going back to the results.
+
+    A change point is a day on which a person's PB in an event improved.
+    They are kept as one sorted int64 array of (group << 32 | day) keys,
+    group = event * n_persons + person and day = days since 1970-01-01, with
+    the PB reached on that day alongside. The PB of every person of an event
+    on a date is then one np.searchsorted over that event's groups.
+
+    Countries are the current nationality (as in ranks_*), so rankings as of
+    a past date put everyone where they are ranked today.
+
+    Build it with build_rankings_history_*.
+
+    Example
+    -------
+    history = db_tables["rankings_history_average"]
+    history.as_of("333", "2019-06-01").query("country_rank == 1")
+    """
+    person_dtype: pd.CategoricalDtype
+    event_dtype: pd.CategoricalDtype
+    country_dtype: pd.CategoricalDtype
+    country_of: np.ndarray          # person code -> country code (-1 if unknown)
+    continent_of: np.ndarray        # country code -> continent code (-1 if unknown)
+    keys: np.ndarray                # sorted (group << 32 | day)
+    values: np.ndarray              # PB reached at each change point
+    groups: np.ndarray              # sorted distinct groups in keys
+    group_starts: np.ndarray        # first position of each of `groups` in keys
+
+    def as_of(self, event_id: str, date) -> pd.DataFrame:
+        """
+        Rankings of `event_id` at the end of `date`: one row per person with a
+        PB by then (person_id, country_id, best, world/continent/country rank),
+        sorted by best.
+        """
+        return self.snapshots(event_id, [date]).drop(columns="date")
+
+    def snapshots(self, event_id: str, dates, country_id: str | None = None) -> pd.DataFrame:
+        """
+        Rankings of `event_id` at the end of each of `dates`, stacked with a
+        `date` column: the batch form of as_of(). With `country_id`, only
+        that country's rows are kept (ranks are still world-wide).
+        """
+        n_persons = len(self.person_dtype.categories)
+        event = self.event_dtype.categories.get_loc(event_id) if event_id in self.event_dtype.categories else -1
+        lo, hi = np.searchsorted(self.groups, [event * n_persons, (event + 1) * n_persons]) if event >= 0 else (0, 0)
+        groups, starts = self.groups[lo:hi], self.group_starts[lo:hi]
+        persons = groups - event * n_persons
+        country = self.country_of[persons]
+        continent = np.where(country >= 0, self.continent_of[country], -1)
+        keep = None if country_id is None else self.country_dtype.categories.get_indexer([country_id])[0]
+
+        dates = pd.to_datetime(pd.Index(dates))
+        days = (dates - pd.Timestamp("1970-01-01")).days.to_numpy().astype(np.int64)
+        n_countries = len(self.country_dtype.categories)
+        n_continents = int(self.continent_of.max()) + 1 if len(self.continent_of) else 0
+
+        # Blocks of dates, each placed with one searchsorted over (date x person)
+        block = max(1, _SNAPSHOT_CELLS // max(len(groups), 1))
+        frames = []
+        for first in range(0, len(days), block):
+            d = days[first:first + block]
+            pos = np.searchsorted(self.keys, ((groups[None, :] << 32) | d[:, None]).ravel(), side="right") - 1
+            has = pos >= np.tile(starts, len(d))
+            date_idx = np.repeat(np.arange(len(d), dtype=np.int64), len(groups))[has]
+            who = np.tile(np.arange(len(groups)), len(d))[has]
+            best = self.values[pos[has]]
+
+            # Ranks within (date), (date, continent) and (date, country)
+            c, k = country[who], continent[who]
+            df = pd.DataFrame({
+                "date": dates[first + date_idx],
+                "person_id": pd.Categorical.from_codes(persons[who], dtype=self.person_dtype),
+                "country_id": pd.Categorical.from_codes(c, dtype=self.country_dtype),
+                "best": best,
+                "world_rank": _ranks_within(date_idx, best),
+                "continent_rank": _ranks_within(np.where(k >= 0, date_idx * n_continents + k, -1), best),
+                "country_rank": _ranks_within(np.where(c >= 0, date_idx * n_countries + c, -1), best),
+            })
+            if keep is not None:
+                df = df[c == keep]
+            frames.append(df)
+
+        columns = ["date", "person_id", "country_id", "best", "world_rank", "continent_rank", "country_rank"]
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True).sort_values(["date", "best", "person_id"], kind="stable", ignore_index=True)
+
+    def month_ends(self) -> pd.DatetimeIndex:
+        """Month ends from the first to the last change point, for snapshots()."""
+        if not len(self.keys):
+            return pd.DatetimeIndex([])
+        days = self.keys & 0xFFFFFFFF
+        first, last = pd.to_datetime([days.min(), days.max()], unit="D")
+        return pd.date_range(first, last + pd.offsets.MonthEnd(0), freq="ME")
+
+
+@dataclass(eq=False)
+class RecordsHistory:
+    """
+    Every NR, CR and WR of record_progression, indexed by the day it was set,
+    for the records standing on any date and how long each one stood.
+
+    Records are grouped by (record, type, event, region) and kept as one
+    sorted int64 array of (group << 32 | day) keys, the worst of a day first,
+    so the record of a group standing on a date is one np.searchsorted. A
+    record stands until a later one of its group beats it (a tie does not).
+    Durations of records still standing are counted up to `last_date`, the
+    last day with results in the export, not to the day the pipeline runs.
+
+    Build it with build_records_history.
+
+    Example
+    -------
+    history = db_tables["records_history"]
+    history.standing("2010-01-01", record="WR", kind="single", event_id="333")
+    history.durations().nlargest(10, "days")
+    """
+    records: pd.DataFrame           # record_progression rows, in key order
+    keys: np.ndarray                # (group << 32 | day) of every row, sorted
+    group_starts: np.ndarray        # first row of every group
+    run_starts: np.ndarray          # first row of each row's run of equal records
+    ends: np.ndarray                # day each row's record was beaten (-1 if never)
+    last_day: int                   # last day with results in the export
+
+    @property
+    def last_date(self) -> pd.Timestamp:
+        return pd.Timestamp("1970-01-01") + pd.Timedelta(days=self.last_day)
+
+    def _groups(self, record: str | None, kind: str | None, event_id: str | None, region: str | None) -> np.ndarray:
+        """Groups matching the given record scope, type, event and region (None for all)."""
+        first = self.records.iloc[self.group_starts]
+        keep = np.ones(len(first), dtype=bool)
+        for column, value in (("record", record), ("type", kind), ("event_id", event_id)):
+            if value is not None:
+                keep &= (first[column] == value).to_numpy()
+        if region is not None:
+            keep &= np.select(
+                [first["record"] == "NR", first["record"] == "CR"],
+                [first["country_id"] == region, first["continent_id"] == region],
+                region == "World",
+            )
+        return np.flatnonzero(keep).astype(np.int64)
+
+    def standing(
+        self,
+        dates,
+        record: str | None = None,
+        kind: str | None = None,
+        event_id: str | None = None,
+        region: str | None = None,
+    ) -> pd.DataFrame:
+        """
+        Records standing at the end of each of `dates`: for every group with
+        a record by then, the row(s) of its holder(s), stacked with an
+        `as_of` column and the `days` the record had stood by that date.
+        `record` (NR/CR/WR), `kind` (single/average), `event_id` and
+        `region` (a country id for NRs, a continent id for CRs, "World" for
+        WRs) narrow the groups.
+        """
+        groups = self._groups(record, kind, event_id, region)
+        starts = self.group_starts[groups]
+
+        dates = pd.to_datetime(pd.Index(np.atleast_1d(dates)))
+        days = (dates - pd.Timestamp("1970-01-01")).days.to_numpy().astype(np.int64)
+
+        block = max(1, _SNAPSHOT_CELLS // max(len(groups), 1))
+        date_idx, rows = [], []
+        for first in range(0, len(days), block):
+            d = days[first:first + block]
+            pos = np.searchsorted(self.keys, ((groups[None, :] << 32) | d[:, None]).ravel(), side="right") - 1
+            has = pos >= np.tile(starts, len(d))
+            which = np.repeat(np.arange(first, first + len(d)), len(groups))[has]
+            pos = pos[has]
+
+            # Every holder of a tied record, from the first of its run
+            count = pos - self.run_starts[pos] + 1
+            offsets = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+            date_idx.append(np.repeat(which, count))
+            rows.append(np.repeat(self.run_starts[pos], count) + offsets)
+
+        date_idx = np.concatenate(date_idx) if date_idx else np.zeros(0, dtype=np.int64)
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+
+        df = self.records.iloc[rows].reset_index(drop=True)
+        df.insert(0, "as_of", dates[date_idx])
+        df["days"] = (df["as_of"] - df["date"]).dt.days
+        return df
+
+    def durations(self, as_of=None) -> pd.DataFrame:
+        """
+        Every record set by `as_of` (default: last_date) with the date it was
+        beaten (`until`, NaT if it still stood) and the `days` it stood.
+        """
+        day = self.last_day if as_of is None else (pd.Timestamp(as_of) - pd.Timestamp("1970-01-01")).days
+        set_on = self.keys & 0xFFFFFFFF
+        keep = set_on <= day
+        beaten = keep & (self.ends >= 0) & (self.ends <= day)
+        until = np.where(beaten, self.ends, day)
+
+        df = self.records[keep].reset_index(drop=True)
+        df["until"] = pd.to_datetime(np.where(beaten, self.ends, -1)[keep], unit="D").where(beaten[keep])
+        df["days"] = (until - set_on)[keep]
+        return df
+
+    def month_ends(self) -> pd.DatetimeIndex:
+        """Month ends from the first record to last_date, for standing()."""
+        if not len(self.keys):
+            return pd.DatetimeIndex([])
+        first = pd.Timestamp("1970-01-01") + pd.Timedelta(days=int((self.keys & 0xFFFFFFFF).min()))
+        return pd.date_range(first, self.last_date + pd.offsets.MonthEnd(0), freq="ME")
+
+
+# Key columns that share one categorical vocabulary, per entity. Joins and
+# groupbys on them then run on the int32 codes; the labels are only looked up
+# when a frame is written out. The first column of each entity is its dimension
+# table, whose labels make the vocabulary.
+_SHARED_KEYS = {
+    "person": [("persons", "wca_id"), ("results", "person_id"), ("ranks_single", "person_id"), ("ranks_average", "person_id")],
+    "competition": [("competitions", "id"), ("results", "competition_id"), ("championships", "competition_id"), ("scrambles", "competition_id")],
+    "event": [("events", "id"), ("results", "event_id"), ("ranks_single", "event_id"), ("ranks_average", "event_id"), ("scrambles", "event_id")],
+    "country": [("countries", "id"), ("persons", "country_id"), ("results", "person_country_id"), ("competitions", "country_id")],
+}
+
+
+def encode_shared_keys(
+    db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger, tables: tuple[str, ...] | None = None
+):
+
+    """
+    Give every key column in _SHARED_KEYS the same CategoricalDtype as the
+    other columns of its entity, so that codes are dense, code order is label
+    order, and merges between tables keep the categorical instead of falling
+    back to strings.
+
+    The vocabulary is the sorted labels of the entity's dimension table
+    (persons.wca_id, competitions.id, events.id, countries.id), kept on
+    config.shared_key_dtypes when that table is encoded, so every other table
+    only needs the dimension tables it references. Labels missing from the
+    dimension table are reported and become NaN. resolve_table_columns always
+    loads the dimension tables (_PREPROCESS_COLUMNS); if one is missing anyway,
+    the union of the loaded columns of the entity is used instead.
+
+    Columns are already categorical when read (see _TABLE_SCHEMAS), so this
+    only remaps codes. With `tables`, only those tables are encoded (one
+    _PROCESS_STEPS step per table); tables that are not loaded are skipped.
+    """
+
     try:
+        if getattr(config, "shared_key_dtypes", None) is None:
+            config.shared_key_dtypes = {}
+
+        for entity, key_columns in _SHARED_KEYS.items():
+            loaded = [(t, c) for t, c in key_columns if t in db_tables and c in db_tables[t].columns]
+            present = [(t, c) for t, c in loaded if tables is None or t in tables]
+            dimension = key_columns[0]
+
+            if tables is None or dimension[0] in tables:
+                if dimension in loaded:
+                    labels = db_tables[dimension[0]][dimension[1]].astype("category").cat.categories
+                    config.shared_key_dtypes[entity] = pd.CategoricalDtype(sorted(labels))
+                else:
+                    config.shared_key_dtypes.pop(entity, None)
+
+            if not present:
+                continue
+
+            dtype = config.shared_key_dtypes.get(entity)
+            if dtype is None:
+                labels = set()
+                for table, col in loaded:
+                    labels.update(db_tables[table][col].astype("category").cat.categories)
+                dtype = pd.CategoricalDtype(sorted(labels))
+
+            for table, col in present:
+                values = db_tables[table][col].astype("category")
+                unknown = values.cat.categories.difference(dtype.categories)
+                if len(unknown):
+                    logger.warning(
+                        f"{len(unknown):,} {table}.{col} label(s) not in {dimension[0]}.{dimension[1]} "
+                        f"become missing, e.g. {list(unknown[:5])}"
+                    )
+                db_tables[table][col] = values.astype(dtype)
+
+            logger.info(f"Encoded {entity} keys ({len(dtype.categories):,} labels) in {[t for t, _ in present]}")
+
+    except Exception as e:
+        logger.critical(f"Error encoding shared keys: {e}", exc_info=True)
+
+
+def _encode_keys_step(table: str) -> tuple:
+    """
+    _PROCESS_STEPS entry that runs encode_shared_keys on `table` alone, after
+    the dimension tables of the entities it references have been encoded.
+    """
+    dimensions = [cols[0][0] for cols in _SHARED_KEYS.values() if any(t == table for t, _ in cols[1:])]
+
+    def step(db_tables, config, logger):
+        encode_shared_keys(db_tables, config, logger, tables=(table,))
+
+    step.__name__ = f"encode_{table}_keys"
+    return step, (table,), tuple(f"encode_{d}_keys" for d in dimensions)
+
+
+# Bits of results.record_tags, one per regional record tag and result type.
+# Continental tags (ER, AsR, NAR, ...) are all CR; a WR only has its WR bit.
+RECORD_NR_SINGLE = 1
+RECORD_CR_SINGLE = 2
+RECORD_WR_SINGLE = 4
+RECORD_NR_AVERAGE = 8
+RECORD_CR_AVERAGE = 16
+RECORD_WR_AVERAGE = 32
+RECORD_NR = RECORD_NR_SINGLE | RECORD_NR_AVERAGE
+RECORD_CR = RECORD_CR_SINGLE | RECORD_CR_AVERAGE
+RECORD_WR = RECORD_WR_SINGLE | RECORD_WR_AVERAGE
+RECORD_SINGLE = RECORD_NR_SINGLE | RECORD_CR_SINGLE | RECORD_WR_SINGLE
+RECORD_AVERAGE = RECORD_NR_AVERAGE | RECORD_CR_AVERAGE | RECORD_WR_AVERAGE
+
+# Tag column -> its (NR, CR, WR) bits
+_RECORD_TAG_COLUMNS = {
+    "regional_single_record": (RECORD_NR_SINGLE, RECORD_CR_SINGLE, RECORD_WR_SINGLE),
+    "regional_average_record": (RECORD_NR_AVERAGE, RECORD_CR_AVERAGE, RECORD_WR_AVERAGE),
+}
+
+# Columns of person_record_counts / country_record_counts, with their bit
+_RECORD_COUNT_COLUMNS = {
+    "nr_single": RECORD_NR_SINGLE, "cr_single": RECORD_CR_SINGLE, "wr_single": RECORD_WR_SINGLE,
+    "nr_average": RECORD_NR_AVERAGE, "cr_average": RECORD_CR_AVERAGE, "wr_average": RECORD_WR_AVERAGE,
+}
+
 
-        logger.info("Creating pre-filtered result tables")
+def encode_record_tags(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger):
 
+    """
+    Add results.record_tags: the regional_single_record and
+    regional_average_record tags of every result as one uint8 bitmask of
+    RECORD_* bits, so record filters are integer mask operations, e.g.
+    results[(results["record_tags"] & uw.RECORD_WR) != 0].
+
+    The tags are categorical, so each column is one lookup of its codes.
+    Skipped when results or the tag columns are not loaded.
+    """
+
+    try:
+        results = db_tables.get("results")
+        if results is None or not set(_RECORD_TAG_COLUMNS).issubset(results.columns):
+            return
+
+        tags = np.zeros(len(results), dtype=np.uint8)
+        for column, (nr, cr, wr) in _RECORD_TAG_COLUMNS.items():
+            values = results[column].astype("category")
+            bits = [nr if tag == "NR" else wr if tag == "WR" else cr if tag else 0 for tag in values.cat.categories]
+            lookup = np.array(bits + [0], dtype=np.uint8)     # code -1 (no tag) -> last entry
+            tags |= lookup[values.cat.codes.to_numpy()]
+        results["record_tags"] = tags
+
+        logger.info(f"Encoded record tags of {np.count_nonzero(tags):,} record result(s)")
+
+    except Exception as e:
+        logger.critical(f"Error encoding record tags: {e}", exc_info=True)
+
+
+def _record_counts(keys: pd.Series, tags: np.ndarray, key_name: str) -> pd.DataFrame:
+    """
+    One row per `keys` label with at least one record: the OR of its
+    record_tags and the number of records per RECORD_* bit.
+    """
+    codes = keys.cat.codes.to_numpy()
+    keep = (tags != 0) & (codes >= 0)
+    codes, tags = codes[keep], tags[keep]
+    n = len(keys.cat.categories)
+
+    flags = np.zeros(n, dtype=np.uint8)
+    np.bitwise_or.at(flags, codes, tags)
+    held = np.flatnonzero(flags)
+
+    df = pd.DataFrame({
+        key_name: pd.Categorical.from_codes(held, dtype=keys.dtype),
+        "record_tags": flags[held],
+    })
+    for column, bit in _RECORD_COUNT_COLUMNS.items():
+        df[column] = np.bincount(codes[(tags & bit) != 0], minlength=n)[held].astype(np.int32)
+    return df
+
+
+@product("person_record_counts", deps=("results",), persist=True)
+def build_person_record_counts(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> pd.DataFrame:
+    """
+    Product 'person_record_counts' — every competitor who ever held a
+    regional record: person_id, the OR of the record_tags of their results
+    (which kinds of record they set) and one count per tag and type
+    (nr_single, ..., wr_average). Each record counts once, under its own
+    tag: a WR is not also counted as a CR or an NR.
+    """
+    results = db_tables["results"]
+    df = _record_counts(results["person_id"], results["record_tags"].to_numpy(), "person_id")
+    logger.info(f"Created 'person_record_counts' ({len(df):,} record holders)")
+    return df
+
+
+@product("country_record_counts", deps=("results",), persist=True)
+def build_country_record_counts(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> pd.DataFrame:
+    """
+    Product 'country_record_counts' — the same flags and counts as
+    'person_record_counts', per country the records were set for
+    (person_country_id at the time of the result).
+    """
+    results = db_tables["results"]
+    df = _record_counts(results["person_country_id"], results["record_tags"].to_numpy(), "country_id")
+    logger.info(f"Created 'country_record_counts' ({len(df):,} countries with records)")
+    return df
+
+
+def normalize_competitions_and_rounds(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger):
+
+    """
+    Rename competitions.id/name and rounds.id so they join with results,
+    and add a competitions.date column.
+    """
+
+    try:
         # Rename column in competitions
         db_tables["competitions"] = (
             db_tables["competitions"]
@@ -412,7 +2022,18 @@ def make_localized_results_df(db_tables: dict, config: configparser.ConfigParser
 
         db_tables["rounds"] = db_tables["rounds"].rename(columns = {'id':'round_type_id'})
 
-        # Filter for nationality
+    except Exception as e:
+        logger.critical(f"Error normalizing competitions/rounds: {e}", exc_info=True)
+
+
+def build_results_nationality(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> pd.DataFrame:
+
+    """
+    'results_nationality' — results + competitions + rounds, only for competitors
+    with person_country_id = config.nationality
+    """
+
+    try:
         results_nationality = (
             db_tables["results"]
             .query("person_country_id == @config.nationality")
@@ -430,22 +2051,21 @@ def make_localized_results_df(db_tables: dict, config: configparser.ConfigParser
             )
         )
 
-        db_tables["results_nationality"] = results_nationality
+        logger.info(f"Created 'results_nationality' from results+competitions with only competitors from country = {config.nationality}.")
+        return results_nationality
+
+    except Exception as e:
+        logger.critical(f"Error creating results_nationality: {e}", exc_info=True)
 
-        # Explode with result detail
-        results_nationality_detailed = (
-            results_nationality
-            .merge(
-                db_tables["attempts"],
-                left_on = 'id',
-                right_on = 'result_id',
-                how = 'left'
-            )
-            .drop('id', axis=1)
-        )
 
-        db_tables["results_nationality_detailed"] = results_nationality_detailed
+def build_results_country(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> pd.DataFrame:
 
+    """
+    'results_country' — results + competitions + rounds, only for competitions
+    held in config.country
+    """
+
+    try:
         # Filter for host country
         competitions_filtered = db_tables["competitions"].query("country_id == @config.country").copy()
 
@@ -464,191 +2084,653 @@ def make_localized_results_df(db_tables: dict, config: configparser.ConfigParser
             )
         )
 
-        db_tables["results_country"] = results_country
+        logger.info(f"Created 'results_country' from results+competitions with only competitions from country = {config.country}.")
+        return results_country
+
+    except Exception as e:
+        logger.critical(f"Error creating results_country: {e}", exc_info=True)
+
 
-        # Explode with result detail
-        results_country_detailed = (
-            results_country
+def _explode_attempts(results: pd.DataFrame, attempts: pd.DataFrame) -> pd.DataFrame:
+    """One row per attempt: join a results table with attempts on the result id."""
+    return (
+        results
+        .merge(
+            attempts,
+            left_on = 'id',
+            right_on = 'result_id',
+            how = 'left'
+        )
+        .drop('id', axis=1)
+    )
+
+
+def build_results_nationality_detailed(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> pd.DataFrame:
+
+    """
+    'results_nationality_detailed' — results_nationality exploded to one row per attempt
+    """
+
+    try:
+        df = _explode_attempts(db_tables["results_nationality"], db_tables["attempts"])
+        logger.info(f"Created 'results_nationality_detailed' from results+competitions+attempts with only competitors from country = {config.nationality}.")
+        return df
+
+    except Exception as e:
+        logger.critical(f"Error creating results_nationality_detailed: {e}", exc_info=True)
+
+
+def build_results_country_detailed(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> pd.DataFrame:
+
+    """
+    'results_country_detailed' — results_country exploded to one row per attempt
+    """
+
+    try:
+        df = _explode_attempts(db_tables["results_country"], db_tables["attempts"])
+        logger.info(f"Created 'results_country_detailed' from results+competitions+attempts with only competitions from country = {config.country}.")
+        return df
+
+    except Exception as e:
+        logger.critical(f"Error creating results_country_detailed: {e}", exc_info=True)
+
+
+def build_results_fixed(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> pd.DataFrame:
+    
+    """
+    'results_fixed' — same as results_nationality, but with all person_country_id values
+    replaced by the competitor's latest nationality (sub_id=1).
+    """
+    
+    try:
+        persons = db_tables["persons"]
+        results = db_tables["results"].copy()
+        competitions = db_tables["competitions"]
+        rounds = db_tables["rounds"][['round_type_id','rank']]
+
+        logger.info("Creating results table with standardized nationality (subid=1)...")
+
+        # Latest country code of every person, indexed by person code (-1 = unknown).
+        # Persons and results share the person and country vocabularies (encode_shared_keys).
+        latest = persons.loc[persons["sub_id"] == 1, ["wca_id", "country_id"]].drop_duplicates(subset="wca_id")
+        country_of = np.full(len(persons["wca_id"].cat.categories), -1, dtype=np.int32)
+        country_of[latest["wca_id"].cat.codes.to_numpy()] = latest["country_id"].cat.codes.to_numpy()
+
+        # Replace nationality, keeping the recorded one for persons without a sub_id=1 row
+        person_codes = results["person_id"].cat.codes.to_numpy()
+        new_codes = np.where(person_codes >= 0, country_of[person_codes], -1)
+        old_codes = results["person_country_id"].cat.codes.to_numpy()
+        results["person_country_id"] = pd.Categorical.from_codes(
+            np.where(new_codes >= 0, new_codes, old_codes),
+            dtype=results["person_country_id"].dtype,
+        )
+
+        results_fixed = (
+            results
+            .query("person_country_id == @config.nationality")
+            .copy()
+            .merge(
+                competitions,
+                on="competition_id",
+                how="left",
+                validate = "m:1"
+            )
             .merge(
-                db_tables["attempts"],
-                left_on = 'id',
-                right_on = 'result_id',
-                how = 'left'
+                rounds,
+                how='left',
+                on='round_type_id',
             )
             .drop('id', axis=1)
         )
 
-        db_tables["results_country_detailed"] = results_country_detailed
+        results_fixed['date'] = pd.to_datetime(results_fixed[['year','month','day']])
+
+        logger.info("Created 'results_fixed'.")
+        return results_fixed
+
+    except Exception as e:
+        logger.critical(f"Error creating results_fixed: {e}", exc_info=True)
+
+
+def merge_ranks_persons(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger):
+
+    """
+    Add the current name and country_id of each competitor to ranks_single and
+    ranks_average. Ranks tables that were not loaded (no module needs them) are skipped.
+    """
+
+    persons = db_tables["persons"].query("sub_id == 1")[['wca_id','name','country_id']]
+
+    for table in ("ranks_single", "ranks_average"):
+        if table not in db_tables:
+            logger.info(f"'{table}' not loaded: skipping.")
+            continue
+
+        try:
+            db_tables[table] = (
+                db_tables[table]
+                .merge(
+                    persons, 
+                    how='left', 
+                    left_on='person_id', 
+                    right_on='wca_id'
+                )
+                .drop('wca_id', axis=1)
+            )
+
+            logger.info(f"Merged persons with {table}")
+
+        except Exception as e:
+            logger.critical(f"Error during {table}/persons merge: {e}", exc_info=True)
+
+
+def _build_ranks_nationality(table: str, db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> pd.DataFrame:
+    df = db_tables[table].query("country_id == @config.nationality").copy()
+    logger.info(f"Created '{table}_nationality' with only competitors from country = {config.nationality}.")
+    return df
+
+
+def build_ranks_single_nationality(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> pd.DataFrame:
+    """'ranks_single_nationality' — ranks_single for the given nationality"""
+    return _build_ranks_nationality("ranks_single", db_tables, config, logger)
+
+
+def build_ranks_average_nationality(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> pd.DataFrame:
+    """'ranks_average_nationality' — ranks_average for the given nationality"""
+    return _build_ranks_nationality("ranks_average", db_tables, config, logger)
+
+
+def build_multi_results(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> pd.DataFrame:
+
+    """
+    'multi_results' — decode the wca multi encoding for easier computation of statistics
+    """
+
+    results = db_tables["results"].query("event_id == '333mbf'").copy()
+
+    try:
+        results = (
+            db_tables["attempts"]
+            .copy()
+            .merge(
+                results,
+                left_on = 'result_id',
+                right_on = 'id',
+                how = 'inner'
+            )
+            .drop(columns = ["best", "average", "id"], errors = "ignore")
+            .query("value != 0")
+            .copy()
+        )
+
+        decoded = decode_multi(results["value"])
+        for col in ("attempted", "solved", "wrong", "points", "time"):
+            results[col] = decoded[col]
+        results["display"] = format_results(results["value"], "333mbf", logger)
+
+        logger.info("Created 'multi_results'")
+        return results
+
+    except Exception as e:
+        logger.critical(f"Error during better multi results creation: {e}", exc_info=True)
+
+
+def build_attempt_matrix(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> AttemptMatrix:
+
+    """
+    'attempt_matrix' — the attempts of every result as an AttemptMatrix aligned
+    with db_tables["results"], filled by one vectorised scatter of `attempts`
+    """
+
+    try:
+        result_ids = db_tables["results"]["id"].to_numpy()
+        attempts = db_tables["attempts"]
+
+        order = np.argsort(result_ids, kind="stable")
+        sorted_ids = result_ids[order]
+
+        # Row of each attempt's result and its column (attempt_number is 1-based)
+        att_ids = attempts["result_id"].to_numpy()
+        pos = np.searchsorted(sorted_ids, att_ids).clip(max=max(len(sorted_ids) - 1, 0))
+        col = attempts["attempt_number"].to_numpy().astype(np.intp) - 1
+        keep = (sorted_ids[pos] == att_ids) & (col >= 0) & (col < _MAX_ATTEMPTS) if len(sorted_ids) else np.zeros(len(att_ids), bool)
+
+        if not keep.all():
+            logger.warning(f"{(~keep).sum():,} attempt(s) without a matching result or with an invalid attempt_number ignored.")
+
+        rows = order[pos[keep]]
+        values = np.zeros((len(result_ids), _MAX_ATTEMPTS), dtype=np.int32)
+        filled = np.zeros((len(result_ids), _MAX_ATTEMPTS), dtype=bool)
+        values[rows, col[keep]] = attempts["value"].to_numpy()[keep]
+        filled[rows, col[keep]] = True
+
+        logger.info(f"Created 'attempt_matrix' ({len(result_ids):,} results x {_MAX_ATTEMPTS} attempts)")
+        return AttemptMatrix(result_ids=result_ids.astype(np.int32, copy=False), values=values, filled=filled)
+
+    except Exception as e:
+        logger.critical(f"Error creating attempt_matrix: {e}", exc_info=True)
+
+
+def _build_percentile_index(table: str, db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> PercentileIndex:
+    try:
+        ranks = db_tables[table]
+        countries = db_tables["countries"]
+        event_dtype = ranks["event_id"].dtype
+        country_dtype = ranks["country_id"].dtype
+        n_events = len(event_dtype.categories)
+
+        # Continent of every country code
+        continent_codes, continents = pd.factorize(countries["continent_id"])
+        country_codes = pd.Categorical(countries["id"], dtype=country_dtype).codes
+        continent_of = np.full(len(country_dtype.categories), -1, dtype=np.int64)
+        continent_of[country_codes[country_codes >= 0]] = continent_codes[country_codes >= 0]
+
+        index = PercentileIndex(
+            event_dtype=event_dtype, country_dtype=country_dtype, continent_of=continent_of,
+            n_continents=len(continents), keys={}, starts={}, counts={},
+        )
+
+        event = ranks["event_id"].cat.codes.to_numpy().astype(np.int64)
+        country = ranks["country_id"].cat.codes.to_numpy().astype(np.int64)
+        value = ranks["best"].to_numpy().astype(np.int64)
+        n_groups = {"world": n_events, "continent": len(continents) * n_events, "country": len(country_dtype.categories) * n_events}
+
+        for scope in _PERCENTILE_SCOPES:
+            group = index._groups(scope, event, country)
+            ok = (group >= 0) & (value > 0)
+            keys = np.sort((group[ok] << 32) | value[ok])
+            bounds = np.searchsorted(keys, np.arange(n_groups[scope] + 1, dtype=np.int64) << 32)
+            index.keys[scope], index.starts[scope], index.counts[scope] = keys, bounds[:-1], np.diff(bounds)
+
+        logger.info(f"Created 'percentile_index_{table.removeprefix('ranks_')}' ({len(index.keys['world']):,} personal bests)")
+        return index
+
+    except Exception as e:
+        logger.critical(f"Error creating percentile index from {table}: {e}", exc_info=True)
 
-        logger.info(f"Created 'results_nationality' from results+competitions with only competitors from country = {config.nationality}.")
-        logger.info(f"Created 'results_nationality_detailed' from results+competitions+attempts with only competitors from country = {config.nationality}.")
-        logger.info(f"Created 'results_country' from results+competitions with only competitions from country = {config.country}.")
-        logger.info(f"Created 'results_country_detailed' from results+competitions+attempts with only competitions from country = {config.country}.")
 
-    except Exception as e:
-        logger.critical(f"Error creating localized results dataframes: {e}", exc_info=True)
+def build_percentile_index_single(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> PercentileIndex:
+    """'percentile_index_single' — PercentileIndex over ranks_single"""
+    return _build_percentile_index("ranks_single", db_tables, config, logger)
 
 
-def fix_results_nationality(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger):
-    
+def build_percentile_index_average(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> PercentileIndex:
+    """'percentile_index_average' — PercentileIndex over ranks_average"""
+    return _build_percentile_index("ranks_average", db_tables, config, logger)
+
+
+def build_pb_matrix(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> PBMatrix:
+
     """
-    Create 'results_fixed' — same as results_nationality, but with all person_country_id values
-    replaced by the competitor's latest nationality (sub_id=1).
+    'pb_matrix' — PBMatrix of ranks_single (and ranks_average when loaded),
+    one scatter per PB/rank column
     """
-    
+
     try:
-        persons = db_tables["persons"]
-        results = db_tables["results"].copy()
-        competitions = db_tables["competitions"]
-        rounds = db_tables["rounds"][['round_type_id','rank']]
+        ranks_single = db_tables["ranks_single"]
+        person_dtype = ranks_single["person_id"].dtype
+        event_dtype = ranks_single["event_id"].dtype
+        country_dtype = ranks_single["country_id"].dtype
+        shape = (len(person_dtype.categories), len(event_dtype.categories))
+
+        pbs = PBMatrix(
+            person_dtype=person_dtype, event_dtype=event_dtype, country_dtype=country_dtype,
+            country=np.full(shape[0], -1, dtype=np.int64), best={}, rank={},
+        )
 
-        logger.info("Creating results table with standardized nationality (subid=1)...")
+        for kind in ("single", "average"):
+            if f"ranks_{kind}" not in db_tables:
+                continue
+            ranks = db_tables[f"ranks_{kind}"]
+            person = ranks["person_id"].cat.codes.to_numpy()
+            event = ranks["event_id"].cat.codes.to_numpy()
+            pbs.country[person] = ranks["country_id"].cat.codes.to_numpy()
+
+            pbs.best[kind] = np.zeros(shape, dtype=np.int32)
+            pbs.best[kind][person, event] = ranks["best"].to_numpy()
+            pbs.rank[kind] = {}
+            for scope in _PERCENTILE_SCOPES:
+                if f"{scope}_rank" in ranks.columns:
+                    pbs.rank[kind][scope] = np.zeros(shape, dtype=np.int32)
+                    pbs.rank[kind][scope][person, event] = ranks[f"{scope}_rank"].to_numpy()
+
+        logger.info(f"Created 'pb_matrix' ({shape[0]:,} persons x {shape[1]} events, {list(pbs.best)})")
+        return pbs
 
-        # Build mapping person_id → latest country_id
-        nat_map = (
-            persons.loc[persons["sub_id"] == 1, ["wca_id", "country_id"]]
-            .drop_duplicates(subset="wca_id")
-            .set_index("wca_id")["country_id"]
-            .to_dict()
-        )
+    except Exception as e:
+        logger.critical(f"Error creating pb_matrix: {e}", exc_info=True)
 
-        # Replace nationality
-        results["person_country_id"] = results["person_id"].map(nat_map).fillna(results["person_country_id"])
 
-        results_fixed = (
-            results
-            .query("person_country_id == @config.nationality")
-            .copy()
-            .merge(
-                competitions,
-                on="competition_id",
-                how="left",
-                validate = "m:1"
-            )
-            .merge(
-                rounds,
-                how='left',
-                on='round_type_id',
-            )
-            .drop('id', axis=1)
-        )
+# Result columns tracked by pb_progression, as its `type` labels
+_PB_TYPES = {"single": "best", "average": "average"}
 
-        results_fixed['date'] = pd.to_datetime(results_fixed[['year','month','day']])
 
-        db_tables["results_fixed"] = results_fixed
-        logger.info("Added 'results_fixed' to db_tables.")
+def _result_days_and_ranks(db_tables: dict) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Competition day (days since 1970-01-01, -1 if unknown) and round rank of
+    every row of db_tables["results"], for chronological sorts of results.
+    """
+    results = db_tables["results"]
+    competitions = db_tables["competitions"]
+    rounds = db_tables["rounds"]
 
-    except Exception as e:
-        logger.critical(f"Error creating results_fixed: {e}", exc_info=True)
-        return db_tables
+    comp_day = np.full(len(results["competition_id"].cat.categories), -1, dtype=np.int64)
+    comp_day[competitions["competition_id"].cat.codes.to_numpy()] = (
+        (competitions["date"] - pd.Timestamp("1970-01-01")).dt.days.to_numpy()
+    )
+    round_codes = pd.Categorical(rounds["round_type_id"], dtype=results["round_type_id"].dtype).codes
+    round_rank = np.zeros(len(results["round_type_id"].cat.categories) + 1, dtype=np.int64)
+    round_rank[round_codes[round_codes >= 0]] = rounds["rank"].to_numpy()[round_codes >= 0]
+
+    comp = results["competition_id"].cat.codes.to_numpy()
+    day = np.where(comp >= 0, comp_day[comp], -1)
+    rank = round_rank[results["round_type_id"].cat.codes.to_numpy()]
+    return day, rank
 
 
-def make_localized_rankings(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger):
+@product("pb_progression", deps=("results", "competitions", "rounds"), persist=True)
+def build_pb_progression(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> pd.DataFrame:
 
     """
-    Filter ranks_single and ranks_average for the given nationality
+    Product 'pb_progression' — every personal-best improvement of every
+    competitor, event and type (single/average): one row per result that
+    beat the person's previous PB, with its date, competition and round,
+    the new PB `value`, the `previous` one and the improvement `delta`
+    (both NA for a first result).
+
+    Built in one pass: all valid singles and averages are stacked, sorted
+    chronologically within each (type, event, person) group (competition
+    date, then round rank), and run through a single cumulative minimum.
+    Rows are in that order, so the first row of a group is the first valid
+    result and the last is the current PB.
     """
 
-    persons = db_tables["persons"].query("sub_id == 1")[['wca_id','name','country_id']]
+    results = db_tables["results"]
+
+    n_persons = len(results["person_id"].cat.categories)
+    n_events = len(results["event_id"].cat.categories)
+
+    person = results["person_id"].cat.codes.to_numpy().astype(np.int64)
+    event = results["event_id"].cat.codes.to_numpy().astype(np.int64)
+    day, rank = _result_days_and_ranks(db_tables)
+
+    # Singles and averages stacked; the type is the top digit of the group
+    row, group, value = [], [], []
+    for t, column in enumerate(_PB_TYPES.values()):
+        v = results[column].to_numpy().astype(np.int64)
+        ok = np.flatnonzero((v > 0) & (person >= 0) & (event >= 0) & (day >= 0))
+        row.append(ok)
+        group.append((t * n_events + event[ok]) * n_persons + person[ok])
+        value.append(v[ok])
+    row, group, value = np.concatenate(row), np.concatenate(group), np.concatenate(value)
+
+    order = np.lexsort((value, rank[row], day[row], group))
+    row, group, value = row[order], group[order], value[order]
+
+    # Running PB; later groups sit below earlier ones in the key, so the
+    # cumulative minimum restarts at every group
+    first = np.r_[True, group[1:] != group[:-1]]
+    offset = -np.cumsum(first) << 32
+    running = np.minimum.accumulate(offset + value) - offset
+    improved = first | (value < np.r_[0, running[:-1]])
+
+    row, group, value, first = row[improved], group[improved], value[improved], first[improved]
+    previous = pd.array(np.r_[0, value[:-1]], dtype="Int32")
+    previous[first] = pd.NA
+
+    df = pd.DataFrame({
+        "person_id": results["person_id"].array.take(row),
+        "event_id": results["event_id"].array.take(row),
+        "type": pd.Categorical.from_codes(group // (n_events * n_persons), categories=list(_PB_TYPES)),
+        "date": pd.to_datetime(day[row], unit="D"),
+        "competition_id": results["competition_id"].array.take(row),
+        "round_type_id": results["round_type_id"].array.take(row),
+        "value": value.astype(np.int32),
+        "previous": previous,
+    })
+    df["delta"] = df["previous"] - df["value"]
+
+    logger.info(f"Created 'pb_progression' ({len(df):,} PB improvements)")
+    return df
 
-    try:
-        db_tables["ranks_single"] = (
-            db_tables["ranks_single"]
-            .merge(
-                persons, 
-                how='left', 
-                left_on='person_id', 
-                right_on='wca_id'
-            )
-            .drop('wca_id', axis=1)
-        )
 
-        db_tables["ranks_single_nationality"] = db_tables["ranks_single"].query("country_id == @config.nationality").copy()
+# Record scopes of record_progression, narrowest first, as its `record` labels
+_RECORD_SCOPES = ("NR", "CR", "WR")
 
-        logger.info("Merged persons with ranks_single")
-        logger.info(f"Created 'ranks_single_nationality' with only competitors from country = {config.nationality}.")
 
-    except Exception as e:
-        logger.critical(f"Error during ranks_single/persons merge: {e}", exc_info=True)
+def _record_rows(group: np.ndarray, day: np.ndarray, comp: np.ndarray, rank: np.ndarray, value: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Records among results split in groups (one per region, event and type):
+    a result is a record if it ties or beats every result of its group from
+    an earlier day, and every earlier one of its own competition (earlier
+    round, or better in the same round). Results of different competitions
+    on the same day do not take records from each other.
+
+    Returns the chronological order of the rows, which of them (in that
+    order) are records, and the record each one stood against (-1 if none).
+    """
+    none = np.iinfo(np.int64).max
+    order = np.lexsort((value, rank, comp, day, group))
+    g, d, c, v = group[order], day[order], comp[order], value[order]
+    n = len(order)
 
-    try:
-        db_tables["ranks_average"] = (
-            db_tables["ranks_average"]
-            .merge(
-                persons, 
-                how='left', 
-                left_on='person_id', 
-                right_on='wca_id'
-            )
-            .drop('wca_id', axis=1)
-        )
+    # Running record, restarting at every group (see build_pb_progression)
+    first = np.r_[True, g[1:] != g[:-1]]
+    offset = -np.cumsum(first) << 32
+    running = np.minimum.accumulate(offset + v) - offset
 
-        db_tables["ranks_average_nationality"] = db_tables["ranks_average"].query("country_id == @config.nationality").copy()
+    # Record at the end of the previous day, from the first row of each day
+    day_start = first | np.r_[True, d[1:] != d[:-1]]
+    start = np.maximum.accumulate(np.where(day_start, np.arange(n), 0))
+    before_day = np.where(first[start], none, running[start - 1])
 
-        logger.info("Merged persons with ranks_average")
-        logger.info(f"Created 'ranks_average_nationality' with only competitors from country = {config.nationality}.")
+    # Best earlier result of the same competition on that day
+    comp_start = day_start | np.r_[True, c[1:] != c[:-1]]
+    offset = -np.cumsum(comp_start) << 32
+    in_comp = np.minimum.accumulate(offset + v) - offset
+    before_row = np.where(comp_start, none, np.r_[none, in_comp[:-1]])
 
-    except Exception as e:
-        logger.critical(f"Error during ranks_average/persons merge: {e}", exc_info=True)
+    standing = np.minimum(before_day, before_row)
+    return order, v <= standing, np.where(standing < none, standing, -1)
 
 
-def make_better_multi_results(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger):
+@product("record_progression", deps=("results", "competitions", "rounds", "countries"), persist=True)
+def build_record_progression(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> pd.DataFrame:
 
     """
-    Decode the wca multi encoding for easier computation of statistics
+    Product 'record_progression' — the NR, CR and WR progression of every
+    country, continent and event, single and average: one row per record
+    and scope (a WR is also a CR and an NR), with the `record` scope, the
+    region (`country_id` for NR, `continent_id` for CR), the result `value`
+    and the `previous` record (NA for the first one of a region).
+
+    Records are computed from the results, not read from the
+    regional_*_record tags: all valid results are sorted chronologically
+    within (type, event, country) and run through one grouped cumulative
+    minimum (see _record_rows). A CR is always an NR and a WR a CR, so the
+    continental pass only looks at the NRs and the world pass at the CRs.
+    The country of a result is the person_country_id it was set with.
+
+    Rows are sorted by record, type, event, region and date, so one history
+    is one contiguous slice, e.g.
+    progression.query("record == 'NR' and type == 'single' and event_id == '333' and country_id == 'Italy'")
     """
 
-    results = db_tables["results"].query("event_id == '333mbf'").copy()
+    results = db_tables["results"]
+    countries = db_tables["countries"]
+
+    n_events = len(results["event_id"].cat.categories)
+    country_dtype = results["person_country_id"].dtype
+
+    # Continent of every country code
+    continent_dtype = pd.CategoricalDtype(sorted(countries["continent_id"].dropna().unique()))
+    continent_of = np.full(len(country_dtype.categories), -1, dtype=np.int64)
+    country_codes = pd.Categorical(countries["id"], dtype=country_dtype).codes
+    continent_of[country_codes[country_codes >= 0]] = pd.Categorical(
+        countries["continent_id"], dtype=continent_dtype
+    ).codes[country_codes >= 0]
+
+    event = results["event_id"].cat.codes.to_numpy().astype(np.int64)
+    country = results["person_country_id"].cat.codes.to_numpy().astype(np.int64)
+    comp = results["competition_id"].cat.codes.to_numpy().astype(np.int64)
+    day, rank = _result_days_and_ranks(db_tables)
+
+    # Singles and averages stacked; type and event lead every group key
+    row, kind, value = [], [], []
+    for t, column in enumerate(_PB_TYPES.values()):
+        v = results[column].to_numpy().astype(np.int64)
+        ok = np.flatnonzero((v > 0) & (event >= 0) & (country >= 0) & (day >= 0))
+        row.append(ok)
+        kind.append(np.full(len(ok), t * n_events, dtype=np.int64) + event[ok])
+        value.append(v[ok])
+    row, kind, value = np.concatenate(row), np.concatenate(kind), np.concatenate(value)
+
+    frames = []
+    regions = {
+        "NR": (country, len(country_dtype.categories)),
+        "CR": (np.where(country >= 0, continent_of[country], -1), len(continent_dtype.categories)),
+        "WR": (np.zeros(len(results), dtype=np.int64), 1),
+    }
+    for scope in _RECORD_SCOPES:
+        region, n_regions = regions[scope]
+        keep = region[row] >= 0
+        row, kind, value = row[keep], kind[keep], value[keep]
+
+        order, is_record, previous = _record_rows(
+            kind * n_regions + region[row], day[row], comp[row], rank[row], value,
+        )
+        row, kind, value, previous = row[order][is_record], kind[order][is_record], value[order][is_record], previous[is_record]
+
+        frames.append(pd.DataFrame({
+            "record": pd.Categorical([scope] * len(row), categories=list(_RECORD_SCOPES)),
+            "type": pd.Categorical.from_codes(kind // n_events, categories=list(_PB_TYPES)),
+            "event_id": results["event_id"].array.take(row),
+            "country_id": results["person_country_id"].array.take(row),
+            "continent_id": pd.Categorical.from_codes(regions["CR"][0][row], dtype=continent_dtype),
+            "person_id": results["person_id"].array.take(row),
+            "date": pd.to_datetime(day[row], unit="D"),
+            "competition_id": results["competition_id"].array.take(row),
+            "round_type_id": results["round_type_id"].array.take(row),
+            "value": value.astype(np.int32),
+            "previous": pd.array(previous, dtype="Int32"),
+        }))
+
+    df = pd.concat(frames, ignore_index=True)
+    df["previous"] = df["previous"].mask(df["previous"] < 0)
+
+    logger.info(
+        "Created 'record_progression' ("
+        + ", ".join(f"{n:,} {scope}" for scope, n in df["record"].value_counts(sort=False).items())
+        + ")"
+    )
+    return df
 
+
+def _build_rankings_history(kind: str, db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> RankingsHistory:
     try:
-        results = (
-            db_tables["attempts"]
-            .copy()
-            .merge(
-                results,
-                left_on = 'result_id',
-                right_on = 'id',
-                how = 'inner'
-            )
-            .drop(columns = ["best", "average", "id"])
-            .query("value != 0")
-            .copy()
+        progression = get_product("pb_progression", db_tables, config, logger)
+        persons = db_tables["persons"].query("sub_id == 1")
+        countries = db_tables["countries"]
+
+        person_dtype = db_tables["results"]["person_id"].dtype
+        event_dtype = db_tables["results"]["event_id"].dtype
+        country_dtype = persons["country_id"].dtype
+        n_persons = len(person_dtype.categories)
+
+        # pb_progression is already in (event, person, date) order per type
+        pbs = progression[progression["type"] == kind]
+        group = pbs["event_id"].cat.codes.to_numpy().astype(np.int64) * n_persons + pbs["person_id"].cat.codes.to_numpy()
+        day = (pbs["date"] - pd.Timestamp("1970-01-01")).dt.days.to_numpy().astype(np.int64)
+        keys = (group << 32) | day
+        groups, group_starts = np.unique(group, return_index=True)
+
+        # Current nationality and continent of every person code
+        country_of = np.full(n_persons, -1, dtype=np.int64)
+        country_of[persons["wca_id"].cat.codes.to_numpy()] = persons["country_id"].cat.codes.to_numpy()
+        continent_codes, _ = pd.factorize(countries["continent_id"])
+        continent_of = np.full(len(country_dtype.categories), -1, dtype=np.int64)
+        country_codes = pd.Categorical(countries["id"], dtype=country_dtype).codes
+        continent_of[country_codes[country_codes >= 0]] = continent_codes[country_codes >= 0]
+
+        logger.info(f"Created 'rankings_history_{kind}' ({len(keys):,} PB change points)")
+        return RankingsHistory(
+            person_dtype=person_dtype, event_dtype=event_dtype, country_dtype=country_dtype,
+            country_of=country_of, continent_of=continent_of,
+            keys=keys, values=pbs["value"].to_numpy(), groups=groups, group_starts=group_starts,
         )
 
-        results["attempted"] = results["value"].apply(multiattempted)
-        results["solved"] = results["value"].apply(multisolved)
-        results["wrong"] = results["attempted"] - results["solved"]
-        results["points"] = results["solved"] - results["wrong"]
-        results["time"] = results["value"].apply(multitime)
-        results["display"] = results["value"].apply(multiresult)
+    except Exception as e:
+        logger.critical(f"Error creating rankings_history_{kind}: {e}", exc_info=True)
+
+
+def build_rankings_history_single(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> RankingsHistory:
+    """'rankings_history_single' — RankingsHistory of single PBs"""
+    return _build_rankings_history("single", db_tables, config, logger)
+
 
-        db_tables["multi_results"] = results
+def build_rankings_history_average(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> RankingsHistory:
+    """'rankings_history_average' — RankingsHistory of average PBs"""
+    return _build_rankings_history("average", db_tables, config, logger)
 
-        logger.info("Added multi_results table to db_tables")
 
+def build_records_history(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger) -> RecordsHistory:
+    """'records_history' — RecordsHistory over the record_progression product"""
+    try:
+        progression = get_product("record_progression", db_tables, config, logger)
+        day = (progression["date"] - pd.Timestamp("1970-01-01")).dt.days.to_numpy().astype(np.int64)
+        value = progression["value"].to_numpy().astype(np.int64)
+
+        # Region of every row within its scope: country, continent, or the world
+        scope = progression["record"].cat.codes.to_numpy()
+        region = np.select(
+            [progression["record"] == "NR", progression["record"] == "CR"],
+            [progression["country_id"].cat.codes, progression["continent_id"].cat.codes],
+            0,
+        ).astype(np.int64)
+        event = progression["event_id"].cat.codes.to_numpy().astype(np.int64)
+        kind = progression["type"].cat.codes.to_numpy().astype(np.int64)
+
+        # Chronological within each group, the worst record of a day first
+        order = np.lexsort((-value, day, region, event, kind, scope))
+        scope, kind, event, region, day, value = scope[order], kind[order], event[order], region[order], day[order], value[order]
+
+        new_group = np.r_[True, (scope[1:] != scope[:-1]) | (kind[1:] != kind[:-1]) | (event[1:] != event[:-1]) | (region[1:] != region[:-1])]
+        group = np.cumsum(new_group) - 1
+        new_run = new_group | np.r_[True, value[1:] != value[:-1]]
+
+        # A run of equal records ends where the next run of its group starts
+        run_first = np.flatnonzero(new_run)
+        run = np.cumsum(new_run) - 1
+        next_first = np.r_[run_first[1:], len(order)][run]
+        beaten = next_first < len(order)
+        beaten[beaten] = ~new_group[next_first[beaten]]
+        ends = np.where(beaten, day[np.minimum(next_first, len(order) - 1)], -1)
+
+        results_day, _ = _result_days_and_ranks(db_tables)
+
+        logger.info(f"Created 'records_history' ({len(order):,} records in {int(new_group.sum()):,} progressions)")
+        return RecordsHistory(
+            records=progression.iloc[order].reset_index(drop=True),
+            keys=(group << 32) | day,
+            group_starts=np.flatnonzero(new_group),
+            run_starts=run_first[run],
+            ends=ends,
+            last_day=int(results_day.max()) if len(results_day) else 0,
+        )
 
     except Exception as e:
-        logger.critical(f"Error during better multi results creation: {e}", exc_info=True)
+        logger.critical(f"Error creating records_history: {e}", exc_info=True)
 
 
-def process_tables(db_tables: dict[str, pd.DataFrame], config: configparser.ConfigParser, logger: logging.Logger) -> dict[str, pd.DataFrame]:
-    
+def set_config_attributes(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger):
     """
-    Perform common operations on db_tables. e.g. Merges the 'results' and 'competitions' tables on 'competition_id' and filters rows to include only competitors from the configured country.
-
-    Also attaches country-agnostic attributes to `config`:
+    Attach country-agnostic attributes to `config`:
         config.continent_id            (e.g. "_Europe")
         config.continental_record_name (e.g. "ER", "AsR", "AfR", "NAR", "SAR", "OcR")
         config.nats                    (list of national championship competition_ids)
+        config.countries / config.real_countries
     """
 
-    logger.info("Preprocessing tables...")
-       
-    make_localized_results_df(db_tables, config, logger)
-    fix_results_nationality(db_tables, config, logger)
-    make_localized_rankings(db_tables, config, logger)
-    make_better_multi_results(db_tables, config, logger)
-
     # --- Derive continent + continental record name from the configured country ---
     # This makes records, podiums, etc. country-agnostic: an Italian setup gets "ER",
     # a Chinese setup gets "AsR", a Brazilian setup gets "SAR", and so on.
@@ -697,9 +2779,326 @@ def process_tables(db_tables: dict[str, pd.DataFrame], config: configparser.Conf
     config.countries = list(db_tables["competitions"]['country_id'].drop_duplicates())
     config.real_countries = [x for x in config.countries if x not in config.multivenue]
 
+
+# Eager preprocessing steps in serial order: (function, export tables it reads,
+# steps that must have finished first). Tables that are not being loaded at all
+# are ignored when deciding readiness; the steps skip them themselves. The keys
+# are encoded table by table, dimension tables first (see encode_shared_keys),
+# so e.g. the ranks do not wait for results to finish parsing.
+_PROCESS_STEPS = [
+    *(
+        _encode_keys_step(table)
+        for table in ("countries", "events", "persons", "competitions",
+                      "results", "ranks_single", "ranks_average", "championships", "scrambles")
+    ),
+    (normalize_competitions_and_rounds, ("competitions", "rounds"), ("encode_competitions_keys",)),
+    (encode_record_tags, ("results",), ("encode_results_keys",)),
+    (merge_ranks_persons, ("persons", "ranks_single", "ranks_average"),
+     ("encode_persons_keys", "encode_ranks_single_keys", "encode_ranks_average_keys")),
+    (set_config_attributes, ("countries", "continents", "championships"),
+     ("normalize_competitions_and_rounds", "encode_championships_keys")),
+]
+
+# Derived tables, built lazily on first access: name -> (builder, tables it
+# reads). A table is only registered if all its inputs are available, so e.g.
+# the *_detailed joins do not exist when no selected module asked for attempts.
+_DERIVED_TABLES = {
+    "results_nationality": (build_results_nationality, ("results", "competitions", "rounds")),
+    "results_nationality_detailed": (build_results_nationality_detailed, ("results_nationality", "attempts")),
+    "results_country": (build_results_country, ("results", "competitions", "rounds")),
+    "results_country_detailed": (build_results_country_detailed, ("results_country", "attempts")),
+    "results_fixed": (build_results_fixed, ("results", "persons", "competitions", "rounds")),
+    "ranks_single_nationality": (build_ranks_single_nationality, ("ranks_single",)),
+    "ranks_average_nationality": (build_ranks_average_nationality, ("ranks_average",)),
+    "multi_results": (build_multi_results, ("results", "attempts")),
+    "attempt_matrix": (build_attempt_matrix, ("results", "attempts")),
+    "percentile_index_single": (build_percentile_index_single, ("ranks_single", "countries")),
+    "percentile_index_average": (build_percentile_index_average, ("ranks_average", "countries")),
+    "pb_matrix": (build_pb_matrix, ("ranks_single",)),
+    "rankings_history_single": (build_rankings_history_single, ("results", "competitions", "rounds", "persons", "countries")),
+    "rankings_history_average": (build_rankings_history_average, ("results", "competitions", "rounds", "persons", "countries")),
+    "records_history": (build_records_history, ("results", "competitions", "rounds", "countries")),
+}
+
+
+def register_derived_tables(db_tables: LazyTables, config: configparser.ConfigParser, logger: logging.Logger) -> None:
+    """
+    Declare every table in _DERIVED_TABLES on `db_tables`; nothing is built here.
+    Tables already present (e.g. restored from a snapshot) are left as they are.
+    """
+    for name, (builder, inputs) in _DERIVED_TABLES.items():
+        missing = [t for t in inputs if t not in db_tables]
+        if missing:
+            logger.info(f"'{name}' not available: {missing} not loaded.")
+            continue
+        db_tables.register(name, lambda tables, builder=builder: builder(tables, config, logger))
+
+
+def process_tables(db_tables: dict[str, pd.DataFrame], config: configparser.ConfigParser, logger: logging.Logger) -> LazyTables:
+    
+    """
+    Perform common operations on db_tables. e.g. Merges the 'results' and 'competitions' tables on 'competition_id' and filters rows to include only competitors from the configured country.
+
+    The cheap in-place steps (_PROCESS_STEPS) run immediately; the pre-filtered
+    tables (_DERIVED_TABLES: results_nationality, results_fixed, multi_results, ...)
+    are only registered and get built the first time a module reads them.
+    Returns db_tables wrapped in a LazyTables.
+
+    Also attaches country-agnostic attributes to `config` (see set_config_attributes).
+    load_tables runs the same steps concurrently, while tables are still loading.
+    """
+
+    logger.info("Preprocessing tables...")
+
+    if not isinstance(db_tables, LazyTables):
+        db_tables = LazyTables(db_tables)
+
+    for step, _, _ in _PROCESS_STEPS:
+        step(db_tables, config, logger)
+
+    register_derived_tables(db_tables, config, logger)
+
+    return db_tables
+
+
+def _loading_workers(config: configparser.ConfigParser) -> int:
+    """
+    Read [loading] -> workers from config.ini (0 or missing = one per CPU core).
+    """
+    workers = 0
+    if config.has_section("loading"):
+        workers = config["loading"].getint("workers", 0)
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def load_tables(
+    table_columns: dict[str, list[str] | None],
+    config: configparser.ConfigParser,
+    logger: logging.Logger,
+) -> LazyTables:
+    """
+    Load the export tables in parallel and preprocess them.
+
+    Equivalent to reading every table with read_table and then calling
+    process_tables, but each table is parsed in a thread pool ([loading] ->
+    workers) and every process_tables step is submitted to the same pool as
+    soon as the tables and steps it depends on are done (see _PROCESS_STEPS),
+    so e.g. the rankings are merged while results/attempts are still parsing.
+    Threads are enough: the CSV tokenizer and pyarrow release the GIL, and the
+    frames never have to be pickled back from worker processes.
+
+    Derived tables are only registered (see process_tables). If a snapshot
+    ([cache] -> snapshot) matches the export fingerprints, the column
+    projection and the relevant config values, it is restored instead, along
+    with whichever derived tables it holds; see save_snapshot.
+
+    Parameters
+    ----------
+    table_columns : dict
+        Output of resolve_table_columns: table name -> columns (None = all).
+    """
+    workers = _loading_workers(config)
+
+    snapshot_key = _snapshot_key(table_columns, config) if _snapshot_enabled(config) else None
+    restored = _load_snapshot(snapshot_key, config, logger, workers) if snapshot_key is not None else None
+
+    if restored is not None:
+        db_tables = LazyTables(restored)
+        register_derived_tables(db_tables, config, logger)
+        db_tables.snapshot_key = snapshot_key
+        db_tables.snapshot_tables = set(table_columns) | set(_DERIVED_TABLES)
+        db_tables.snapshot_saved = set(restored)
+        return db_tables
+
+    logger.info(f"Loading {len(table_columns)} table(s) with {workers} worker thread(s)...")
+
+    def load(name, columns):
+        with timed(logger, f"load {name}"):
+            return read_table(name, config, logger, columns=columns)
+
+    def run_step(step):
+        with timed(logger, f"preprocess {step.__name__}"):
+            step(db_tables, config, logger)
+
+    db_tables = {}
+    done_steps = set()
+    pending_steps = list(_PROCESS_STEPS)
+    config.shared_key_dtypes = {}    # filled by the concurrent encode_*_keys steps
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(load, name, columns): ("table", name)
+            for name, columns in table_columns.items()
+        }
+
+        while futures:
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+
+            for future in finished:
+                kind, name = futures.pop(future)
+                result = future.result()   # re-raises worker errors here
+                if kind == "table":
+                    db_tables[name] = result
+                else:
+                    done_steps.add(name)
+
+            for entry in list(pending_steps):
+                step, inputs, after = entry
+                inputs_ready = all(t in db_tables for t in inputs if t in table_columns)
+                if inputs_ready and all(a in done_steps for a in after):
+                    pending_steps.remove(entry)
+                    futures[pool.submit(run_step, step)] = ("step", step.__name__)
+
+    if pending_steps:
+        logger.critical(f"Preprocessing steps never became ready: {[s[0].__name__ for s in pending_steps]}")
+
+    # Same key order as a serial read_table + process_tables run, whatever order
+    # the threads finished in (export_db_schema and friends iterate over it)
+    db_tables = LazyTables({t: db_tables[t] for t in table_columns})
+    register_derived_tables(db_tables, config, logger)
+
+    db_tables.snapshot_key = snapshot_key
+    db_tables.snapshot_tables = set(table_columns) | set(_DERIVED_TABLES)
+
+    return db_tables
+
+
+# Bump whenever process_tables or a persisted product changes what it produces,
+# so old snapshots are ignored.
+_SNAPSHOT_VERSION = 5
+
+# Global settings that change the output of process_tables and persisted products.
+_SNAPSHOT_CONFIG_KEYS = ("country", "nationality", "championship_type", "multivenue", "current_events")
+
+# config attributes set by process_tables, stored alongside the tables.
+_SNAPSHOT_CONFIG_ATTRS = ("continent_id", "continental_record_name", "nats", "countries", "real_countries")
+
+
+def _snapshot_enabled(config: configparser.ConfigParser) -> bool:
+    """
+    Read [cache] -> snapshot from config.ini (on by default, off with the cache).
+    """
+    cache_enabled, _ = _cache_settings(config)
+    if not cache_enabled:
+        return False
+    return config["cache"].getboolean("snapshot", True) if config.has_section("cache") else True
+
+
+def _snapshot_key(table_columns: dict[str, list[str] | None], config: configparser.ConfigParser) -> str | None:
+    """
+    Identity of a preprocessed state: the fingerprint and column projection of
+    every loaded export table, the values in _SNAPSHOT_CONFIG_KEYS and the
+    snapshot/cache versions. None if an export file is missing (the regular
+    loader then reports it).
+    """
+    tables_map = dict(config.items("tables")) if config.has_section("tables") else {}
+    parts = [f"snapshot v{_SNAPSHOT_VERSION}", f"cache v{_CACHE_VERSION}"]
+
+    try:
+        for name, columns in table_columns.items():
+            file_path, member = _locate_export_file(tables_map[name], config)
+            projection = ",".join(columns) if columns is not None else "*"
+            parts.append(f"{name}:{export_fingerprint(file_path, member)}:{projection}")
+    except (KeyError, FileNotFoundError):
+        return None
+
+    parts += [f"{key}={getattr(config, key)}" for key in _SNAPSHOT_CONFIG_KEYS]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _load_snapshot(
+    key: str, config: configparser.ConfigParser, logger: logging.Logger, workers: int
+) -> dict[str, pd.DataFrame] | None:
+    """
+    Restore the tables and the process_tables config attributes from the
+    snapshot `key`, or return None if there is no usable snapshot.
+    """
+    snapshot_dir = get_cache_dir(config) / "snapshots" / key
+    manifest = _read_json(snapshot_dir / "manifest.json")
+    if manifest.get("key") != key:
+        return None
+
+    logger.info(f"Restoring preprocessed tables from snapshot {key} ...")
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            frames = pool.map(lambda t: pd.read_parquet(snapshot_dir / f"{t}.parquet"), manifest["tables"])
+            db_tables = dict(zip(manifest["tables"], frames))
+    except Exception as e:
+        logger.warning(f"Could not read snapshot {key}, rebuilding it: {e}")
+        return None
+
+    for attr, value in manifest["config"].items():
+        setattr(config, attr, value)
+
+    logger.info(
+        f"Restored {len(db_tables)} table(s) from snapshot; "
+        f"country '{config.country}' is in '{config.continent_id}', {len(config.nats)} national championship(s)."
+    )
     return db_tables
 
 
+def save_snapshot(db_tables: LazyTables, config: configparser.ConfigParser, logger: logging.Logger) -> None:
+    """
+    Save the export tables and the derived tables built so far, plus the
+    process_tables config attributes, under <cache_dir>/snapshots/<key>.
+
+    Call it after the modules have run, so that the derived tables they needed
+    are included and the next run does not rebuild them. Of what the modules
+    add, only products declared with persist=True are saved (see Product), and
+    nothing is written if the snapshot the tables were restored from already
+    holds everything that was built.
+
+    One Parquet file per table (index included); the snapshot is assembled in a
+    hidden temp directory and renamed into place, the manifest being its last
+    file, so a crash never leaves a partial snapshot behind. Older snapshots
+    are removed.
+    """
+    key = getattr(db_tables, "snapshot_key", None)
+    if key is None:
+        return
+
+    names = [
+        n for n in db_tables
+        if n in db_tables.snapshot_tables and db_tables.is_built(n) and isinstance(db_tables[n], pd.DataFrame)
+    ]
+    if set(names) <= db_tables.snapshot_saved:
+        logger.info(f"Snapshot {key} is up to date.")
+        return
+
+    snapshot_root = get_cache_dir(config) / "snapshots"
+    snapshot_root.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=snapshot_root, prefix=f".{key}-"))
+
+    try:
+        for name in names:
+            db_tables[name].to_parquet(tmp_dir / f"{name}.parquet")
+
+        _write_json_atomic(tmp_dir / "manifest.json", {
+            "key": key,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "tables": names,
+            "config": {attr: getattr(config, attr) for attr in _SNAPSHOT_CONFIG_ATTRS},
+        })
+
+        final_dir = snapshot_root / key
+        if final_dir.exists():
+            shutil.rmtree(final_dir)
+        os.replace(tmp_dir, final_dir)
+
+    except Exception as e:
+        # Missing pyarrow or an unserialisable column: keep going without a snapshot
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        logger.warning(f"Could not save preprocessed snapshot: {e}")
+        return
+
+    for old in snapshot_root.iterdir():
+        if old.is_dir() and old.name != key and not old.name.startswith("."):
+            shutil.rmtree(old, ignore_errors=True)
+
+    db_tables.snapshot_saved = set(names)
+    logger.info(f"Saved preprocessed snapshot {key} ({len(names)} tables)")
+
+
 def check_missing_regions(db_tables: dict, config: configparser.ConfigParser, logger: logging.Logger | None = None) -> set: 
     """
     Check for competitions in the WCA database that are missing from the region mapping file.
@@ -759,9 +3158,19 @@ def export_db_schema(
         f.write(f"Nationality: {config.nationality}\n")
         f.write(f"Country: {config.country}\n\n")
 
-        for table_name, df in db_tables.items():
+        for table_name in db_tables:
             f.write(f"### {table_name}\n")
 
+            # Do not build derived tables just to describe them
+            if isinstance(db_tables, LazyTables) and not db_tables.is_built(table_name):
+                f.write("(derived table, not built in this run)\n\n")
+                continue
+
+            df = db_tables[table_name]
+            if not isinstance(df, pd.DataFrame):
+                f.write(f"({type(df).__name__}, not a table)\n\n")
+                continue
+
             for col, dtype in df.dtypes.items():
                 f.write(f"{col}: {dtype}\n")
 
@@ -896,78 +3305,98 @@ def timeconvert(x: float) -> str:
         return f"{int(x / 6000)}:{a / 100:.2f}"
 
 
-def multisolved(x, logger=None):
+# 333mbf results are encoded as 0DDTTTTTMM: DD = 99 - (solved - missed),
+# TTTTT = time in seconds (99999 = unknown), MM = missed cubes.
+_MULTI_UNKNOWN_TIME = 99_999
 
-    if x <= 0:
-        return np.nan
 
-    try:
-        if pd.isna(x):
-            return np.nan
-        x = int(x)
-        DD = (x // 10_000_000) % 100
-        MM = x % 100
-        difference = 99 - DD
-        solved = difference + MM
-        return float(solved)
-    except Exception as e:
-        if logger:
-            logger.warning(f"multisolved() failed for {x}: {e}")
-        return np.nan
+def _multi_fields(x):
+    """
+    The decoded fields of positive 333mbf value(s) `x`, an int or an int64
+    array (same arithmetic for both). time is in centiseconds and still
+    holds the 'unknown' marker, see _MULTI_UNKNOWN_TIME.
+    """
+    dd = (x // 10_000_000) % 100
+    tt = (x // 100) % 100_000
+    mm = x % 100
+    points = 99 - dd
+    return {
+        "solved": points + mm,
+        "attempted": points + 2 * mm,
+        "wrong": mm,
+        "points": points,
+        "time": tt * 100,
+    }
+
+
+def _decode_multi_arrays(v: np.ndarray) -> dict[str, np.ndarray]:
+    """decode_multi on a float64 array, returning a dict of float64 arrays."""
+    valid = v > 0   # False for NaN too
+    fields = _multi_fields(np.where(valid, v, 0).astype(np.int64))
+
+    decoded = {name: np.where(valid, arr, np.nan) for name, arr in fields.items()}
+    decoded["time"][fields["time"] == _MULTI_UNKNOWN_TIME * 100] = np.nan
+    return decoded
+
+
+def decode_multi(values) -> pd.DataFrame:
+    """
+    Decode an array of 333mbf result values in one integer-arithmetic pass.
 
+    Parameters
+    ----------
+    values : array-like or pd.Series
+        Encoded results. Non-positive (DNF/DNS/no attempt) and missing
+        values decode to NaN everywhere.
 
-def multiwrong(x, logger=None):
+    Returns
+    -------
+    pd.DataFrame
+        float64 columns solved, attempted, wrong, points (solved - wrong) and
+        time (centiseconds, NaN if unknown), aligned with `values` (same index
+        if it is a Series).
+    """
+    index = values.index if isinstance(values, pd.Series) else None
+    v = pd.to_numeric(pd.Series(np.asarray(values).ravel()), errors="coerce").to_numpy(dtype="float64")
+    return pd.DataFrame(_decode_multi_arrays(v), index=index)
 
+
+def _decode_multi_scalar(x, field: str, logger=None) -> float:
+    """One field of decode_multi for a single value; NaN (and a warning) if it cannot be decoded."""
     if x <= 0:
         return np.nan
 
     try:
         if pd.isna(x):
             return np.nan
-        x = int(x)
-        return float(x % 100)
+        value = _multi_fields(int(x))[field]
+        if field == "time" and value == _MULTI_UNKNOWN_TIME * 100:
+            return np.nan
+        return float(value)
     except Exception as e:
         if logger:
-            logger.warning(f"multiwrong() failed for {x}: {e}")
+            logger.warning(f"multi{field}() failed for {x}: {e}")
         return np.nan
 
 
-def multiattempted(x, logger=None):
+def multisolved(x, logger=None):
+    """Scalar version of decode_multi(...)["solved"]."""
+    return _decode_multi_scalar(x, "solved", logger)
 
-    if x <= 0:
-        return np.nan
-    
-    try:
-        if pd.isna(x):
-            return np.nan
-        x = int(x)
-        DD = (x // 10_000_000) % 100
-        MM = x % 100
-        difference = 99 - DD
-        attempted = difference + 2 * MM
-        return float(attempted)
-    except Exception as e:
-        if logger:
-            logger.warning(f"multiattempted() failed for {x}: {e}")
-        return np.nan
 
+def multiwrong(x, logger=None):
+    """Scalar version of decode_multi(...)["wrong"]."""
+    return _decode_multi_scalar(x, "wrong", logger)
 
-def multitime(x, logger=None):
 
-    if x <= 0:
-        return np.nan
+def multiattempted(x, logger=None):
+    """Scalar version of decode_multi(...)["attempted"]."""
+    return _decode_multi_scalar(x, "attempted", logger)
 
-    try:
-        if pd.isna(x):
-            return np.nan
-        x = int(x)
-        TT = (x // 100) % 100_000
-        # 99999 means "unknown"
-        return np.nan if TT == 99_999 else float(TT*100) #restituisce tempo in centisecondi per uniformità
-    except Exception as e:
-        if logger:
-            logger.warning(f"multitime() failed for {x}: {e}")
-        return np.nan
+
+def multitime(x, logger=None):
+    """Scalar version of decode_multi(...)["time"], in centiseconds."""
+    return _decode_multi_scalar(x, "time", logger)
 
 
 def format_result(value, event_id: str, logger=None) -> str:
@@ -1013,3 +3442,101 @@ def multiresult(x, logger=None):
         if logger:
             logger.warning(f"multiresult() failed for {x}: {e}")
         return ""
+
+
+# "00" ... "99": zero-padded seconds and centiseconds
+_TWO_DIGITS = np.array([f"{i:02d}" for i in range(100)], dtype=object)
+
+
+def _format_centis(x: np.ndarray) -> np.ndarray:
+    """f"{x / 100:.2f}" for an int64 array of non-negative values."""
+    whole, cents = np.divmod(x, 100)
+    return whole.astype(str).astype(object) + "." + _TWO_DIGITS[cents]
+
+
+def _format_times(x: np.ndarray) -> np.ndarray:
+    """timeconvert for an int64 array of non-negative centiseconds."""
+    minutes, rest = np.divmod(x, 6000)
+    seconds, cents = np.divmod(rest, 100)
+    long_form = minutes.astype(str).astype(object) + ":" + _TWO_DIGITS[seconds] + "." + _TWO_DIGITS[cents]
+    return np.where(x < 6000, _format_centis(x), long_form)
+
+
+def _format_multis(x: np.ndarray) -> np.ndarray:
+    """multiresult for a float array of encoded 333mbf values (no NaN)."""
+    out = np.full(len(x), "", dtype=object)
+    valid = x > 0
+    if not valid.any():
+        return out
+
+    d = _decode_multi_arrays(x[valid])
+    known = ~np.isnan(d["time"])
+    time_str = np.full(len(known), "", dtype=object)
+    time_str[known] = _format_times(d["time"][known].astype(np.int64))
+
+    out[valid] = (
+        d["solved"].astype(np.int64).astype(str).astype(object) + "/"
+        + d["attempted"].astype(np.int64).astype(str).astype(object) + " "
+        + time_str
+    )
+    return out
+
+
+def format_results(values, event_ids=None, logger=None) -> pd.Series:
+    """
+    Format a whole column of raw WCA values; the vectorised format_result.
+
+    Produces exactly what format_result(value, event_id) gives for every
+    element ('' for missing values, FMC averages stored *100, MBLD decoded,
+    times as 'SS.CC' / 'M:SS.CC'). The strings are built with integer
+    arithmetic on the whole column; the few values that do not fit that
+    path (negative or fractional times, non-numeric input) go through
+    format_result one by one.
+
+    Parameters
+    ----------
+    values : array-like or pd.Series
+        Raw result values.
+    event_ids : str, array-like or None
+        One event id per value, a single id for all of them, or None to
+        format everything as a time (like timeconvert).
+
+    Returns
+    -------
+    pd.Series
+        Formatted strings, with the index of `values` if it is a Series.
+    """
+    index = values.index if isinstance(values, pd.Series) else None
+    raw = pd.Series(np.asarray(values, dtype=object))
+    n = len(raw)
+
+    if event_ids is None or isinstance(event_ids, str):
+        events = np.full(n, event_ids, dtype=object)
+    else:
+        events = np.asarray(event_ids, dtype=object)
+
+    v = pd.to_numeric(raw, errors="coerce").to_numpy(dtype="float64")
+    missing = raw.isna().to_numpy()
+    finite = np.isfinite(v)
+    integral = finite & (v == np.floor(v))
+    x = np.where(integral, v, 0).astype(np.int64)
+
+    is_mbf = events == "333mbf"
+    is_fmc = events == "333fm"
+
+    mbf = is_mbf & finite & ~missing
+    fmc_moves = is_fmc & finite & (v <= 200) & ~missing
+    fmc_average = is_fmc & integral & (v > 200) & ~missing
+    times = ~is_mbf & ~is_fmc & integral & (v >= 0) & ~missing
+    others = ~missing & ~(mbf | fmc_moves | fmc_average | times)
+
+    out = np.full(n, "", dtype=object)
+    out[times] = _format_times(x[times])
+    out[fmc_average] = _format_centis(x[fmc_average])
+    out[fmc_moves] = np.trunc(v[fmc_moves]).astype(np.int64).astype(str)
+    out[mbf] = _format_multis(v[mbf])
+    for i in np.flatnonzero(others):
+        out[i] = format_result(raw.iat[i], events[i], logger)
+
+    return pd.Series(out, index=index, dtype=object)
+